@@ -1,7 +1,10 @@
 from __future__ import annotations
+import ast
 import bpy
+import math
 import logging
-from typing import Any
+import numpy as np
+from typing import Any, Dict, List, Optional, Tuple, Union
 from abc import abstractmethod
 from collections import namedtuple
 
@@ -15,22 +18,61 @@ class Variable:
     type: str = None
     obj: Any = None
 
+    def assign(self, driver_variable: bpy.types.FCurve = None):
+        """ Adds the variable to the driver of the fcurve. """
+        self._set_variable(driver_variable)
+        for target, values in zip(self.variable.targets, self.target_values()):
+            for key, value in values.items():
+                setattr(target, key, value)
+
+    @abstractmethod
+    def target_values(self) -> List[Dict[str, Any]]:
+        """ Attributes of the variable targets. """
+        pass
+
     @abstractmethod
-    def assign(self):
+    def evaluate(self) -> float:
+        """ Value of the variable at the current frame, used to bake drivers. """
         pass
 
-    def _set_variable(self, driver_variable: bpy.types.DriverVariable = None):
+    def signature(self) -> tuple:
+        """ Hashable description of the variable, identical variables share the signature. """
+        return (self.type, ) + tuple(tuple(values.items()) for values in self.target_values())
+
+    @staticmethod
+    def _matrix(obj, transform_space: str):
+        if isinstance(obj, bpy.types.PoseBone):
+            if transform_space == 'WORLD_SPACE':
+                return obj.id_data.matrix_world @ obj.matrix
+            return obj.matrix_basis
+
+        if transform_space == 'WORLD_SPACE':
+            return obj.matrix_world
+        elif transform_space == 'LOCAL_SPACE':
+            return obj.matrix_local
+        return obj.matrix_basis
+
+    def matches(self, variable: bpy.types.DriverVariable) -> bool:
+        """ Checks if an existing driver variable is identical. """
+        if variable.name != self.name or variable.type != self.type:
+            return False
+        for target, values in zip(variable.targets, self.target_values()):
+            for key, value in values.items():
+                if getattr(target, key) != value:
+                    return False
+        return True
+
+    def _set_variable(self, driver_variable: bpy.types.FCurve = None):
         self._validate(driver_variable)
         self.variable = driver_variable.driver.variables.new()
         self.variable.name = self.name
         self.variable.type = self.type
 
-    def _set_variable_target(self, variable_target, obj):
-        if isinstance(self.obj, bpy.types.PoseBone):
-            variable_target.id = obj.id_data
-            variable_target.bone_target = obj.name
-        else:
-            variable_target.id = obj
+    @staticmethod
+    def _target_id(obj) -> Dict[str, Any]:
+        if isinstance(obj, bpy.types.PoseBone):
+            return {'id': obj.id_data, 'bone_target': obj.name}
+        return {'id': obj}
 
     def _validate(self, driver_variable):
         assert driver_variable is not None
@@ -47,14 +89,24 @@ class SingleProperty(Variable):
         self.obj = obj
         self.path = path
 
-    def assign(self, driver_variable: bpy.types.DriverVariable = None):
-        self._set_variable(driver_variable)
+    def target_values(self) -> List[Dict[str, Any]]:
         if isinstance(self.obj, bpy.types.PoseBone):
-            self.variable.targets[0].id = self.obj.id_data
-            self.variable.targets[0].data_path = f'pose.bones.["{self.obj.name}"].{self.path}'
-        else:
-            self.variable.targets[0].id = self.obj
-            self.variable.targets[0].data_path = self.path
+            return [{'id': self.obj.id_data, 'data_path': f'pose.bones.["{self.obj.name}"].{self.path}'}]
+        return [{'id': self.obj, 'data_path': self.path}]
+
+    def value(self) -> Optional[float]:
+        """ Current value of the property, None if it isn't numeric. """
+        try:
+            value = self.obj.path_resolve(self.path)
+        except ValueError:
+            return None
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            return None
+        return float(value)
+
+    def evaluate(self) -> float:
+        value = self.value()
+        return 0.0 if value is None else value
 
 
 class TransformChannel(Variable):
@@ -66,6 +118,8 @@ class TransformChannel(Variable):
         self.type = 'TRANSFORMS'
         self.name = name
         self.obj = obj
+        self.transform = transform
+        self.idx = idx
         self.transform_type = self.get_transform_type(transform, idx)
         self.transform_space = transform_space
 
@@ -86,18 +140,23 @@ class TransformChannel(Variable):
         }
         return transform_type[transform][idx]
 
-    def assign(self, driver_variable: bpy.types.DriverVariable = None):
-        self._set_variable(driver_variable)
-        self._set_variable_target(self.variable.targets[0], self.obj)
-        if isinstance(self.obj, bpy.types.PoseBone):
-            self.variable.targets[0].id = self.obj.id_data
-            self.variable.targets[0].bone_target = self.obj.name
-        else:
-            self.variable.targets[0].id = self.obj
-
+    def target_values(self) -> List[Dict[str, Any]]:
         # apply data paths and transform type
-        self.variable.targets[0].transform_space = self.transform_space
-        self.variable.targets[0].transform_type = self.transform_type
+        values = self._target_id(self.obj)
+        values['transform_space'] = self.transform_space
+        values['transform_type'] = self.transform_type
+        return [values]
+
+    def evaluate(self) -> float:
+        matrix = self._matrix(self.obj, self.transform_space)
+        if self.transform == 'location':
+            return matrix.to_translation()[self.idx]
+        elif self.transform == 'scale':
+            scale = matrix.to_scale()
+            return sum(scale) / 3 if self.idx == 3 else scale[self.idx]
+        elif self.idx == 3:
+            return matrix.to_quaternion().w
+        return matrix.to_euler()[self.idx]
 
 
 class RotationalDifference(Variable):
@@ -109,10 +168,13 @@ class RotationalDifference(Variable):
         self.obj = obj
         self.other_obj = other_obj
 
-    def assign(self, driver_variable: bpy.types.DriverVariable = None):
-        self._set_variable(driver_variable)
-        self._set_variable_target(self.variable.targets[0], self.obj)
-        self._set_variable_target(self.variable.targets[1], self.other_obj)
+    def target_values(self) -> List[Dict[str, Any]]:
+        return [self._target_id(self.obj), self._target_id(self.other_obj)]
+
+    def evaluate(self) -> float:
+        rotation = self._matrix(self.obj, 'WORLD_SPACE').to_quaternion()
+        other_rotation = self._matrix(self.other_obj, 'WORLD_SPACE').to_quaternion()
+        return rotation.rotation_difference(other_rotation).angle
 
 
 class Distance(Variable):
@@ -130,12 +192,283 @@ class Distance(Variable):
         self.transform_space = transform_space
         self.other_transform_space = other_transform_space
 
-    def assign(self, driver_variable: bpy.types.DriverVariable = None):
-        self._set_variable(driver_variable)
-        self._set_variable_target(self.variable.targets[0], self.obj)
-        self.variable.targets[0].transform_space = self.transform_space
-        self._set_variable_target(self.variable.targets[1], self.other_obj)
-        self.variable.targets[1].transform_space = self.other_transform_space
+    def target_values(self) -> List[Dict[str, Any]]:
+        values = self._target_id(self.obj)
+        values['transform_space'] = self.transform_space
+        other_values = self._target_id(self.other_obj)
+        other_values['transform_space'] = self.other_transform_space
+        return [values, other_values]
+
+    def evaluate(self) -> float:
+        location = self._matrix(self.obj, self.transform_space).to_translation()
+        other_location = self._matrix(self.other_obj, self.other_transform_space).to_translation()
+        return (location - other_location).length
+
+
+# region expression optimizer
+# functions blenders simple expression evaluator handles without calling into python
+SIMPLE_FUNCTIONS = {
+    'abs': abs, 'fabs': math.fabs, 'min': min, 'max': max, 'radians': math.radians, 'degrees': math.degrees,
+    'floor': math.floor, 'ceil': math.ceil, 'trunc': math.trunc, 'int': int, 'sin': math.sin, 'cos': math.cos,
+    'tan': math.tan, 'asin': math.asin, 'acos': math.acos, 'atan': math.atan, 'atan2': math.atan2,
+    'exp': math.exp, 'log': math.log, 'sqrt': math.sqrt, 'pow': math.pow, 'fmod': math.fmod,
+}
+
+NUMPY_FUNCTIONS = {
+    'abs': np.abs, 'fabs': np.fabs, 'min': np.minimum, 'max': np.maximum, 'radians': np.radians,
+    'degrees': np.degrees, 'floor': np.floor, 'ceil': np.ceil, 'trunc': np.trunc, 'int': np.trunc, 'sin': np.sin,
+    'cos': np.cos, 'tan': np.tan, 'asin': np.arcsin, 'acos': np.arccos, 'atan': np.arctan, 'atan2': np.arctan2,
+    'exp': np.exp, 'log': np.log, 'sqrt': np.sqrt, 'pow': np.power, 'fmod': np.fmod,
+}
+
+# operator precedence used to place brackets
+ADD, MUL, UNARY, ATOM = 1, 2, 3, 4
+
+
+class _Linear:
+    """ Sum of terms (coefficient * atom) and a constant, atoms are emitted sub expressions. """
+
+    def __init__(self, terms: Dict[str, Tuple[float, int]] = None, const: float = 0.0):
+        self.terms = terms or {}
+        self.const = const
+
+    @classmethod
+    def atom(cls, expression: str, precedence: int) -> _Linear:
+        return cls({expression: (1.0, precedence)})
+
+    def scaled(self, factor: float) -> _Linear:
+        if factor == 0:
+            return _Linear()
+        return _Linear({k: (c * factor, p) for k, (c, p) in self.terms.items()}, self.const * factor)
+
+    def added(self, other: _Linear, sign: float = 1.0) -> _Linear:
+        terms = dict(self.terms)
+        for k, (c, p) in other.terms.items():
+            terms[k] = (terms[k][0] + sign * c if k in terms else sign * c, p)
+        terms = {k: v for k, v in terms.items() if v[0] != 0}
+        return _Linear(terms, self.const + sign * other.const)
+
+    def single(self) -> Optional[Tuple[str, float, int]]:
+        """ The atom, coefficient and precedence if the sum only has a single term. """
+        if self.const != 0 or len(self.terms) != 1:
+            return None
+        (k, (c, p)), = self.terms.items()
+        return k, c, p
+
+    def emit(self) -> Tuple[str, int]:
+        """ Expression and precedence. """
+        parts = []
+        for atom, (coefficient, precedence) in self.terms.items():
+            atom = _bracket(atom, precedence, MUL)
+            magnitude = abs(coefficient)
+            term = atom if magnitude == 1 else f"{_number(magnitude)}*{atom}"
+            parts.append((coefficient < 0, term))
+        if self.const != 0 or not parts:
+            parts.append((self.const < 0, _number(abs(self.const))))
+
+        if len(parts) == 1 and not parts[0][0]:
+            term = parts[0][1]
+            if len(self.terms) == 0:
+                return term, ATOM
+            atom, (coefficient, precedence) = next(iter(self.terms.items()))
+            return term, (precedence if abs(coefficient) == 1 else MUL)
+
+        expression = ('-' if parts[0][0] else '') + parts[0][1]
+        for negative, term in parts[1:]:
+            expression += (' - ' if negative else ' + ') + term
+        return expression, ADD
+
+
+def _number(value: float) -> str:
+    if not math.isfinite(value):
+        raise ValueError(f"Expression folds to a non finite value: {value}")
+    return repr(float(value))
+
+
+def _bracket(expression: str, precedence: int, required: int) -> str:
+    return expression if precedence >= required else f"({expression})"
+
+
+def _emit(value: Union[float, _Linear]) -> Tuple[str, int]:
+    if isinstance(value, _Linear):
+        return value.emit()
+    return _Linear(const=value).emit()
+
+
+def _simplified(value: _Linear) -> Union[float, _Linear]:
+    # terms may cancel each other
+    return value if value.terms else value.const
+
+
+def _fold(node: ast.AST, constants: Dict[str, float]) -> Union[float, _Linear]:
+    """ Folds constants and collects linear terms, raises ValueError for unsupported syntax. """
+    if isinstance(node, ast.Expression):
+        return _fold(node.body, constants)
+
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)) and not isinstance(node.value, bool):
+        return float(node.value)
+
+    if isinstance(node, ast.Name):
+        if node.id in constants:
+            return constants[node.id]
+        return _Linear.atom(node.id, ATOM)
+
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.UAdd)):
+        value = _fold(node.operand, constants)
+        sign = -1.0 if isinstance(node.op, ast.USub) else 1.0
+        return value.scaled(sign) if isinstance(value, _Linear) else sign * value
+
+    if isinstance(node, ast.BinOp):
+        left, right = _fold(node.left, constants), _fold(node.right, constants)
+        return _fold_binop(node.op, left, right)
+
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id in SIMPLE_FUNCTIONS \
+            and not node.keywords:
+        args = [_fold(arg, constants) for arg in node.args]
+        if all(not isinstance(arg, _Linear) for arg in args):
+            return float(SIMPLE_FUNCTIONS[node.func.id](*args))
+        return _Linear.atom(f"{node.func.id}({', '.join(_emit(arg)[0] for arg in args)})", ATOM)
+
+    raise ValueError(f"Unsupported expression: {ast.dump(node)}")
+
+
+def _fold_binop(op: ast.operator, left, right) -> Union[float, _Linear]:
+    constant_left, constant_right = not isinstance(left, _Linear), not isinstance(right, _Linear)
+    if isinstance(op, (ast.Add, ast.Sub)):
+        sign = 1.0 if isinstance(op, ast.Add) else -1.0
+        if constant_left and constant_right:
+            return left + sign * right
+        left = left if not constant_left else _Linear(const=left)
+        right = right if not constant_right else _Linear(const=right)
+        return _simplified(left.added(right, sign))
+
+    if isinstance(op, ast.Mult):
+        if constant_left and constant_right:
+            return left * right
+        if constant_left or constant_right:
+            return _simplified(right.scaled(left) if constant_left else left.scaled(right))
+
+        # pull coefficients out of products of single terms
+        a, b = left.single(), right.single()
+        if a is not None and b is not None:
+            product = f"{_bracket(a[0], a[2], MUL)}*{_bracket(b[0], b[2], MUL)}"
+            return _Linear({product: (a[1] * b[1], MUL)})
+        return _Linear.atom(f"{_bracket(*_emit(left), MUL)}*{_bracket(*_emit(right), MUL)}", MUL)
+
+    if isinstance(op, ast.Div):
+        if constant_right:
+            return left / right if constant_left else left.scaled(1.0 / right)
+
+        # constant / x and x / y stay a quotient
+        b = right.single()
+        if b is not None and not constant_left:
+            a = left.single()
+            if a is not None:
+                quotient = f"{_bracket(a[0], a[2], MUL)}/{_bracket(b[0], b[2], UNARY)}"
+                return _Linear({quotient: (a[1] / b[1], MUL)})
+        return _Linear.atom(f"{_bracket(*_emit(left), MUL)}/{_bracket(*_emit(right), UNARY)}", MUL)
+
+    if isinstance(op, ast.Pow):
+        # the simple expression evaluator doesn't support the power operator
+        if constant_left and constant_right:
+            return math.pow(left, right)
+        return _Linear.atom(f"pow({_emit(left)[0]}, {_emit(right)[0]})", ATOM)
+
+    raise ValueError(f"Unsupported operator: {ast.dump(op)}")
+
+
+def optimize_expression(expression: str, constants: Dict[str, float] = None) -> str:
+    """ Folds constants and nested remapping chains into a flat sum of terms.
+        Variables in constants get replaced by their values.
+        Returns the input if the expression can't be folded. """
+    try:
+        tree = ast.parse(expression.strip(), mode='eval')
+        return _emit(_fold(tree, constants or {}))[0]
+    except (SyntaxError, ValueError, ZeroDivisionError, OverflowError) as err:
+        logging.debug(f"Keeping driver expression {expression}: {err}")
+        return expression
+
+
+def is_simple_expression(expression: str) -> bool:
+    """ Checks if blender may evaluate the expression without calling into python. """
+    try:
+        tree = ast.parse(expression.strip(), mode='eval')
+    except SyntaxError:
+        return False
+
+    allowed = (ast.Expression, ast.BinOp, ast.UnaryOp, ast.Name, ast.Load, ast.Add, ast.Sub, ast.Mult, ast.Div,
+               ast.USub, ast.UAdd, ast.Not, ast.Compare, ast.BoolOp, ast.And, ast.Or, ast.IfExp, ast.Eq, ast.NotEq,
+               ast.Lt, ast.LtE, ast.Gt, ast.GtE, ast.Call, ast.Constant)
+    for node in ast.walk(tree):
+        if not isinstance(node, allowed):
+            return False
+        if isinstance(node, ast.Call) and (not isinstance(node.func, ast.Name)
+                                           or node.func.id not in SIMPLE_FUNCTIONS or node.keywords):
+            return False
+        if isinstance(node, ast.Constant) and not isinstance(node.value, (int, float)):
+            return False
+    return True
+
+
+def expression_names(expression: str) -> set:
+    """ Names of the variables used in the expression. """
+    try:
+        tree = ast.parse(expression.strip(), mode='eval')
+    except SyntaxError:
+        return set()
+    return {node.id for node in ast.walk(tree) if isinstance(node, ast.Name)}
+
+
+def evaluate_expression(expression: str, values: Dict[str, Any], size: int) -> np.ndarray:
+    """ Evaluates an expression for arrays of variable values, b.e. over a frame range. """
+    def evaluate(node):
+        if isinstance(node, ast.Expression):
+            return evaluate(node.body)
+        if isinstance(node, ast.Constant):
+            return float(node.value)
+        if isinstance(node, ast.Name):
+            return values[node.id]
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.UAdd)):
+            return -evaluate(node.operand) if isinstance(node.op, ast.USub) else evaluate(node.operand)
+        if isinstance(node, ast.BinOp):
+            left, right = evaluate(node.left), evaluate(node.right)
+            if isinstance(node.op, ast.Add):
+                return np.add(left, right)
+            elif isinstance(node.op, ast.Sub):
+                return np.subtract(left, right)
+            elif isinstance(node.op, ast.Mult):
+                return np.multiply(left, right)
+            elif isinstance(node.op, ast.Div):
+                return np.divide(left, right)
+            elif isinstance(node.op, ast.Pow):
+                return np.power(left, right)
+        if isinstance(node, ast.IfExp):
+            return np.where(evaluate(node.test), evaluate(node.body), evaluate(node.orelse))
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not):
+            return np.logical_not(evaluate(node.operand))
+        if isinstance(node, ast.BoolOp):
+            op = np.logical_and if isinstance(node.op, ast.And) else np.logical_or
+            return op.reduce(np.broadcast_arrays(*[evaluate(v) for v in node.values]))
+        if isinstance(node, ast.Compare):
+            comparisons = {ast.Eq: np.equal, ast.NotEq: np.not_equal, ast.Lt: np.less, ast.LtE: np.less_equal,
+                           ast.Gt: np.greater, ast.GtE: np.greater_equal}
+            left, result = evaluate(node.left), True
+            for op, comparator in zip(node.ops, node.comparators):
+                right = evaluate(comparator)
+                result = np.logical_and(result, comparisons[type(op)](left, right))
+                left = right
+            return result
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id in NUMPY_FUNCTIONS:
+            args = [evaluate(arg) for arg in node.args]
+            if node.func.id in {'min', 'max'} and len(args) != 2:
+                return NUMPY_FUNCTIONS[node.func.id].reduce(np.broadcast_arrays(*args))
+            return NUMPY_FUNCTIONS[node.func.id](*args)
+        raise ValueError(f"Expression can't be evaluated using numpy: {expression}")
+
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        result = evaluate(ast.parse(expression.strip(), mode='eval'))
+    return np.broadcast_to(np.asarray(result, dtype=np.float64), (size, )).copy()
+# endregion
 
 
 DriverVariable = namedtuple('DriverVariable', ['variable', 'path', 'idx'])
@@ -145,16 +478,18 @@ DriverExpression = namedtuple('DriverExpression', ['expression', 'path', 'idx'])
 class DriverFactory:
     expressions: dict
 
-    def __init__(self, target: Any, type: str = 'SCRIPTED'):
+    def __init__(self, target: Any, type: str = 'SCRIPTED', fold_constants: bool = False):
         """ Init a driver factory
             params target: Property or Object in Blender with accessible data path.
             params type: Driver type to use. ['MAX', 'MIN', 'AVERAGE', 'SCRIPTED', 'SUM'], default = SCRIPTED.
+            params fold_constants: Replace property variables by their current values and fold the expressions,
+                changes of the properties require executing the factory again.
         """
         assert type in ['MAX', 'MIN', 'AVERAGE', 'SCRIPTED', 'SUM']
         self.type = type
         self.target = target
+        self.fold_constants = fold_constants
         self.expressions = {}
-        self._driver_variables = {}
         self.variables = list()
 
     def add_variable(self, variable: Variable, path: str, idx: int):
@@ -189,48 +524,107 @@ class DriverFactory:
         previous = f"({self.expressions[path][idx]})"
         self.expressions[path][idx] = expression.format(previous)
 
-    def _add_driver_variable(self, path: str, idx: int, driver_variable: Any):
-        """ Adds a driver variable to the driver variables dict. """
-        if path not in self._driver_variables:
-            self._driver_variables[path] = {}
-        if idx not in self._driver_variables[path]:
-            self._driver_variables[path][idx] = None
-
-        self._driver_variables[path][idx] = driver_variable
-
-    def _in_driver_variables(self, path: str, idx: int):
-        """ Checks if path and idx are in the driver variables dict. """
-        if path not in self._driver_variables.keys():
-            return False
-        if idx not in self._driver_variables[path].keys():
-            return False
-        return True
-
     def driver_add_variable(self, path, idx):
         if idx == -1:
             return self.target.driver_add(path)
         return self.target.driver_add(path, idx)
 
-    def execute(self):
-        """ Adds driver variables to object and stores them. """
-        for var in self.variables:
-            driver_variable = self.driver_add_variable(var.path, var.idx)
-            var.variable.assign(driver_variable)
-            self._add_driver_variable(var.path, var.idx, driver_variable)
-
-        """ Assign expression to driver variables, if necessary create new driver variables. """
-        for str_key, dictionary in self.expressions.items():
-            for int_key, expression in dictionary.items():
-                if expression is None:
-                    continue
-
-                if not self._in_driver_variables(str_key, int_key):
-                    self._add_driver_variable(str_key, int_key, self.driver_add_variable(str_key, int_key))
+    def find_driver(self, path: str, idx: int) -> Optional[bpy.types.FCurve]:
+        """ Existing driver fcurve of the target. """
+        animation_data = self.target.animation_data
+        if animation_data is None:
+            return None
+        return animation_data.drivers.find(path, index=max(idx, 0))
 
+    def planned_drivers(self) -> Dict[Tuple[str, int], Tuple[list, Optional[str]]]:
+        """ Variables and expression of every driver (path, idx) to apply. """
+        drivers = {}
+        for var in self.variables:
+            drivers.setdefault((var.path, var.idx), []).append(var.variable)
+        for path, dictionary in self.expressions.items():
+            for idx, expression in dictionary.items():
+                if expression is not None:
+                    drivers.setdefault((path, idx), [])
+
+        planned = {}
+        for (path, idx), variables in drivers.items():
+            expression = self.expressions.get(path, {}).get(idx)
+            if self.fold_constants and expression is not None and self.type == 'SCRIPTED':
+                variables, expression = self.fold(variables, expression)
+            planned[(path, idx)] = (variables, expression)
+        return planned
+
+    @staticmethod
+    def fold(variables: list, expression: str) -> Tuple[list, str]:
+        """ Folds property variables into the expression, drops variables which aren't used anymore. """
+        constants = {}
+        for var in variables:
+            if isinstance(var, SingleProperty):
+                value = var.value()
+                if value is not None:
+                    constants[var.name] = value
+
+        expression = optimize_expression(expression, constants)
+        names = expression_names(expression)
+        return [var for var in variables if var.name in names], expression
+
+    def is_identical(self, driver: bpy.types.Driver, variables: list, expression: Optional[str]) -> bool:
+        """ Checks if the driver already uses the type, expression and variables. """
+        if expression is not None:
+            if self.type == 'SCRIPTED' and driver.expression != expression:
+                return False
+            if driver.type != self.type:
+                return False
+
+        if len(driver.variables) != len(variables):
+            return False
+        return all(var.matches(driver_var) for var, driver_var in zip(variables, driver.variables))
+
+    def remove_unused(self, drivers):
+        """ Removes drivers of the target which aren't part of the factory. """
+        animation_data = self.target.animation_data
+        if animation_data is None:
+            return
+
+        for fcurve in list(animation_data.drivers):
+            if (fcurve.data_path, fcurve.array_index) in drivers or (fcurve.data_path, -1) in drivers:
+                continue
+            self.target.driver_remove(fcurve.data_path, fcurve.array_index)
+
+    def execute(self, clear_unused: bool = False) -> int:
+        """ Adds drivers, variables and expressions to the target.
+            Drivers which already are identical get skipped, others get rebuilt.
+            Returns the number of applied drivers. """
+        drivers = self.planned_drivers()
+        if clear_unused:
+            self.remove_unused(drivers)
+
+        applied = 0
+        for (path, idx), (variables, expression) in drivers.items():
+            if expression is not None and not is_simple_expression(expression):
+                logging.debug(f"Driver {self.target.name}.{path}[{idx}] requires python: {expression}")
+
+            fcurve = self.find_driver(path, idx)
+            if fcurve is not None and self.is_identical(fcurve.driver, variables, expression):
+                continue
+
+            if fcurve is None:
+                fcurve = self.driver_add_variable(path, idx)
+            else:
+                for driver_variable in list(fcurve.driver.variables):
+                    fcurve.driver.variables.remove(driver_variable)
+
+            for variable in variables:
+                variable.assign(fcurve)
+
+            # assign expression to the driver
+            if expression is not None:
                 if self.type == 'SCRIPTED':
-                    self._driver_variables[str_key][int_key].driver.expression = expression
+                    fcurve.driver.expression = expression
                 else:
-                    self._driver_variables[str_key][int_key].driver.type = self.type
+                    fcurve.driver.type = self.type
+            applied += 1
+        return applied
 
 
 if __name__ == '__main__':
@@ -1,4 +1,5 @@
 import bpy
+import numpy as np
 from typing import List
 from collections import namedtuple
 
@@ -35,6 +36,15 @@ class FCurveHelper:
             fc.keyframe_points.foreach_set("co", [x for co in zip(frames, samples) for x in co])
             fc.update()
 
+    def foreach_append(self, data_path: str, frames: List[int], *args: List[float]):
+        """ Append multiple keyframes at once, keeps existing keyframes outside the frame range.
+            data_path: String Enum [location, scale, rotation_euler, rotation_quaternion]
+            frames: flat list of int
+            args: flat lists of float """
+        f_curves = self.get_f_curves(data_path)
+        for samples, fc in zip(args, f_curves):
+            append_keyframes(fc, frames, samples)
+
     def update(self, data_path: str):
         if not hasattr(self, data_path):
             raise KeyError
@@ -50,6 +60,66 @@ class FCurveHelper:
         return s
 
 
+def append_keyframes(fc: bpy.types.FCurve, frames, samples):
+    """ Appends keyframes to an f-curve using bulk reads and writes.
+    Existing keyframes within the range of the new frames get replaced. """
+    frames = np.asarray(frames, dtype=np.float32)
+    if len(frames) == 0:
+        return
+
+    keyframe_points = fc.keyframe_points
+    co = np.empty(len(keyframe_points) * 2, dtype=np.float32)
+    keyframe_points.foreach_get("co", co)
+    co = co.reshape(-1, 2)
+
+    keep = (co[:, 0] < frames.min()) | (co[:, 0] > frames.max())
+    if not keep.all():
+        # only happens when recording over previous keys
+        for i in reversed(np.flatnonzero(~keep)):
+            keyframe_points.remove(keyframe_points[int(i)], fast=True)
+        co = co[keep]
+
+    new_co = np.column_stack((frames, np.asarray(samples, dtype=np.float32)))
+    keyframe_points.add(count=len(new_co))
+    keyframe_points.foreach_set("co", np.concatenate((co, new_co)).ravel())
+    fc.update()
+
+
+def set_keyframes(fc: bpy.types.FCurve, frames, samples):
+    """ Replaces the keyframes of an f-curve using a single bulk write. """
+    co = np.empty((len(frames), 2), dtype=np.float32)
+    co[:, 0] = frames
+    co[:, 1] = samples
+
+    keyframe_points = fc.keyframe_points
+    if hasattr(keyframe_points, 'clear'):
+        keyframe_points.clear()
+    keyframe_points.add(count=len(co))
+    keyframe_points.foreach_set("co", co.ravel())
+    fc.update()
+
+
+def ensure_fcurves(ob: bpy.types.Object, data_path: str, channels: int) -> List[bpy.types.FCurve]:
+    """ Gets or creates the f-curves of the objects action for every channel of the data path. """
+    ad = ob.animation_data_create()
+    if ad.action is None:
+        ad.action = bpy.data.actions.new(ob.name)
+    action = ad.action
+
+    if hasattr(action, 'fcurve_ensure_for_datablock'):
+        # layered actions (blender 4.4+) require a slot for the object
+        return [action.fcurve_ensure_for_datablock(ob, data_path, index=i, group_name=data_path)
+                for i in range(channels)]
+
+    f_curves = []
+    for i in range(channels):
+        fc = action.fcurves.find(data_path, index=i)
+        if fc is None:
+            fc = action.fcurves.new(data_path=data_path, index=i, action_group=data_path)
+        f_curves.append(fc)
+    return f_curves
+
+
 def create_actions(objects, overwrite: bool = True):
     actions = []
 
@@ -1,9 +1,16 @@
 import numpy as np
-import logging
-from mathutils import Euler
+from collections import namedtuple
 from . import cgt_math
 
 
+# results of batched calculators for N frames:
+# valid (N,) - frames containing results
+# locations (N x objects x 3) - indexed by object idx
+# rotation_indices [k] - object idx of each rotation
+# rotations (N x k x 3) - euler rotations
+BatchResult = namedtuple('BatchResult', ['valid', 'locations', 'rotation_indices', 'rotations'])
+
+
 class CustomData:
     idx = None
     loc = None
@@ -16,73 +23,37 @@ class CustomData:
 
 class ProcessorUtils:
     data = None
-    # array for comparison, as noise is present every frame values should change
     frame = 0
-    prev_rotation = {}
-    prev_sum = [0.0, 0.0]
-
-    def has_duplicated_results(self, data=None, detector_type=None, idx=0):
-        """ Sums data array values and compares them each frame to avoid duplicated values
-            in the timeline. This fixes duplicated frame issue mainly occurring on Windows. """
-        summed = np.sum([v[1] for v in data[:21]])
-        if summed == self.prev_sum[idx]:
-            return True
-
-        self.prev_sum[idx] = summed
-        return False
-
-    def quart_to_euler_combat(self, quart, idx, idx_offset=0, axis='XYZ'):
-        """ Converts quart to euler rotation while comparing with previous rotation. """
-        if len(self.prev_rotation) > 0:
-            try:
-                combat = self.prev_rotation[idx + idx_offset]
-                return cgt_math.to_euler(quart, combat, axis)
-            except KeyError:
-                logging.debug(f"Invalid id to euler combat {idx}, {self.frame}")
-                return cgt_math.to_euler(quart)
-        else:
-            return cgt_math.to_euler(quart)
-
-    @staticmethod
-    def offset_euler(euler, offset: list = None):
-        """ Offsets an euler rotation using euler radians *pi. """
-        if offset is None:
-            return euler
-
-        rotation = Euler((
-            euler[0] + np.pi * offset[0],
-            euler[1] + np.pi * offset[1],
-            euler[2] + np.pi * offset[2],
-        ))
-        return rotation
-
-    def try_get_euler(self, quart_rotation, offset: list = None, prev_rot_idx: int = None):
-        """ Gets an euler rotation from quaternion with using the previously
-            created rotation as combat to avoid discontinuity. """
-        if prev_rot_idx is None:
-            return cgt_math.to_euler(quart_rotation)
-
-        # initialize prev rotation
-        elif prev_rot_idx not in self.prev_rotation:
-            self.prev_rotation[prev_rot_idx] = cgt_math.to_euler(quart_rotation)
-            return self.prev_rotation[prev_rot_idx]
-
-        # get euler with combat
-        if offset is None:
-            euler_rot = cgt_math.to_euler(
-                quart_rotation,
-                self.prev_rotation[prev_rot_idx]
-            )
-            self.prev_rotation[prev_rot_idx] = euler_rot
-            return self.prev_rotation[prev_rot_idx]
-
-        else:
-            tmp_offset = [-o for o in offset]
-            euler_rot = cgt_math.to_euler(
-                quart_rotation,
-                self.offset_euler(self.prev_rotation[prev_rot_idx], tmp_offset)
-            )
-
-            self.prev_rotation[prev_rot_idx] = self.offset_euler(euler_rot, offset)
-            return self.prev_rotation[prev_rot_idx]
-
+    # last sums of the duplication check and last eulers of batched calculations,
+    # continued by the next update
+    prev_sum: dict = None
+    batch_eulers: dict = None
+
+    def has_duplicated_results(self, locations: np.ndarray, key: str, count: int = 21) -> np.ndarray:
+        """ Sums the first landmarks of every frame (N x landmarks x 3) and compares them to the previous
+            frame to avoid duplicated values in the timeline. Returns a mask of duplicated frames.
+            This fixes duplicated frame issue mainly occurring on Windows. """
+        if self.prev_sum is None:
+            self.prev_sum = {}
+
+        # as noise is present every frame values should change
+        summed = np.sum(locations[:, :count], axis=(1, 2))
+        previous = np.empty_like(summed)
+        previous[0] = self.prev_sum.get(key, np.nan)
+        previous[1:] = summed[:-1]
+
+        finite = np.flatnonzero(np.isfinite(summed))
+        if len(finite) > 0:
+            self.prev_sum[key] = summed[finite[-1]]
+        return summed == previous
+
+    def compatible_eulers_batch(self, rotation: np.ndarray, key: str) -> np.ndarray:
+        """ Batched euler conversion continuing from the eulers of the previous batch. """
+        if self.batch_eulers is None:
+            self.batch_eulers = {}
+
+        eulers = cgt_math.batch_compatible_eulers(rotation, self.batch_eulers.get(key))
+        finite = np.flatnonzero(np.isfinite(eulers).reshape(len(eulers), -1).all(axis=1))
+        if len(finite) > 0:
+            self.batch_eulers[key] = eulers[finite[-1]].copy()
+        return eulers
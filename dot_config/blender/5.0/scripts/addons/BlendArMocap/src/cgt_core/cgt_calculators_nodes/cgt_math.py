@@ -603,6 +603,208 @@ def matrix3x3_to_euler(matrix: np.ndarray) -> np.ndarray:
 # endregion
 
 
+# region batched numpy implementation
+# functions operate on the last axis, leading axes are frames / landmarks
+def batch_normalize(vectors: np.ndarray) -> np.ndarray:
+    """ returns the unit vectors of an array of vectors. """
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return vectors / np.linalg.norm(vectors, axis=-1, keepdims=True)
+
+
+def batch_dot(v1: np.ndarray, v2: np.ndarray) -> np.ndarray:
+    return np.sum(v1 * v2, axis=-1)
+
+
+def batch_angle_between(v1: np.ndarray, v2: np.ndarray) -> np.ndarray:
+    """ returns the angles in radians between arrays of vectors. """
+    return np.arccos(np.clip(batch_dot(batch_normalize(v1), batch_normalize(v2)), -1.0, 1.0))
+
+
+def batch_project_on_plane(vectors: np.ndarray, normal: np.ndarray) -> np.ndarray:
+    """ projects vectors on the planes through the origin defined by their normals. """
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return vectors - (batch_dot(vectors, normal) / batch_dot(normal, normal))[..., None] * normal
+
+
+def batch_project_point_on_vector(points: np.ndarray, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """ projects points on the lines from a to b. """
+    ab = b - a
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return a + (batch_dot(points - a, ab) / batch_dot(ab, ab))[..., None] * ab
+
+
+def batch_circle_point(center: np.ndarray, radius: np.ndarray, u: np.ndarray, v: np.ndarray,
+                       theta: np.ndarray) -> np.ndarray:
+    """ point at theta on circles around center spanned by unit vectors u & v. """
+    return center + radius[..., None] * (np.cos(theta)[..., None] * u + np.sin(theta)[..., None] * v)
+
+
+def batch_closest_angle_on_circle(points: np.ndarray, center: np.ndarray,
+                                  u: np.ndarray, v: np.ndarray) -> np.ndarray:
+    """ angle of the closest point on circles around center spanned by unit vectors u & v. """
+    d = points - center
+    return np.arctan2(batch_dot(d, v), batch_dot(d, u))
+
+
+def euler_matrix(euler: list) -> np.ndarray:
+    """ rotation matrix of rotate_point_euler (degrees), points get rotated by point @ matrix. """
+    x, y, z = [radians(angle) for angle in euler]
+    rx = np.array([[1, 0, 0], [0, np.cos(x), -np.sin(x)], [0, np.sin(x), np.cos(x)]])
+    ry = np.array([[np.cos(y), 0, np.sin(y)], [0, 1, 0], [-np.sin(y), 0, np.cos(y)]])
+    rz = np.array([[np.cos(z), -np.sin(z), 0], [np.sin(z), np.cos(z), 0], [0, 0, 1]])
+    return rx @ ry @ rz
+
+
+def batch_quaternion_to_matrix(quat: np.ndarray) -> np.ndarray:
+    """ rotation matrices (... x 3 x 3) of unit quaternions (... x 4, w x y z). """
+    w, x, y, z = np.moveaxis(quat, -1, 0)
+    return np.stack((
+        np.stack((1 - 2 * (y * y + z * z), 2 * (x * y - w * z), 2 * (x * z + w * y)), axis=-1),
+        np.stack((2 * (x * y + w * z), 1 - 2 * (x * x + z * z), 2 * (y * z - w * x)), axis=-1),
+        np.stack((2 * (x * z - w * y), 2 * (y * z + w * x), 1 - 2 * (x * x + y * y)), axis=-1)), axis=-2)
+
+
+def batch_matrix_to_quaternion(m: np.ndarray) -> np.ndarray:
+    """ batched mat3_normalized_to_quat of blender: unit quaternions (... x 4, w x y z)
+    of matrices with normalized columns, which don't have to be orthogonal. """
+    m00, m01, m02 = m[..., 0, 0], m[..., 0, 1], m[..., 0, 2]
+    m10, m11, m12 = m[..., 1, 0], m[..., 1, 1], m[..., 1, 2]
+    m20, m21, m22 = m[..., 2, 0], m[..., 2, 1], m[..., 2, 2]
+
+    # the largest component gets computed from the trace, the sign doesn't change the rotation
+    cases = [
+        (1 + m00 - m11 - m22, lambda t: (m21 - m12, t, m10 + m01, m02 + m20)),
+        (1 - m00 + m11 - m22, lambda t: (m02 - m20, m10 + m01, t, m21 + m12)),
+        (1 - m00 - m11 + m22, lambda t: (m10 - m01, m02 + m20, m21 + m12, t)),
+        (1 + m00 + m11 + m22, lambda t: (t, m21 - m12, m02 - m20, m10 - m01)),
+    ]
+    case = np.where(m22 < 0, np.where(m00 > m11, 0, 1), np.where(m00 < -m11, 2, 3))
+
+    quat = np.zeros(m.shape[:-2] + (4,))
+    for i, (trace, components) in enumerate(cases):
+        mask = case == i
+        trace = np.maximum(trace, 0)
+        quat[mask] = (np.stack(components(trace), axis=-1)[mask]
+                      / (2 * np.sqrt(trace[mask]))[..., None])
+    return batch_normalize(quat)
+
+
+def batch_rotation_from_rows(tangent: np.ndarray, normal: np.ndarray, binormal: np.ndarray) -> np.ndarray:
+    """ batched generate_matrix & decompose_matrix: returns the inverted rotation of matrices
+    with the given rows (N x 3 x 3). Like blenders decomposition, the columns get normalized
+    (negated for mirrored matrices) and converted to a quaternion, so rows which aren't
+    orthogonal result in the same rotation. """
+    matrix = np.stack((tangent, normal, binormal), axis=-2)
+    rotation = np.full(matrix.shape, np.nan)
+    valid = np.isfinite(matrix).all(axis=(-2, -1))
+
+    columns = matrix[valid] / np.linalg.norm(matrix[valid], axis=-2, keepdims=True)
+    columns[np.linalg.det(columns) < 0] *= -1
+    # inverted rotation
+    quat = batch_matrix_to_quaternion(columns)
+    rotation[valid] = np.swapaxes(batch_quaternion_to_matrix(quat), -2, -1)
+    return rotation
+
+
+def batch_quaternion_multiply(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """ hamilton product of quaternions (... x 4, w x y z). """
+    aw, ax, ay, az = np.moveaxis(a, -1, 0)
+    bw, bx, by, bz = np.moveaxis(b, -1, 0)
+    return np.stack((
+        aw * bw - ax * bx - ay * by - az * bz,
+        aw * bx + ax * bw + ay * bz - az * by,
+        aw * by + ay * bw + az * bx - ax * bz,
+        aw * bz + az * bw + ax * by - ay * bx), axis=-1)
+
+
+def batch_track_rotation(vectors: np.ndarray, track: str = 'Z', up: str = 'Y') -> np.ndarray:
+    """ batched rotate_towards: rotations (N x 3 x 3) of Vector.to_track_quat(track, up).
+    Port of vec_to_quat of blender, the track axis gets rotated onto the vectors
+    and rolled around them to align the up axis. """
+    axis = {'X': 0, 'Y': 1, 'Z': 2}
+    track_axis, up_axis = axis[track[-1]], axis[up]
+
+    tvec = vectors * (-1 if track[0] == '-' else 1)
+    length = np.linalg.norm(tvec, axis=-1)
+    x, y, z = np.moveaxis(tvec, -1, 0)
+
+    # rotation axis & cos of the shortest rotation of the track axis onto the vectors
+    eps = 1e-4
+    zero = np.zeros_like(x)
+    if track_axis == 0:
+        nor = np.stack((zero, -z, y), axis=-1)
+        nor[np.abs(y) + np.abs(z) < eps] = (0, 1, 0)
+    elif track_axis == 1:
+        nor = np.stack((z, zero, -x), axis=-1)
+        nor[np.abs(x) + np.abs(z) < eps] = (0, 0, 1)
+    else:
+        nor = np.stack((-y, x, zero), axis=-1)
+        nor[np.abs(x) + np.abs(y) < eps] = (1, 0, 0)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        co = tvec[..., track_axis] / length
+        half_angle = .5 * np.arccos(np.clip(co, -1, 1))
+        quat = np.concatenate((np.cos(half_angle)[..., None],
+                               batch_normalize(nor) * np.sin(half_angle)[..., None]), axis=-1)
+
+        if track_axis != up_axis:
+            # roll around the vectors, depending on the rotated z axis
+            fx, fy, fz = np.moveaxis(batch_quaternion_to_matrix(quat)[..., 2], -1, 0)
+            angle = {
+                (0, 1): .5 * np.arctan2(fz, fy),
+                (0, 2): -.5 * np.arctan2(fy, fz),
+                (1, 0): -.5 * np.arctan2(fz, fx),
+                (1, 2): .5 * np.arctan2(fx, fz),
+                (2, 0): .5 * np.arctan2(-fy, -fx),
+                (2, 1): -.5 * np.arctan2(-fx, -fy),
+            }[(track_axis, up_axis)]
+            roll = np.concatenate((np.cos(angle)[..., None], tvec * (np.sin(angle) / length)[..., None]), axis=-1)
+            quat = batch_quaternion_multiply(roll, quat)
+
+    # zero length vectors don't rotate
+    quat[length == 0] = (1, 0, 0, 0)
+    return batch_quaternion_to_matrix(quat)
+
+
+def batch_matrix_to_eulers(rotation: np.ndarray):
+    """ both XYZ euler solutions of rotation matrices (... x 3 x 3). """
+    cy = np.hypot(rotation[..., 0, 0], rotation[..., 1, 0])
+    sy = -rotation[..., 2, 0]
+    e1 = np.stack((np.arctan2(rotation[..., 2, 1], rotation[..., 2, 2]),
+                   np.arctan2(sy, cy),
+                   np.arctan2(rotation[..., 1, 0], rotation[..., 0, 0])), axis=-1)
+    e2 = np.stack((np.arctan2(-rotation[..., 2, 1], -rotation[..., 2, 2]),
+                   np.arctan2(sy, -cy),
+                   np.arctan2(-rotation[..., 1, 0], -rotation[..., 0, 0])), axis=-1)
+    return e1, e2
+
+
+def batch_compatible_eulers(rotation: np.ndarray, prev: np.ndarray = None) -> np.ndarray:
+    """ batched to_euler with combat: converts rotations (N frames x ... x 3 x 3) to XYZ eulers,
+    picking the solution closest to the previous frame to avoid discontinuity.
+    prev: eulers of the frame before the batch. Frames containing nan are left as nan. """
+    e1, e2 = batch_matrix_to_eulers(rotation)
+    eulers = np.full(e1.shape, np.nan)
+    for i in range(len(e1)):
+        if not np.isfinite(e1[i]).all():
+            continue
+
+        if prev is None:
+            # without combat the solution with the smaller rotation gets used
+            pick = np.abs(e1[i]).sum(axis=-1) <= np.abs(e2[i]).sum(axis=-1)
+            eulers[i] = np.where(pick[..., None], e1[i], e2[i])
+        else:
+            c1 = e1[i] - 2 * np.pi * np.round((e1[i] - prev) / (2 * np.pi))
+            c2 = e2[i] - 2 * np.pi * np.round((e2[i] - prev) / (2 * np.pi))
+            pick = np.abs(c1 - prev).sum(axis=-1) <= np.abs(c2 - prev).sum(axis=-1)
+            eulers[i] = np.where(pick[..., None], c1, c2)
+        prev = eulers[i]
+    return eulers
+
+
+# endregion
+
+
 def remap_slope(value, min_in, max_in, min_out, max_out):
     slope = (max_out - min_out) / (max_in - min_in)
     offset = min_out - slope * min_in
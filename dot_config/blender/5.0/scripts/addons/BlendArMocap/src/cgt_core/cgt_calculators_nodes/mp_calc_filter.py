@@ -0,0 +1,270 @@
+from __future__ import annotations
+from typing import Dict, Optional
+import numpy as np
+
+from ..cgt_patterns import cgt_nodes
+from ..cgt_patterns.cgt_landmarks import LandmarkFrame
+
+
+class OneEuroFilter:
+    """ Adaptive low pass filter for (landmarks x 3) arrays (Casiez et al. 2012).
+    Slow motions get smoothed with min_cutoff, beta raises the cutoff with the speed to reduce lag. """
+
+    def __init__(self, shape, min_cutoff: float = 1.0, beta: float = .1, d_cutoff: float = 1.0):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.initialized = False
+
+        self.x = np.zeros(shape)
+        self.dx = np.zeros(shape)
+        self._delta = np.zeros(shape)
+        self._alpha = np.zeros(shape)
+
+    def reset(self):
+        self.initialized = False
+
+    @staticmethod
+    def alpha(cutoff, dt: float):
+        # smoothing factor of an exponential filter with the cutoff frequency
+        return 1.0 / (1.0 + 1.0 / (2 * np.pi * cutoff * dt))
+
+    def __call__(self, x: np.ndarray, dt: float) -> np.ndarray:
+        if not self.initialized:
+            self.x[:] = x
+            self.dx[:] = 0
+            self.initialized = True
+            return self.x
+
+        # filtered derivative
+        delta = np.subtract(x, self.x, out=self._delta)
+        delta /= dt
+        delta -= self.dx
+        delta *= self.alpha(self.d_cutoff, dt)
+        self.dx += delta
+
+        # cutoff depending on the speed
+        alpha = np.abs(self.dx, out=self._alpha)
+        alpha *= self.beta
+        alpha += self.min_cutoff
+        alpha *= 2 * np.pi * dt
+        alpha /= alpha + 1
+
+        delta = np.subtract(x, self.x, out=self._delta)
+        delta *= alpha
+        self.x += delta
+        return self.x
+
+
+class KalmanFilter:
+    """ Constant velocity kalman filter for every coordinate of (landmarks x 3) arrays.
+    Higher process noise follows fast motions, higher measurement noise smooths more. """
+
+    def __init__(self, shape, process_noise: float = 1.0, measurement_noise: float = .01):
+        self.process_noise = process_noise
+        self.measurement_noise = measurement_noise
+        self.initialized = False
+
+        # state and symmetric covariance per coordinate
+        self.x = np.zeros(shape)
+        self.v = np.zeros(shape)
+        self.p00 = np.zeros(shape)
+        self.p01 = np.zeros(shape)
+        self.p11 = np.zeros(shape)
+        self._gain = np.zeros(shape)
+        self._residual = np.zeros(shape)
+
+    def reset(self):
+        self.initialized = False
+
+    def __call__(self, x: np.ndarray, dt: float) -> np.ndarray:
+        if not self.initialized:
+            self.x[:] = x
+            self.v[:] = 0
+            self.p00[:] = self.measurement_noise
+            self.p01[:] = 0
+            self.p11[:] = self.process_noise
+            self.initialized = True
+            return self.x
+
+        # predict
+        q = self.process_noise
+        self.x += self.v * dt
+        self.p00 += dt * (2 * self.p01 + dt * self.p11) + q * dt ** 3 / 3
+        self.p01 += dt * self.p11 + q * dt ** 2 / 2
+        self.p11 += q * dt
+
+        # update
+        residual = np.subtract(x, self.x, out=self._residual)
+        gain = np.add(self.p00, self.measurement_noise, out=self._gain)
+        np.divide(1, gain, out=gain)
+        k0, k1 = self.p00 * gain, self.p01 * gain
+        self.x += k0 * residual
+        self.v += k1 * residual
+        self.p11 -= k1 * self.p01
+        self.p01 *= 1 - k0
+        self.p00 *= 1 - k0
+        return self.x
+
+
+def savgol_coefficients(window_length: int, polyorder: int, pos: int) -> np.ndarray:
+    """ Coefficients evaluating the least squares polynomial fit of a window at pos. """
+    t = np.arange(window_length) - pos
+    basis = np.vander(t, polyorder + 1, increasing=True)
+    return np.linalg.pinv(basis)[0]
+
+
+def savgol_filter(points: np.ndarray, window_length: int = 9, polyorder: int = 2) -> np.ndarray:
+    """ Savitzky-Golay filter along the first axis of (frames x ...) arrays.
+    The edges get evaluated on the first and last window, windows containing nan keep the raw values. """
+    n = len(points)
+    window_length = min(window_length | 1, n if n % 2 else n - 1)
+    if window_length <= polyorder:
+        return points.copy()
+
+    half = window_length // 2
+    result = np.empty(points.shape)
+
+    # centered windows
+    windows = np.lib.stride_tricks.sliding_window_view(points, window_length, axis=0)
+    result[half:n - half] = windows @ savgol_coefficients(window_length, polyorder, half)
+
+    # edges
+    for pos in range(half):
+        result[pos] = np.tensordot(savgol_coefficients(window_length, polyorder, pos), points[:window_length], axes=1)
+        result[n - half + pos] = np.tensordot(
+            savgol_coefficients(window_length, polyorder, half + 1 + pos), points[n - window_length:], axes=1)
+
+    return np.where(np.isfinite(result), result, points)
+
+
+class SavgolFilter:
+    """ Causal Savitzky-Golay filter, evaluates the polynomial fit at the end of the window.
+    The batch (offline) filter evaluates centered windows instead. """
+
+    def __init__(self, shape, window_length: int = 9, polyorder: int = 2):
+        self.window_length = max(window_length, polyorder + 2)
+        self.coefficients = savgol_coefficients(self.window_length, polyorder, self.window_length - 1)
+        self.buffer = np.zeros((self.window_length, *shape))
+        self.count = 0
+        self.x = np.zeros(shape)
+
+    def reset(self):
+        self.count = 0
+
+    def __call__(self, x: np.ndarray, dt: float) -> np.ndarray:
+        # ring buffer, the oldest sample gets replaced
+        self.buffer[self.count % self.window_length] = x
+        self.count += 1
+        if self.count < self.window_length:
+            self.x[:] = x
+            return self.x
+
+        start = self.count % self.window_length
+        coefficients = np.roll(self.coefficients, start)
+        self.x[:] = np.tensordot(coefficients, self.buffer, axes=1)
+        return self.x
+
+
+class LandmarkFilter(cgt_nodes.CalculatorNode):
+    """ Temporal filter for landmark frames, filters the present body parts in place.
+    Filters of parts which got lost restart once the part gets detected again. """
+    NONE = 'NONE'
+    ONE_EURO = 'ONE_EURO'
+    KALMAN = 'KALMAN'
+    SAVGOL = 'SAVGOL'
+
+    def __init__(self, method: str = ONE_EURO, fps: float = 30.0, min_cutoff: float = 1.0, beta: float = .1,
+                 process_noise: float = 1.0, measurement_noise: float = .01,
+                 window_length: int = 9, polyorder: int = 2):
+        self.method = method
+        self.fps = fps
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.process_noise = process_noise
+        self.measurement_noise = measurement_noise
+        self.window_length = window_length
+        self.polyorder = polyorder
+
+        self.filters: Dict[str, object] = {}
+        self.prev_frame: Optional[int] = None
+
+    def create_filter(self, shape):
+        if self.method == self.ONE_EURO:
+            return OneEuroFilter(shape, self.min_cutoff, self.beta)
+        elif self.method == self.KALMAN:
+            return KalmanFilter(shape, self.process_noise, self.measurement_noise)
+        elif self.method == self.SAVGOL:
+            return SavgolFilter(shape, self.window_length, self.polyorder)
+        raise KeyError(f"Filter method not available: {self.method}")
+
+    def get_filter(self, name: str, shape):
+        f = self.filters.get(name)
+        if f is None or f.x.shape != shape:
+            f = self.filters[name] = self.create_filter(shape)
+        return f
+
+    def time_step(self, frame: int) -> float:
+        """ Time since the previous update in seconds based on the frame numbers. """
+        dt = 1.0 / self.fps
+        if self.prev_frame is not None and frame > self.prev_frame:
+            dt *= frame - self.prev_frame
+        self.prev_frame = frame
+        return dt
+
+    def reset(self):
+        for f in self.filters.values():
+            f.reset()
+        self.prev_frame = None
+
+    def update(self, data: LandmarkFrame, frame: int):
+        if self.method == self.NONE:
+            return data, frame
+
+        dt = self.time_step(frame)
+        for name, present in zip(data.parts, data.present):
+            points = data.points[name]
+            if not present or not np.isfinite(points).all():
+                # incomplete frames pass through unfiltered
+                if name in self.filters:
+                    self.filters[name].reset()
+                continue
+
+            points[:] = self.get_filter(name, points.shape)(points, dt)
+        return data, frame
+
+    def filter_batch(self, points: np.ndarray, name: str) -> np.ndarray:
+        """ Filters (frames x landmarks x 3) arrays of a body part, nan where it hasn't been detected.
+        Savitzky-Golay filters offline using centered windows, stateful filters continue from previous batches. """
+        if self.method == self.NONE or len(points) == 0:
+            return points
+
+        if self.method == self.SAVGOL:
+            return savgol_filter(points, self.window_length, self.polyorder)
+
+        result = np.array(points, dtype=np.float64)
+        f = self.get_filter(name, points.shape[1:])
+        dt = 1.0 / self.fps
+        for i, frame in enumerate(result):
+            if not np.isfinite(frame).all():
+                f.reset()
+                continue
+            frame[:] = f(frame, dt)
+        return result
+
+
+def create_filter(settings, fps: float) -> Optional[LandmarkFilter]:
+    """ Creates a filter from the filter properties, None if filtering is disabled. """
+    if settings is None or settings.filter_type == LandmarkFilter.NONE:
+        return None
+
+    return LandmarkFilter(
+        settings.filter_type, fps,
+        min_cutoff=settings.min_cutoff, beta=settings.beta,
+        process_noise=settings.process_noise, measurement_noise=settings.measurement_noise,
+        window_length=settings.window_length, polyorder=settings.polyorder)
+
+
+def scene_filter(scene) -> Optional[LandmarkFilter]:
+    """ Temporal landmark filter from the filter settings of the scene, None if disabled. """
+    return create_filter(getattr(scene, "cgtinker_filter", None), scene.render.fps / scene.render.fps_base)
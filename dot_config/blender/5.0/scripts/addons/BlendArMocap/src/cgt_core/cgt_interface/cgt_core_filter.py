@@ -0,0 +1,98 @@
+import bpy
+
+
+class CGT_PG_Filter_Properties(bpy.types.PropertyGroup):
+    filter_type: bpy.props.EnumProperty(
+        name="Filter",
+        description="Temporal filter applied to the landmarks before calculating rotations.",
+        items=(
+            ("NONE", "None", "Don't filter landmarks"),
+            ("ONE_EURO", "One Euro", "Adaptive low pass, smooths slow motions while keeping fast motions responsive"),
+            ("KALMAN", "Kalman", "Constant velocity kalman filter"),
+            ("SAVGOL", "Savitzky-Golay", "Polynomial fit over a window of frames, centered when loading "
+                                         "data at once, trailing while detecting"),
+        ),
+        default="NONE"
+    )
+
+    min_cutoff: bpy.props.FloatProperty(
+        name="Min Cutoff",
+        description="Cutoff frequency for slow motions, lower values smooth more.",
+        min=0.01,
+        max=10.0,
+        default=1.0
+    )
+
+    beta: bpy.props.FloatProperty(
+        name="Beta",
+        description="Raises the cutoff with the speed of the landmarks, higher values reduce lag.",
+        min=0.0,
+        max=10.0,
+        default=0.1
+    )
+
+    process_noise: bpy.props.FloatProperty(
+        name="Process Noise",
+        description="Expected change of the velocity, higher values follow fast motions.",
+        min=0.0001,
+        max=100.0,
+        default=1.0
+    )
+
+    measurement_noise: bpy.props.FloatProperty(
+        name="Measurement Noise",
+        description="Expected noise of the detection, higher values smooth more.",
+        min=0.00001,
+        max=1.0,
+        precision=5,
+        default=0.01
+    )
+
+    window_length: bpy.props.IntProperty(
+        name="Window",
+        description="Frames of the polynomial fit.",
+        min=3,
+        max=61,
+        default=9
+    )
+
+    polyorder: bpy.props.IntProperty(
+        name="Order",
+        description="Order of the polynomial fit.",
+        min=1,
+        max=5,
+        default=2
+    )
+
+
+def draw_filter_settings(layout, context):
+    """ Draws the filter settings, used by the modules providing landmarks. """
+    settings = context.scene.cgtinker_filter  # noqa
+    layout.row().prop(settings, "filter_type")
+    if settings.filter_type == 'ONE_EURO':
+        layout.row().prop(settings, "min_cutoff")
+        layout.row().prop(settings, "beta")
+    elif settings.filter_type == 'KALMAN':
+        layout.row().prop(settings, "process_noise")
+        layout.row().prop(settings, "measurement_noise")
+    elif settings.filter_type == 'SAVGOL':
+        row = layout.row(align=True)
+        row.prop(settings, "window_length")
+        row.prop(settings, "polyorder")
+
+
+classes = [
+    CGT_PG_Filter_Properties,
+]
+
+
+def register():
+    for cls in classes:
+        bpy.utils.register_class(cls)
+    bpy.types.Scene.cgtinker_filter = bpy.props.PointerProperty(type=CGT_PG_Filter_Properties)
+
+
+def unregister():
+    del bpy.types.Scene.cgtinker_filter  # noqa
+    for cls in reversed(classes):
+        bpy.utils.unregister_class(cls)
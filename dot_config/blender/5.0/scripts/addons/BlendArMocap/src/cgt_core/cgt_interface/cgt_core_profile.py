@@ -0,0 +1,107 @@
+import bpy
+from pathlib import Path
+
+from . import cgt_core_panel
+from ..cgt_utils.cgt_timers import registry
+
+
+def update_profiling(self, context):
+    registry.enabled = self.cgtinker_profiling
+
+
+class OT_CGT_Export_Profile(bpy.types.Operator):
+    """ Export the recorded timings as json. """
+    bl_idname = "wm.cgt_export_profile"
+    bl_label = "Export BlendArMocap Profile"
+    bl_options = {'REGISTER'}
+
+    filename_ext = ".json"
+    filter_glob: bpy.props.StringProperty(default="*.json;", options={'HIDDEN'}, )
+    filepath: bpy.props.StringProperty(maxlen=1024, subtype='FILE_PATH', options={'HIDDEN', 'SKIP_SAVE'})
+
+    def invoke(self, context, event):
+        if not self.filepath:
+            self.filepath = "cgt_profile.json"
+        context.window_manager.fileselect_add(self)
+        return {'RUNNING_MODAL'}
+
+    def execute(self, context):
+        path = Path(bpy.path.abspath(self.filepath))
+        if path.suffix != self.filename_ext:
+            path = path.with_suffix(self.filename_ext)
+
+        registry.export(str(path))
+        self.report({'INFO'}, f"Exported profile to {str(path)}")
+        return {'FINISHED'}
+
+
+class OT_CGT_Clear_Profile(bpy.types.Operator):
+    """ Clear the recorded timings. """
+    bl_idname = "wm.cgt_clear_profile"
+    bl_label = "Clear BlendArMocap Profile"
+    bl_options = {'REGISTER'}
+
+    def execute(self, context):
+        registry.clear()
+        return {'FINISHED'}
+
+
+class PT_UI_CGT_Profile(cgt_core_panel.DefaultPanel, bpy.types.Panel):
+    bl_label = "Profiling"
+    bl_parent_id = "UI_PT_CGT_Panel"
+    bl_idname = "UI_PT_CGT_Profile"
+    bl_options = {'DEFAULT_CLOSED'}
+    # below the panels of the modules
+    bl_order = 100
+
+    # sections displayed, sorted by total time
+    max_rows = 12
+
+    def draw(self, context):
+        layout = self.layout
+        layout.row().prop(context.window_manager, "cgtinker_profiling")
+
+        stats = registry.stats()
+        if not stats:
+            layout.row().label(text="No timings recorded.")
+            return
+
+        col = layout.column(align=True)
+        row = col.row()
+        row.label(text="Section")
+        row.label(text="Mean / P95 ms")
+        row.label(text="Calls")
+        for entry in stats[:self.max_rows]:
+            row = col.row()
+            row.label(text=entry["name"])
+            row.label(text=f"{entry['mean_ms']:.2f} / {entry['p95_ms']:.2f}")
+            row.label(text=str(entry["count"]))
+
+        row = layout.row(align=True)
+        row.operator("wm.cgt_export_profile", text="Export", icon='EXPORT')
+        row.operator("wm.cgt_clear_profile", text="Clear", icon='TRASH')
+
+
+classes = [
+    OT_CGT_Export_Profile,
+    OT_CGT_Clear_Profile,
+    PT_UI_CGT_Profile,
+]
+
+
+def register():
+    for cls in classes:
+        bpy.utils.register_class(cls)
+    bpy.types.WindowManager.cgtinker_profiling = bpy.props.BoolProperty(
+        name="Profile",
+        description="Record timings of capture, inference, calculators and keyframing. Adds a small overhead.",
+        default=False,
+        update=update_profiling
+    )
+
+
+def unregister():
+    registry.enabled = False
+    del bpy.types.WindowManager.cgtinker_profiling  # noqa
+    for cls in reversed(classes):
+        bpy.utils.unregister_class(cls)
@@ -1,7 +1,9 @@
-from . import cgt_core_panel
+from . import cgt_core_panel, cgt_core_filter, cgt_core_profile
 
 classes = [
-    cgt_core_panel
+    cgt_core_panel,
+    cgt_core_filter,
+    cgt_core_profile,
 ]
 
 
@@ -0,0 +1,60 @@
+from __future__ import annotations
+from typing import List, Any, Optional
+import numpy as np
+
+from ..cgt_bpy import cgt_fc_actions
+from . import mp_hand_out, mp_face_out, mp_pose_out
+
+
+def apply_batch_result(result, objects: List[Any], frames: np.ndarray, append: bool = False):
+    """ Writes the locations and euler rotations of a calculator BatchResult
+    directly to the f-curves of the objects, skipping frames without results.
+    Appends to the existing keyframes when results are written in multiple batches. """
+    frames = np.asarray(frames)[result.valid]
+    if len(frames) == 0:
+        return
+
+    # overwrite action by default
+    locations = result.locations[result.valid]
+    for idx in range(min(locations.shape[1], len(objects))):
+        helper = cgt_fc_actions.create_actions([objects[idx]], overwrite=not append)[0]
+        write = helper.foreach_append if append else helper.foreach_set
+        write('location', frames, *locations[:, idx].T)
+
+    rotations = result.rotations[result.valid]
+    for k, idx in enumerate(result.rotation_indices):
+        helper = cgt_fc_actions.create_actions([objects[idx]], overwrite=False)[0]
+        write = helper.foreach_append if append else helper.foreach_set
+        write('rotation_euler', frames, *rotations[:, k].T)
+
+
+def clear_batch_actions(hands: bool = False, face: bool = False, pose: bool = False):
+    """ Replaces the actions of the output empties with empty actions. Call once before
+    appending results in multiple batches, so no keyframes of previous imports remain. """
+    objects = []
+    if hands:
+        hand_output = mp_hand_out.CgtMPHandOutNode()
+        objects += hand_output.left_hand + hand_output.right_hand
+    if pose:
+        objects += mp_pose_out.MPPoseOutputNode().pose
+    if face:
+        objects += mp_face_out.MPFaceOutputNode().face
+    cgt_fc_actions.create_actions(objects, overwrite=True)
+
+
+def apply_batch_results(frames: np.ndarray, hand_results: Optional[tuple] = None,
+                        face_results=None, pose_results=None, append: bool = False):
+    """ Writes batched calculator results (hand results as left, right tuple) to the output empties. """
+    if hand_results is not None:
+        hand_output = mp_hand_out.CgtMPHandOutNode()
+        left_hand, right_hand = hand_results
+        apply_batch_result(left_hand, hand_output.left_hand, frames, append)
+        apply_batch_result(right_hand, hand_output.right_hand, frames, append)
+
+    if pose_results is not None:
+        pose_output = mp_pose_out.MPPoseOutputNode()
+        apply_batch_result(pose_results, pose_output.pose, frames, append)
+
+    if face_results is not None:
+        face_output = mp_face_out.MPFaceOutputNode()
+        apply_batch_result(face_results, face_output.face, frames, append)
@@ -26,11 +26,5 @@ class MPFaceOutputNode(mp_out_utils.BpyOutputNode):
         cgt_collection.add_list_to_collection(self.col_name+"_DATA", self.face[:468], self.col_name)
 
     def update(self, data, frame):
-        loc, rot, sca = data
-        for data, method in zip([loc, rot, sca], [self.translate, self.euler_rotate, self.scale]):
-            try:
-                method(self.face, data, frame)
-            except IndexError:
-                pass
+        self.apply_result(self.face, data, frame)
         return data, frame
-
@@ -25,16 +25,8 @@ class CgtMPHandOutNode(mp_out_utils.BpyOutputNode):
         cgt_collection.add_list_to_collection(self.col_name+".L", self.left_hand, self.parent_col)
         cgt_collection.add_list_to_collection(self.col_name+".R", self.right_hand, self.parent_col)
 
-    def split(self, data):
-        left_hand_data, right_hand_data = data
-        return [[self.left_hand, left_hand_data], [self.right_hand, right_hand_data]]
-
     def update(self, data, frame):
-        loc, rot, sca = data
-        for data, method in zip([loc, rot, sca], [self.translate, self.euler_rotate, self.scale]):
-            for hand, chunk in self.split(data):
-                try:
-                    method(hand, chunk, frame)
-                except IndexError:
-                    pass
+        left_hand, right_hand = data
+        self.apply_result(self.left_hand, left_hand, frame)
+        self.apply_result(self.right_hand, right_hand, frame)
         return data, frame
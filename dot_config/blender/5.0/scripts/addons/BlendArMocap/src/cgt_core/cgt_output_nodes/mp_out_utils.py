@@ -1,63 +1,94 @@
 from __future__ import annotations
-from typing import List
+from typing import List, Optional
 import logging
 from abc import abstractmethod
 
 import bpy.types
+import numpy as np
 
 from ..cgt_naming import COLLECTIONS
-from mathutils import Vector, Quaternion, Euler
 from ..cgt_patterns import cgt_nodes
+from ..cgt_bpy import cgt_fc_actions
+from ..cgt_utils.cgt_timers import registry
+
+
+class KeyframeBuffer:
+    """ Accumulates keyframes per object and data path in preallocated arrays
+    and writes them in chunks to the f-curves, instead of inserting every keyframe. """
+
+    def __init__(self, chunk_size: int = 256):
+        self.chunk_size = chunk_size
+        # (object pointer, data_path) -> [object, samples [frame, *values], count]
+        self.buffers = {}
+
+    def add(self, ob: bpy.types.Object, data_path: str, frame: int, values):
+        key = (ob.as_pointer(), data_path)
+        buffer = self.buffers.get(key)
+        if buffer is None:
+            samples = np.empty((self.chunk_size, 1 + len(values)), dtype=np.float32)
+            buffer = self.buffers[key] = [ob, samples, 0]
+
+        samples, count = buffer[1], buffer[2]
+        samples[count, 0] = frame
+        samples[count, 1:] = values
+        buffer[2] = count + 1
+
+        if buffer[2] == self.chunk_size:
+            self.flush_buffer(key)
+
+    def flush_buffer(self, key):
+        ob, samples, count = self.buffers[key]
+        if count == 0:
+            return
+
+        buffer = samples[:count]
+        self.buffers[key][2] = 0
+        try:
+            f_curves = cgt_fc_actions.ensure_fcurves(ob, key[1], buffer.shape[1] - 1)
+        except ReferenceError:
+            # object got removed while detecting
+            del self.buffers[key]
+            return
+
+        with registry.section("keyframing/flush"):
+            for i, fc in enumerate(f_curves, 1):
+                cgt_fc_actions.append_keyframes(fc, buffer[:, 0], buffer[:, i])
+
+    def flush(self):
+        """ Writes all buffered keyframes. """
+        for key in list(self.buffers):
+            self.flush_buffer(key)
 
 
 class BpyOutputNode(cgt_nodes.OutputNode):
     parent_col = COLLECTIONS.drivers
-    prev_rotation = {}
+    # set while detection to buffer keyframes instead of inserting them
+    keyframe_buffer: Optional[KeyframeBuffer] = None
+
+    @staticmethod
+    def keyframe(ob: bpy.types.Object, data_path: str, frame: int):
+        buffer = BpyOutputNode.keyframe_buffer
+        if buffer is None:
+            ob.keyframe_insert(data_path=data_path, frame=frame)
+        else:
+            buffer.add(ob, data_path, frame, getattr(ob, data_path))
 
     @abstractmethod
     def update(self, data, frame):
         pass
 
-    @staticmethod
-    def translate(target: List[bpy.types.Object], data, frame: int):
-        """ Translates and keyframes bpy empty objects. """
-        try:
-            for landmark in data:
-                target[landmark[0]].location = Vector((landmark[1]))
-                target[landmark[0]].keyframe_insert(data_path="location", frame=frame)
-
-        except IndexError:
-            logging.debug(f"missing translation index at {frame}")
-            pass
+    def apply_result(self, target: List[bpy.types.Object], result, frame: int):
+        """ Sets and keyframes locations and euler rotations of a single frame calculator BatchResult. """
+        if result is None or not result.valid[-1]:
+            return
 
-    @staticmethod
-    def scale(target, data, frame):
-        try:
-            for landmark in data:
-                target[landmark[0]].scale = Vector((landmark[1]))
-                target[landmark[0]].keyframe_insert(data_path="scale", frame=frame)
-        except IndexError:
-            logging.debug(f"missing scale index at {data}, {frame}")
-            pass
+        for ob, location in zip(target, result.locations[-1].tolist()):
+            ob.location = location
+            self.keyframe(ob, "location", frame)
 
-    @staticmethod
-    def quaternion_rotate(target, data, frame):
-        """ Translates and keyframes bpy empty objects. """
-        try:
-            for landmark in data:
-                target[landmark[0]].rotation_quaternion = landmark[1]
-                target[landmark[0]].keyframe_insert(data_path="rotation_quaternion", frame=frame)
-        except IndexError:
-            logging.debug(f"missing quat_euler_rotate index {data}, {frame}")
-            pass
-
-    def euler_rotate(self, target, data, frame, idx_offset=0):
-        """ Translates and keyframes bpy empty objects. """
-        try:
-            for landmark in data:
-                target[landmark[0]].rotation_euler = landmark[1]
-                target[landmark[0]].keyframe_insert(data_path="rotation_euler", frame=frame)
-                self.prev_rotation[landmark[0] + idx_offset] = landmark[1]
-        except IndexError:
-            logging.debug(f"missing euler_rotate index at {data}, {frame}")
-            pass
\ No newline at end of file
+        for idx, rotation in zip(result.rotation_indices, result.rotations[-1].tolist()):
+            if idx >= len(target):
+                logging.debug(f"missing euler_rotate index {idx} at {frame}")
+                continue
+            target[idx].rotation_euler = rotation
+            self.keyframe(target[idx], "rotation_euler", frame)
@@ -22,11 +22,5 @@ class MPPoseOutputNode(mp_out_utils.BpyOutputNode):
         cgt_collection.add_list_to_collection(self.col_name, self.pose, self.parent_col)
 
     def update(self, data, frame):
-        loc, rot, sca = data
-        for data, method in zip([loc, rot, sca], [self.translate, self.euler_rotate, self.scale]):
-            try:
-                method(self.pose, data, frame)
-            except IndexError:
-                pass
+        self.apply_result(self.pose, data, frame)
         return data, frame
-
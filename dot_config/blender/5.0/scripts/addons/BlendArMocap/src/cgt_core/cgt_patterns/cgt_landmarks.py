@@ -0,0 +1,106 @@
+from __future__ import annotations
+from typing import Dict, Iterable, Optional, Tuple
+import numpy as np
+
+
+# body parts and their landmark count, order as in freemocap sessions
+Layout = Tuple[Tuple[str, int], ...]
+POSE: Layout = (('pose', 33),)
+HAND: Layout = (('left_hand', 21), ('right_hand', 21))
+FACE: Layout = (('face', 468),)
+FACE_REFINED: Layout = (('face', 478),)
+HOLISTIC: Layout = POSE + HAND + FACE
+
+
+def face_layout(refine_face_landmarks: bool = False) -> Layout:
+    return FACE_REFINED if refine_face_landmarks else FACE
+
+
+def holistic_layout(refine_face_landmarks: bool = False) -> Layout:
+    return POSE + HAND + face_layout(refine_face_landmarks)
+
+
+class LandmarkFrame:
+    """ Landmarks of a detected frame.
+    Every body part of the layout is stored as a fixed-shape float32 (landmarks x 3) array,
+    the presence mask marks the parts which got detected. The arrays of parts which
+    aren't present hold stale values and must not be used. """
+    __slots__ = ('parts', 'points', 'present')
+
+    def __init__(self, layout: Layout):
+        self.parts = tuple(name for name, _ in layout)
+        self.points: Dict[str, np.ndarray] = {
+            name: np.zeros((count, 3), dtype=np.float32) for name, count in layout}
+        self.present = np.zeros(len(self.parts), dtype=bool)
+
+    @classmethod
+    def from_parts(cls, layout: Layout, **parts) -> LandmarkFrame:
+        """ Creates a frame from part name -> landmarks, empty parts aren't present. """
+        frame = cls(layout)
+        for name, points in parts.items():
+            if points is not None and len(points) > 0:
+                frame.set(name, points)
+        return frame
+
+    @property
+    def layout(self) -> Layout:
+        return tuple((name, len(self.points[name])) for name in self.parts)
+
+    def is_present(self, name: str) -> bool:
+        return name in self.points and bool(self.present[self.parts.index(name)])
+
+    def any(self) -> bool:
+        return bool(self.present.any())
+
+    def set(self, name: str, points: Iterable):
+        """ Sets the landmarks of a part, landmarks exceeding the layout get ignored. """
+        target = self.points[name]
+        points = np.asarray(points, dtype=np.float32)[:len(target)]
+        target[:len(points)] = points
+        self.present[self.parts.index(name)] = True
+
+    def get(self, name: str) -> Optional[np.ndarray]:
+        """ Landmarks of a part, None if the part hasn't been detected. """
+        if not self.is_present(name):
+            return None
+        return self.points[name]
+
+    def as_batch(self, name: str, count: int = None) -> np.ndarray:
+        """ Landmarks of a part as (1 x landmarks x 3) float64 batch
+        for the batched calculators, nan if the part hasn't been detected. """
+        if count is None:
+            count = len(self.points[name]) if name in self.points else 0
+        batch = np.full((1, count, 3), np.nan)
+        points = self.get(name)
+        if points is not None:
+            batch[0, :min(count, len(points))] = points[:count]
+        return batch
+
+    def clear(self):
+        self.present[:] = False
+
+    def copy(self) -> LandmarkFrame:
+        frame = LandmarkFrame.__new__(LandmarkFrame)
+        frame.parts = self.parts
+        frame.points = {name: points.copy() for name, points in self.points.items()}
+        frame.present = self.present.copy()
+        return frame
+
+    def smooth(self, other: LandmarkFrame) -> LandmarkFrame:
+        """ Averages the parts present in both frames in place,
+        parts only present in the other frame get taken over. """
+        for i, name in enumerate(self.parts):
+            if not other.is_present(name):
+                continue
+
+            if self.present[i]:
+                self.points[name] += other.points[name]
+                self.points[name] *= .5
+            else:
+                self.points[name][:] = other.points[name]
+                self.present[i] = True
+        return self
+
+    def __repr__(self):
+        parts = ', '.join(f"{name}{'' if present else ' (missing)'}" for name, present in zip(self.parts, self.present))
+        return f"{self.__class__.__name__}({parts})"
@@ -1,7 +1,9 @@
 from __future__ import annotations
 from abc import ABC, abstractmethod
+from time import perf_counter_ns
 from typing import List, Tuple, Any, Optional
-from ..cgt_utils.cgt_timers import timeit
+from ..cgt_utils.cgt_timers import registry
+from .cgt_landmarks import LandmarkFrame
 import logging
 
 
@@ -10,6 +12,20 @@ class Node(ABC):
     def update(self, data: Any, frame: int) -> Tuple[Optional[Any], int]:
         pass
 
+    @property
+    def profile_name(self) -> str:
+        """ Name of the node in the profiling registry, grouped by the kind of node. """
+        name = self.__dict__.get('_profile_name')
+        if name is None:
+            category = 'node'
+            for cls, m_category in ((InputNode, 'input'), (CalculatorNode, 'calculator'),
+                                    (OutputNode, 'output'), (NodeChainGroup, 'group')):
+                if isinstance(self, cls):
+                    category = m_category
+                    break
+            name = self.__dict__['_profile_name'] = f"{category}/{self.__class__.__name__}"
+        return name
+
     def __str__(self):
         return self.__class__.__name__
 
@@ -20,21 +36,33 @@ class NodeChain(Node):
     def __init__(self):
         self.nodes = list()
 
-    # @timeit
     def update(self, data: Any, frame: int) -> Tuple[Optional[Any], int]:
-        """ Nodes executed inside a chain. """
+        """ Nodes executed inside a chain, timed per node while profiling. """
+        profiling = registry.enabled
         for node in self.nodes:
             # logging.debug(f"{type(node)}, {node.__class__.__name__}.update()") #{data}, {frame})")
             if data is None:
                 return None, frame
 
-            data, frame = node.update(data, frame)
+            if profiling:
+                start = perf_counter_ns()
+                data, frame = node.update(data, frame)
+                registry.record(node.profile_name, perf_counter_ns() - start)
+            else:
+                data, frame = node.update(data, frame)
         return data, frame
 
     def append(self, node: Node):
         """ Appends node to the chain, order does matter. """
         self.nodes.append(node)
 
+    @property
+    def profile_name(self) -> str:
+        # chains are named by their first node
+        if not self.nodes:
+            return "chain/NodeChain"
+        return f"chain/{self.nodes[0].__class__.__name__}"
+
     def __str__(self):
         s = ""
         for node in self.nodes:
@@ -46,20 +74,26 @@ class NodeChain(Node):
 class NodeChainGroup(Node):
     """ Node containing multiple node chains.
         Chains and input got to match
-        Input == Output. """
+        Input == Output.
+        A landmark frame is shared by all chains, each chain processes its own body parts. """
     nodes: List[NodeChain]
 
     def __init__(self):
         self.nodes = list()
 
-    # @timeit
     def update(self, data: Any, frame: int) -> Tuple[Optional[Any], int]:
-        """ Push data in their designed node chains. """
+        """ Push data in their designed node chains, timed per chain while profiling. """
+        if isinstance(data, LandmarkFrame):
+            data = [data] * len(self.nodes)
         assert len(data) == len(self.nodes)
 
+        profiling = registry.enabled
         updated_data = []
         for node_chain, chunk in zip(self.nodes, data):
+            start = perf_counter_ns() if profiling else 0
             c, f = node_chain.update(chunk, frame)
+            if profiling:
+                registry.record(node_chain.profile_name, perf_counter_ns() - start)
             updated_data.append(c)
 
         return updated_data, frame
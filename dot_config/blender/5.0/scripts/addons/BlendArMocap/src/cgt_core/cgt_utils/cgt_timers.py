@@ -1,46 +1,195 @@
 from __future__ import annotations
+import json
+import logging
+from contextlib import contextmanager
 from functools import wraps
-from time import time
-from typing import Callable
-from collections import deque
+from time import perf_counter_ns
+from typing import Callable, Dict, List
+
+
+class Histogram:
+    """ Log-linear (HDR-style) histogram of nanosecond timings.
+    Every power of two is split into 8 sub buckets, so percentiles are
+    accurate to ~6% while the bucket count stays fixed. """
+    SUB_BUCKET_BITS = 3
+    SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+    BUCKETS = (64 - SUB_BUCKET_BITS + 1) * SUB_BUCKETS
+
+    __slots__ = ('counts', 'total')
+
+    def __init__(self):
+        self.counts = [0] * self.BUCKETS
+        self.total = 0
+
+    @classmethod
+    def index(cls, ns: int) -> int:
+        if ns < cls.SUB_BUCKETS:
+            return max(ns, 0)
+        magnitude = ns.bit_length() - 1
+        sub = (ns >> (magnitude - cls.SUB_BUCKET_BITS)) & (cls.SUB_BUCKETS - 1)
+        return (magnitude - cls.SUB_BUCKET_BITS + 1) * cls.SUB_BUCKETS + sub
+
+    @classmethod
+    def value(cls, index: int) -> float:
+        """ Center of the bucket in ns. """
+        if index < cls.SUB_BUCKETS:
+            return float(index)
+        magnitude = index // cls.SUB_BUCKETS + cls.SUB_BUCKET_BITS - 1
+        shift = magnitude - cls.SUB_BUCKET_BITS
+        lower = (cls.SUB_BUCKETS + index % cls.SUB_BUCKETS) << shift
+        return lower + (1 << shift) / 2 if shift > 0 else float(lower)
+
+    def record(self, ns: int):
+        self.counts[self.index(ns)] += 1
+        self.total += 1
+
+    def percentile(self, p: float) -> float:
+        """ Approximated percentile in ns. """
+        if self.total == 0:
+            return 0.
+        target = max(1, -(-self.total * p // 100))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                return self.value(index)
+        return 0.
+
+    def buckets(self) -> Dict[float, int]:
+        """ Non empty buckets as bucket center in ns -> count. """
+        return {self.value(i): count for i, count in enumerate(self.counts) if count > 0}
+
+
+class ProfileEntry:
+    """ Counters and histogram of a profiled section. """
+    __slots__ = ('name', 'count', 'total', 'min', 'max', 'last', 'histogram')
+
+    def __init__(self, name: str):
+        self.name = name
+        self.count = 0
+        self.total = 0
+        self.min = 0
+        self.max = 0
+        self.last = 0
+        self.histogram = Histogram()
+
+    def record(self, ns: int):
+        if self.count == 0 or ns < self.min:
+            self.min = ns
+        if ns > self.max:
+            self.max = ns
+        self.count += 1
+        self.total += ns
+        self.last = ns
+        self.histogram.record(ns)
+
+    def stats(self) -> dict:
+        ms = 1e-6
+        return {
+            "name": self.name,
+            "count": self.count,
+            "total_ms": self.total * ms,
+            "mean_ms": self.total / max(self.count, 1) * ms,
+            "p50_ms": self.histogram.percentile(50) * ms,
+            "p95_ms": self.histogram.percentile(95) * ms,
+            "p99_ms": self.histogram.percentile(99) * ms,
+            "min_ms": self.min * ms,
+            "max_ms": self.max * ms,
+            "last_ms": self.last * ms,
+        }
+
+
+class ProfileRegistry:
+    """ Timings of named sections (b.e. 'calculator/PoseRotationCalculator').
+    Recording doesn't lock, the worker threads of the detection pipeline record their own sections.
+    Concurrent updates of the same entry may lose single samples, which is fine for profiling. """
+
+    def __init__(self):
+        self.entries: Dict[str, ProfileEntry] = {}
+        self.enabled = False
+        self.started = perf_counter_ns()
+
+    def record(self, name: str, ns: int):
+        entry = self.entries.get(name)
+        if entry is None:
+            entry = self.entries.setdefault(name, ProfileEntry(name))
+        entry.record(ns)
+
+    @contextmanager
+    def section(self, name: str):
+        """ Records the runtime of the with block while profiling is enabled. """
+        if not self.enabled:
+            yield
+            return
+
+        start = perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.record(name, perf_counter_ns() - start)
+
+    def clear(self):
+        self.entries.clear()
+        self.started = perf_counter_ns()
+
+    def stats(self) -> List[dict]:
+        """ Statistics of every section, sorted by total time. """
+        return sorted((entry.stats() for entry in list(self.entries.values())),
+                      key=lambda x: x["total_ms"], reverse=True)
+
+    def to_json(self) -> dict:
+        return {
+            "elapsed_ms": (perf_counter_ns() - self.started) * 1e-6,
+            "sections": self.stats(),
+            "histograms_ns": {name: entry.histogram.buckets() for name, entry in list(self.entries.items())},
+        }
+
+    def export(self, path: str):
+        with open(path, 'w') as f:
+            json.dump(self.to_json(), f, indent=2)
+
+
+# Kept in memory only, profiling has to be enabled in the interface
+registry = ProfileRegistry()
 
 
 def timeit(func: Callable):
-    avg = deque()
+    """ Records every call of the function in the registry while profiling is enabled. """
+    name = f"function/{func.__qualname__}"
 
     @wraps(func)
     def wrap(*args, **kwargs):
-        nonlocal avg
+        if not registry.enabled:
+            return func(*args, **kwargs)
 
-        start = time()
+        start = perf_counter_ns()
         result = func(*args, **kwargs)
-        end = time()
-        runtime = end - start
-        avg.appendleft(runtime)
-        if len(avg) > 30:
-            avg.pop()
-
-        print(f"function: {func.__name__}\ntook: {round(runtime, 5)} sec, avg of {len(avg)}: {sum(avg)/len(avg)} sec\n")
+        runtime = perf_counter_ns() - start
+        registry.record(name, runtime)
+        logging.debug(f"function: {func.__name__} took: {round(runtime * 1e-9, 5)} sec")
         return result
 
     return wrap
 
 
 def fps(func: Callable):
-    start = time()
-    count = 0
+    """ Records the interval between calls of the function in the registry while profiling is enabled. """
+    name = f"interval/{func.__qualname__}"
+    previous = None
 
     @wraps(func)
     def wrap(*args, **kwargs):
-        nonlocal count
-        nonlocal start
+        nonlocal previous
         res = func(*args, **kwargs)
-        count += 1
-        if time() - start >= 1:
-            start = time()
-            print(f"function '{func.__name__}' runs at {count} fps")
-            count = 0
+        if not registry.enabled:
+            # don't record the time profiling was disabled as interval
+            previous = None
+            return res
 
+        now = perf_counter_ns()
+        if previous is not None:
+            registry.record(name, now - previous)
+        previous = now
         return res
 
     return wrap
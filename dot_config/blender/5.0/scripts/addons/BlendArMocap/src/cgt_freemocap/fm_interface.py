@@ -1,4 +1,5 @@
 import bpy
+from ..cgt_core.cgt_interface import cgt_core_filter
 
 
 class UI_PT_CGT_Properties_Freemocap(bpy.types.PropertyGroup):
@@ -57,6 +58,8 @@ class UI_PT_CGT_Panel_Freemocap(bpy.types.Panel):
         row.column(align=True).prop(user, "quickload", text="Quickload", toggle=True)
         if user.quickload:
             row.column(align=True).prop(user, "load_raw", text="Raw", toggle=True)
+        if not (user.quickload and user.load_raw):
+            cgt_core_filter.draw_filter_settings(layout, context)
         # layout.separator()
         # layout.row().operator("wm.fmc_bind_freemocap_data_to_skeleton", text="Bind to rig (Preview)")
 
@@ -4,6 +4,7 @@ import addon_utils
 from pathlib import Path
 
 from . import fm_utils, fm_session_loader, fm_paths
+from ..cgt_core.cgt_calculators_nodes import mp_calc_filter
 
 
 class OT_Freemocap_Quickload_Operator(bpy.types.Operator):
@@ -39,7 +40,8 @@ class OT_Freemocap_Quickload_Operator(bpy.types.Operator):
 
         elif self.user.quickload:
             loader = fm_session_loader.FreemocapLoader(
-                self.user.freemocap_session_path, modal_operation=False, raw=False
+                self.user.freemocap_session_path, modal_operation=False, raw=False,
+                landmark_filter=mp_calc_filter.scene_filter(context.scene)
             )
             loader.quickload_processed()
 
@@ -73,7 +75,8 @@ class WM_Load_Freemocap_Operator(bpy.types.Operator):
 
         # init loader
         self.session_loader = fm_session_loader.FreemocapLoader(
-            self.user.freemocap_session_path, modal_operation=True)
+            self.user.freemocap_session_path, modal_operation=True,
+            landmark_filter=mp_calc_filter.scene_filter(context.scene))
         self.user.modal_active = True
 
         # init modal
@@ -37,9 +37,16 @@ class Stream:
 
         self.title = title
 
+    def read(self):
+        """ Reads the next (mirrored) frame without storing it on the stream,
+        so capture can run on another thread than detection. """
+        updated, frame = self.capture.read()
+        if not updated or frame is None:
+            return updated, None
+        return updated, cv2.flip(frame, 1)
+
     def update(self):
-        self.updated, frame = self.capture.read()
-        self.frame = cv2.flip(frame, 1)
+        self.updated, self.frame = self.read()
 
     def set_color_space(self, space):
         self.frame = cv2.cvtColor(self.frame, self.color_spaces[space])
@@ -68,6 +75,11 @@ class Stream:
             f = self.resize_movie_frame()
         cv2.imshow(self.title, f)
 
+    def show(self, frame: np.ndarray):
+        """ Displays a frame which has been read and processed elsewhere. """
+        self.frame = frame
+        self.draw()
+
     def exit_stream(self):
         if cv2.waitKey(1) & 0xFF == ord('q'):
             logging.debug("ATTEMPT TO EXIT STEAM")
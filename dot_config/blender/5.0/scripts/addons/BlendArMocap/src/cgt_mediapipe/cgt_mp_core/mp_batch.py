@@ -0,0 +1,184 @@
+""" Headless batch detection for movie files.
+The movie gets split into frame ranges which are detected in a process pool,
+the results get assembled to an ordered (frames x landmarks x 3) array.
+Missing detections are stored as nan.
+
+Workers only import cv2, numpy and mediapipe - bpy related modules are imported
+lazily by the blender side of the batch. """
+from __future__ import annotations
+
+import os
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import List, Tuple, Callable, Optional
+
+import cv2
+import numpy as np
+
+from ...cgt_core.cgt_patterns import cgt_landmarks
+
+
+def detection_layout(detection_type: str, refine_face_landmarks: bool = False) -> cgt_landmarks.Layout:
+    """ Body parts of the segments, holistic data uses the freemocap layout (body, left hand, right hand, face). """
+    return {
+        'POSE': cgt_landmarks.POSE,
+        'FACE': cgt_landmarks.face_layout(refine_face_landmarks),
+        'HOLISTIC': cgt_landmarks.holistic_layout(refine_face_landmarks),
+    }[detection_type]
+
+
+def landmark_counts(detection_type: str, refine_face_landmarks: bool = False) -> List[int]:
+    """ Landmarks per segment. """
+    return [count for _, count in detection_layout(detection_type, refine_face_landmarks)]
+
+
+def create_detector(detection_type: str, options: dict):
+    if detection_type == 'POSE':
+        from .mp_pose_detector import PoseDetector
+        return PoseDetector(None, **options)
+    elif detection_type == 'FACE':
+        from .mp_face_detector import FaceDetector
+        return FaceDetector(None, **options)
+    elif detection_type == 'HOLISTIC':
+        from .mp_holistic_detector import HolisticDetector
+        return HolisticDetector(None, **options)
+    raise KeyError(f"Batch detection doesn't support {detection_type}")
+
+
+def landmark_lists(detection_type: str, mp_res):
+    """ Landmark lists of a mediapipe result in segment order, None if not detected. """
+    if detection_type == 'POSE':
+        return [mp_res.pose_world_landmarks]
+    elif detection_type == 'FACE':
+        return [mp_res.multi_face_landmarks[0] if mp_res.multi_face_landmarks else None]
+    # mp hands are flipped while detecting holistic
+    return [mp_res.pose_landmarks, mp_res.right_hand_landmarks, mp_res.left_hand_landmarks, mp_res.face_landmarks]
+
+
+def frame_ranges(frame_count: int, chunks: int) -> List[Tuple[int, int]]:
+    """ Splits frames in up to n continuous [start, end) ranges. """
+    chunks = max(1, min(chunks, frame_count))
+    bounds = np.linspace(0, frame_count, chunks + 1, dtype=int)
+    return [(int(start), int(end)) for start, end in zip(bounds[:-1], bounds[1:]) if end > start]
+
+
+def detect_range(path: str, start: int, end: int, detection_type: str, options: dict) -> Tuple[int, np.ndarray]:
+    """ Detects the frames [start, end) of a movie. Runs in a worker process. """
+    counts = landmark_counts(detection_type, options.get('refine_face_landmarks', False))
+    offsets = np.cumsum([0] + counts)
+    landmarks = np.full((end - start, offsets[-1], 3), np.nan, dtype=np.float32)
+
+    detector = create_detector(detection_type, options)
+    capture = cv2.VideoCapture(path)
+    capture.set(cv2.CAP_PROP_POS_FRAMES, start)
+    try:
+        mp_lib = detector.get_mp_lib()
+        for i in range(end - start):
+            updated, frame = capture.read()
+            if not updated or frame is None:
+                break
+
+            # same orientation as the stream detection
+            frame = cv2.cvtColor(cv2.flip(frame, 1), cv2.COLOR_BGR2RGB)
+            frame.flags.writeable = False
+            mp_res = mp_lib.process(frame)
+
+            for landmark_list, lo, hi in zip(landmark_lists(detection_type, mp_res), offsets[:-1], offsets[1:]):
+                if landmark_list is None:
+                    continue
+                points = [(lm.x, lm.y, lm.z) for lm in landmark_list.landmark]
+                landmarks[i, lo:lo + min(len(points), hi - lo)] = points[:hi - lo]
+    finally:
+        capture.release()
+        detector.close()
+    return start, landmarks
+
+
+def frame_count(path: str) -> int:
+    capture = cv2.VideoCapture(path)
+    count = int(capture.get(cv2.CAP_PROP_FRAME_COUNT))
+    capture.release()
+    return count
+
+
+def batch_detect(path: str, detection_type: str, options: dict, processes: int = 0,
+                 progress: Optional[Callable[[float], None]] = None) -> np.ndarray:
+    """ Detects all frames of a movie in a process pool.
+    Returns an ordered (frames x landmarks x 3) float32 array. """
+    count = frame_count(path)
+    if count <= 0:
+        logging.error(f"Failed to read frame count of {path}")
+        return np.empty((0, sum(landmark_counts(detection_type)), 3), dtype=np.float32)
+
+    processes = processes or os.cpu_count() or 1
+    # more ranges than processes to balance load, every range restarts tracking
+    ranges = frame_ranges(count, processes * 2)
+
+    # blender is no python interpreter we could fork, spawn fresh workers
+    ctx = multiprocessing.get_context('spawn')
+    chunks = {}
+    with ProcessPoolExecutor(max_workers=processes, mp_context=ctx) as pool:
+        futures = [pool.submit(detect_range, path, start, end, detection_type, options) for start, end in ranges]
+        for done, future in enumerate(as_completed(futures), 1):
+            start, landmarks = future.result()
+            chunks[start] = landmarks
+            if progress is not None:
+                progress(done / len(futures))
+
+    return np.concatenate([chunks[start] for start, _ in ranges])
+
+
+def key_step_average(landmarks: np.ndarray, frame_start: int, key_step: int) -> Tuple[np.ndarray, np.ndarray]:
+    """ Averages the landmarks between key steps, keys are set on frames divisible by key step
+    like while modal detection. Returns (frames, landmarks). """
+    frames = np.arange(frame_start, frame_start + len(landmarks))
+    keys = np.flatnonzero(frames % key_step == 0)
+    if len(keys) == 0:
+        return frames[:0], landmarks[:0]
+
+    landmarks = landmarks[:keys[-1] + 1]
+    starts = np.concatenate(([0], keys[:-1] + 1))
+    valid = ~np.isnan(landmarks)
+    sums = np.add.reduceat(np.where(valid, landmarks, 0), starts, axis=0)
+    counts = np.add.reduceat(valid, starts, axis=0)
+    averaged = np.divide(sums, counts, out=np.full_like(sums, np.nan), where=counts > 0)
+    return frames[keys], averaged
+
+
+def quickload_processed(landmarks: np.ndarray, detection_type: str, frame_start: int, key_step: int,
+                        refine_face_landmarks: bool = False, landmark_filter=None):
+    """ Filters the batch results, runs the calculators and writes them to f-curves at once. """
+    from ...cgt_core.cgt_calculators_nodes import mp_calc_face_rot, mp_calc_pose_rot, mp_calc_hand_rot
+    from ...cgt_core.cgt_output_nodes import mp_bulk_out
+
+    layout = detection_layout(detection_type, refine_face_landmarks)
+    splits = np.cumsum([count for _, count in layout])[:-1]
+    if landmark_filter is not None:
+        landmarks = np.concatenate([
+            landmark_filter.filter_batch(segment, name)
+            for (name, _), segment in zip(layout, np.split(landmarks, splits, axis=1))], axis=1)
+
+    frames, landmarks = key_step_average(landmarks, frame_start, key_step)
+    segments = np.split(landmarks, splits, axis=1)
+
+    if detection_type == 'POSE':
+        calc_pose = mp_calc_pose_rot.PoseRotationCalculator()
+        mp_bulk_out.apply_batch_results(frames, pose_results=calc_pose.update_batch(segments[0]))
+
+    elif detection_type == 'FACE':
+        calc_face = mp_calc_face_rot.FaceRotationCalculator()
+        mp_bulk_out.apply_batch_results(frames, face_results=calc_face.update_batch(segments[0]))
+
+    else:
+        pose, left_hand, right_hand, face = segments
+        calc_face = mp_calc_face_rot.FaceRotationCalculator()
+        calc_pose = mp_calc_pose_rot.PoseRotationCalculator()
+        calc_hand = mp_calc_hand_rot.HandRotationCalculator()
+        mp_bulk_out.apply_batch_results(
+            frames,
+            hand_results=calc_hand.update_batch(left_hand, right_hand),
+            face_results=calc_face.update_batch(face),
+            pose_results=calc_pose.update_batch(pose),
+        )
+    return len(frames)
@@ -1,39 +1,65 @@
 from __future__ import annotations
 
+import cv2
+import numpy as np
 from mediapipe import solutions
 from abc import abstractmethod
 
 from . import cv_stream
-from ...cgt_core.cgt_patterns import cgt_nodes
+from ...cgt_core.cgt_patterns import cgt_nodes, cgt_landmarks
+from ...cgt_core.cgt_utils.cgt_timers import registry
 
 
 class DetectorNode(cgt_nodes.InputNode):
     stream: cv_stream.Stream = None
     solution = None
-
-    def __init__(self, stream: cv_stream.Stream = None):
+    mp_lib = None
+    static_image_mode: bool = False
+    # detection runs on frames of the stream and may be moved to a worker thread
+    threaded: bool = True
+    # body parts of the landmark frames returned by the detector
+    layout: cgt_landmarks.Layout = ()
+
+    def __init__(self, stream: cv_stream.Stream = None, static_image_mode: bool = False):
         self.stream = stream
+        self.static_image_mode = static_image_mode
         self.drawing_utils = solutions.drawing_utils
         self.drawing_style = solutions.drawing_styles
 
+    def update(self, data, frame):
+        return self.exec_detection(self.get_mp_lib()), frame
+
     @abstractmethod
-    def update(self, *args):
+    def create_mp_lib(self):
+        """ Creates the mediapipe solution instance used for the whole session. """
         pass
 
+    def get_mp_lib(self):
+        """ Returns the session solution, the model gets loaded once on first use.
+        In video mode (static_image_mode=False) mediapipe tracks landmarks between frames. """
+        if self.mp_lib is None:
+            self.mp_lib = self.create_mp_lib()
+        return self.mp_lib
+
+    def close(self):
+        """ Releases the solution (and its graph) of the session. """
+        if self.mp_lib is not None:
+            self.mp_lib.close()
+            self.mp_lib = None
+
     @abstractmethod
     def contains_features(self, mp_res):
         pass
 
     @abstractmethod
-    def draw_result(self, s, mp_res, mp_drawings):
+    def draw_result(self, frame, mp_res, mp_drawings):
         pass
 
-    @abstractmethod
-    def empty_data(self):
-        pass
+    def empty_data(self) -> cgt_landmarks.LandmarkFrame:
+        return cgt_landmarks.LandmarkFrame(self.layout)
 
     @abstractmethod
-    def detected_data(self, mp_res):
+    def detected_data(self, mp_res) -> cgt_landmarks.LandmarkFrame:
         pass
 
     def exec_detection(self, mp_lib):
@@ -41,7 +67,8 @@ class DetectorNode(cgt_nodes.InputNode):
             -> detected_data: Detection Results.
             -> empty_data: No features detected.
             -> None: EOF or Finish. """
-        self.stream.update()
+        with registry.section("capture/read"):
+            self.stream.update()
         updated = self.stream.updated
 
         if not updated and self.stream.input_type == 0:
@@ -59,7 +86,8 @@ class DetectorNode(cgt_nodes.InputNode):
         # detect features in frame
         self.stream.frame.flags.writeable = False
         self.stream.set_color_space('rgb')
-        mp_res = mp_lib.process(self.stream.frame)
+        with registry.section(f"inference/{self}"):
+            mp_res = mp_lib.process(self.stream.frame)
         self.stream.set_color_space('bgr')
 
         # proceed if contains features
@@ -70,7 +98,7 @@ class DetectorNode(cgt_nodes.InputNode):
             return self.empty_data()
 
         # draw results
-        self.draw_result(self.stream, mp_res, self.drawing_utils)
+        self.draw_result(self.stream.frame, mp_res, self.drawing_utils)
         self.stream.draw()
 
         # exit stream
@@ -79,10 +107,26 @@ class DetectorNode(cgt_nodes.InputNode):
 
         return self.detected_data(mp_res)
 
+    def detect(self, frame):
+        """ Runs mediapipe detection on a BGR frame, independent of the stream.
+            -> (detected_data, frame with drawn results): Detection Results.
+            -> (empty_data, frame): No features detected. """
+        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        rgb.flags.writeable = False
+        mp_res = self.get_mp_lib().process(rgb)
+
+        if not self.contains_features(mp_res):
+            return self.empty_data(), frame
+
+        self.draw_result(frame, mp_res, self.drawing_utils)
+        return self.detected_data(mp_res), frame
+
     def cvt2landmark_array(self, landmark_list):
-        """landmark_list: A normalized landmark list proto message to be annotated on the image."""
-        return [[idx, [landmark.x, landmark.y, landmark.z]] for idx, landmark in enumerate(landmark_list.landmark)]
+        """landmark_list: A normalized landmark list proto message to be annotated on the image.
+        Returns a float32 (landmarks x 3) array."""
+        return np.array([(landmark.x, landmark.y, landmark.z) for landmark in landmark_list.landmark], dtype=np.float32)
 
     def __del__(self):
+        self.close()
         if self.stream is not None:
             del self.stream
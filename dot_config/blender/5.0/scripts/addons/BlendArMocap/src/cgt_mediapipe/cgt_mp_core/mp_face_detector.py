@@ -1,30 +1,31 @@
 import mediapipe as mp
 from .mp_detector_node import DetectorNode
+from ...cgt_core.cgt_patterns import cgt_landmarks
 from typing import Mapping, Tuple
 from mediapipe.python.solutions import face_mesh_connections
 from mediapipe.python.solutions.drawing_utils import DrawingSpec
 
 
 class FaceDetector(DetectorNode):
-    def __init__(self, stream, refine_face_landmarks: bool = False, min_detection_confidence: float = 0.7):
-        DetectorNode.__init__(self, stream)
+    def __init__(self, stream, refine_face_landmarks: bool = False, min_detection_confidence: float = 0.7,
+                 static_image_mode: bool = False):
+        DetectorNode.__init__(self, stream, static_image_mode)
         self.solution = mp.solutions.face_mesh
         self.refine_face_landmarks = refine_face_landmarks
+        self.layout = cgt_landmarks.face_layout(refine_face_landmarks)
         self.min_detection_confidence = min_detection_confidence
 
-    def update(self, data, frame):
-        with self.solution.FaceMesh(
-                max_num_faces=1,
-                static_image_mode=False,
-                refine_landmarks=self.refine_face_landmarks,
-                min_detection_confidence=self.min_detection_confidence) as mp_lib:
-            return self.exec_detection(mp_lib), frame
-
-    def empty_data(self):
-        return [[[]]]
+    def create_mp_lib(self):
+        return self.solution.FaceMesh(
+            max_num_faces=1,
+            static_image_mode=self.static_image_mode,
+            refine_landmarks=self.refine_face_landmarks,
+            min_detection_confidence=self.min_detection_confidence)
 
     def detected_data(self, mp_res):
-        return [self.cvt2landmark_array(landmark) for landmark in mp_res.multi_face_landmarks]
+        data = self.empty_data()
+        data.set('face', self.cvt2landmark_array(mp_res.multi_face_landmarks[0]))
+        return data
 
     def contains_features(self, mp_res):
         if not mp_res.multi_face_landmarks:
@@ -59,11 +60,11 @@ class FaceDetector(DetectorNode):
                 face_mesh_contours_connection_style[connection] = v
         return face_mesh_contours_connection_style
 
-    def draw_result(self, s, mp_res, mp_drawings):
+    def draw_result(self, frame, mp_res, mp_drawings):
         """Draws the landmarks and the connections on the image."""
         for face_landmarks in mp_res.multi_face_landmarks:
             self.drawing_utils.draw_landmarks(
-                image=self.stream.frame,
+                image=frame,
                 landmark_list=face_landmarks,
                 connections=self.solution.FACEMESH_CONTOURS,
                 connection_drawing_spec=self.get_custom_face_mesh_contours_style(),
@@ -1,6 +1,7 @@
 import socket
 import json
 from .mp_detector_node import DetectorNode
+from ...cgt_core.cgt_patterns import cgt_landmarks
 from mediapipe.framework.formats import classification_pb2
 
 class HandDetector(DetectorNode):
@@ -9,10 +10,13 @@ class HandDetector(DetectorNode):
 	from a UDP socket instead of computing it locally.
 	Keeps the original interface intact.
 	"""
+	# data comes from the socket, not from stream frames
+	threaded = False
+	layout = cgt_landmarks.HAND
 
-	def __init__(self, stream=None, hand_model_complexity=1, min_detection_confidence=0.7):
+	def __init__(self, stream=None, hand_model_complexity=1, min_detection_confidence=0.7, static_image_mode=False):
 		# keep original signature
-		super().__init__(stream)
+		super().__init__(stream, static_image_mode)
 		self.hand_model_complexity = hand_model_complexity
 		self.min_detection_confidence = min_detection_confidence
 
@@ -24,8 +28,8 @@ class HandDetector(DetectorNode):
 
 	def update(self, data, frame):
 		"""
-		Receives socket packet and converts to the exact Mediapipe-compatible structure:
-		[ [ (idx, [x,y,z]), ... ], [ (idx, [x,y,z]), ... ] ]
+		Receives socket packet and converts it to a landmark frame
+		containing the first left and right hand of the packet.
 		"""
 		try:
 			packet, addr = self.sock.recvfrom(65535)
@@ -33,16 +37,7 @@ class HandDetector(DetectorNode):
 		except BlockingIOError:
 			packet = {"hands": []}
 
-		left_hands, right_hands = [], []
-
-		for hand in packet.get("hands", []):
-			landmarks = [(i, [lm["x"], lm["y"], lm["z"]]) for i, lm in enumerate(hand["landmarks"])]
-			if hand["hand_index"] == 0:
-				left_hands.append(landmarks)
-			else:
-				right_hands.append(landmarks)
-
-		return [left_hands, right_hands], frame
+		return self.detected_data(packet), frame
 
 
 	@staticmethod
@@ -57,29 +52,31 @@ class HandDetector(DetectorNode):
 			return None
 		return [[idx, "Right" in str(o)] for idx, o in enumerate(orientation)]
 
-	def empty_data(self):
-		return [[], []]
-
 	def detected_data(self, mp_res):
 		"""
-		Convert received socket data to left/right hands list.
+		Convert received socket data to a landmark frame.
 		"""
-		left, right = [], []
+		data = self.empty_data()
 		for hand in mp_res.get("hands", []):
-			landmarks = [(lm["x"], lm["y"], lm["z"]) for lm in hand["landmarks"]]
-			hand_info = {"hand_index": hand["hand_index"], "landmarks": landmarks}
-			if hand["hand_index"] == 0:
-				left.append(hand_info)
-			else:
-				right.append(hand_info)
-		return [left, right]
+			name = 'left_hand' if hand["hand_index"] == 0 else 'right_hand'
+			if data.is_present(name):
+				continue
+			data.set(name, [(lm["x"], lm["y"], lm["z"]) for lm in hand["landmarks"]])
+		return data
 
 	def contains_features(self, mp_res):
 		return bool(mp_res)
 
-	def draw_result(self, s, mp_res, mp_drawings):
+	def draw_result(self, frame, mp_res, mp_drawings):
 		# keep method for interface; does nothing
 		pass
 
+	def create_mp_lib(self):
+		# detection happens on the sender, there is no local solution
+		return None
+
 	def close(self):
-		self.sock.close()
+		super().close()
+		if getattr(self, "sock", None) is not None:
+			self.sock.close()
+			self.sock = None
@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import queue
+import logging
+import threading
+from typing import Optional, Tuple, Any
+
+from . import cv_stream
+from .mp_detector_node import DetectorNode
+from ...cgt_core.cgt_utils.cgt_timers import registry
+
+
+# sentinel pushed through the queues once a movie has been read to the end
+EOF = object()
+
+
+class DetectionPipeline:
+    """ Producer / consumer pipeline running capture and mediapipe inference
+    outside of blenders main thread.
+
+        capture thread -> frame queue -> inference thread -> result queue -> modal operator
+
+    The queues are bounded. With the 'DROP_OLDEST' policy (webcam) a full queue
+    drops its oldest item, so results always belong to the latest frames.
+    With the 'KEEP_ALL' policy (movie) producers block until there is space,
+    every frame gets detected and handed over in order. """
+
+    DROP_OLDEST = 'DROP_OLDEST'
+    KEEP_ALL = 'KEEP_ALL'
+
+    def __init__(self, detector: DetectorNode, stream: cv_stream.Stream,
+                 policy: str = DROP_OLDEST, max_frames: int = 2, max_results: int = 8):
+        self.detector = detector
+        self.stream = stream
+        self.policy = policy
+        self.frames = queue.Queue(maxsize=max_frames)
+        self.results = queue.Queue(maxsize=max_results)
+        self.dropped = 0
+
+        self._stop = threading.Event()
+        self._threads = [
+            threading.Thread(target=self._capture, name="cgt_mp_capture", daemon=True),
+            threading.Thread(target=self._inference, name="cgt_mp_inference", daemon=True),
+        ]
+
+    def start(self):
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self, timeout: float = 2.0):
+        """ Stops and joins the workers, pending frames and results get discarded. """
+        self._stop.set()
+        for q in (self.frames, self.results):
+            self._clear(q)
+        for thread in self._threads:
+            if thread.is_alive():
+                thread.join(timeout)
+
+    @property
+    def running(self) -> bool:
+        return any(thread.is_alive() for thread in self._threads)
+
+    def get(self) -> Optional[Tuple[Any, Any]]:
+        """ Returns the next (data, frame) result without blocking,
+        (EOF, None) once the movie has been processed or None if nothing is ready. """
+        try:
+            return self.results.get_nowait()
+        except queue.Empty:
+            return None
+
+    def _put(self, q: queue.Queue, item):
+        """ Puts an item depending on the policy, returns False if the pipeline got stopped. """
+        while not self._stop.is_set():
+            if self.policy == self.KEEP_ALL:
+                try:
+                    q.put(item, timeout=.1)
+                    return True
+                except queue.Full:
+                    continue
+
+            try:
+                q.put_nowait(item)
+                return True
+            except queue.Full:
+                # discard the oldest item to make space for the latest one
+                try:
+                    q.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+        return False
+
+    def _get(self, q: queue.Queue):
+        while not self._stop.is_set():
+            try:
+                return q.get(timeout=.1)
+            except queue.Empty:
+                continue
+        return None
+
+    @staticmethod
+    def _clear(q: queue.Queue):
+        try:
+            while True:
+                q.get_nowait()
+        except queue.Empty:
+            pass
+
+    def _capture(self):
+        while not self._stop.is_set():
+            with registry.section("capture/read"):
+                updated, frame = self.stream.read()
+
+            if not updated and self.stream.input_type == 1:
+                # movie has been read to the end
+                self._put(self.frames, EOF)
+                return
+
+            if frame is None:
+                # ignore failed reads while stream detection
+                continue
+
+            if not self._put(self.frames, frame):
+                return
+
+    def _inference(self):
+        try:
+            while not self._stop.is_set():
+                frame = self._get(self.frames)
+                if frame is None:
+                    return
+
+                if frame is EOF:
+                    self._put(self.results, (EOF, None))
+                    return
+
+                with registry.section(f"inference/{self.detector}"):
+                    result = self.detector.detect(frame)
+                if not self._put(self.results, result):
+                    return
+        except Exception as e:
+            logging.error(f"Detection failed: {e}")
+            self._put(self.results, (EOF, None))
+        finally:
+            # the mediapipe graph has been created on this thread, release it here
+            self.detector.close()
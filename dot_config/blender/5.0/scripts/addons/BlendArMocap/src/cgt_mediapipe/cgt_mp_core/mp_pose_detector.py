@@ -1,38 +1,40 @@
 import mediapipe as mp
 
 from . import cv_stream, mp_detector_node
+from ...cgt_core.cgt_patterns import cgt_landmarks
 
 
 class PoseDetector(mp_detector_node.DetectorNode):
-    def __init__(self, stream, pose_model_complexity: int = 1, min_detection_confidence: float = 0.7):
-        mp_detector_node.DetectorNode.__init__(self, stream)
+    layout = cgt_landmarks.POSE
+
+    def __init__(self, stream, pose_model_complexity: int = 1, min_detection_confidence: float = 0.7,
+                 static_image_mode: bool = False):
+        mp_detector_node.DetectorNode.__init__(self, stream, static_image_mode)
         self.pose_model_complexity = pose_model_complexity
         self.min_detection_confidence = min_detection_confidence
         self.solution = mp.solutions.pose
 
     # https://google.github.io/mediapipe/solutions/pose#python-solution-api
-    def update(self, data, frame):
+    def create_mp_lib(self):
         # BlazePose GHUM 3D
-        with self.solution.Pose(
-                static_image_mode=True,
-                model_complexity=self.pose_model_complexity,
-                min_detection_confidence=self.min_detection_confidence) as mp_lib:
-            return self.exec_detection(mp_lib), frame
+        return self.solution.Pose(
+            static_image_mode=self.static_image_mode,
+            model_complexity=self.pose_model_complexity,
+            min_detection_confidence=self.min_detection_confidence)
 
     def detected_data(self, mp_res):
-        return self.cvt2landmark_array(mp_res.pose_world_landmarks)
-
-    def empty_data(self):
-        return []
+        data = self.empty_data()
+        data.set('pose', self.cvt2landmark_array(mp_res.pose_world_landmarks))
+        return data
 
     def contains_features(self, mp_res):
         if not mp_res.pose_world_landmarks:
             return False
         return True
 
-    def draw_result(self, s, mp_res, mp_drawings):
+    def draw_result(self, frame, mp_res, mp_drawings):
         mp_drawings.draw_landmarks(
-            s.frame,
+            frame,
             mp_res.pose_landmarks,
             self.solution.POSE_CONNECTIONS,
             landmark_drawing_spec=self.drawing_style.get_default_pose_landmarks_style())
@@ -3,6 +3,8 @@ import logging
 from typing import Optional
 from pathlib import Path
 from ..cgt_core.cgt_patterns import cgt_nodes
+from ..cgt_core.cgt_output_nodes import mp_out_utils
+from ..cgt_core.cgt_calculators_nodes import mp_calc_filter
 
 
 class WM_CGT_MP_modal_detection_operator(bpy.types.Operator):
@@ -12,9 +14,12 @@ class WM_CGT_MP_modal_detection_operator(bpy.types.Operator):
 
     _timer: Optional[bpy.types.Timer] = None
     node_chain: Optional[cgt_nodes.NodeChain] = None
+    pipeline = None
+    filter_node = None
+    stream = None
     frame: int = 1
     key_step: int = 1
-    memo: list
+    memo = None
 
     def get_chain(self, stream) -> Optional[cgt_nodes.NodeChain]:
         from ..cgt_core import cgt_core_chains
@@ -25,30 +30,31 @@ class WM_CGT_MP_modal_detection_operator(bpy.types.Operator):
 
         input_node = None
         chain_template = None
+        static_image_mode = self.user.detection_mode == 'IMAGE'
 
         logging.debug(f"{self.user.enum_detection_type}")
         if self.user.enum_detection_type == 'HAND':
             input_node = mp_hand_detector.HandDetector(
-                stream, self.user.hand_model_complexity, self.user.min_detection_confidence
+                stream, self.user.hand_model_complexity, self.user.min_detection_confidence, static_image_mode
             )
             chain_template = cgt_core_chains.HandNodeChain()
 
         elif self.user.enum_detection_type == 'POSE':
             input_node = mp_pose_detector.PoseDetector(
-                stream, self.user.pose_model_complexity, self.user.min_detection_confidence
+                stream, self.user.pose_model_complexity, self.user.min_detection_confidence, static_image_mode
             )
             chain_template = cgt_core_chains.PoseNodeChain()
 
         elif self.user.enum_detection_type == 'FACE':
             input_node = mp_face_detector.FaceDetector(
-                stream, self.user.refine_face_landmarks, self.user.min_detection_confidence
+                stream, self.user.refine_face_landmarks, self.user.min_detection_confidence, static_image_mode
             )
             chain_template = cgt_core_chains.FaceNodeChain()
 
         elif self.user.enum_detection_type == 'HOLISTIC':
             input_node = mp_holistic_detector.HolisticDetector(
                 stream, self.user.holistic_model_complexity,
-                self.user.min_detection_confidence, self.user.refine_face_landmarks
+                self.user.min_detection_confidence, self.user.refine_face_landmarks, static_image_mode
             )
             chain_template = cgt_core_chains.HolisticNodeChainGroup()
 
@@ -58,6 +64,9 @@ class WM_CGT_MP_modal_detection_operator(bpy.types.Operator):
             return None
 
         node_chain.append(input_node)
+        self.filter_node = mp_calc_filter.scene_filter(bpy.context.scene)
+        if self.filter_node is not None:
+            node_chain.append(self.filter_node)
         node_chain.append(chain_template)
 
         logging.info(f"{node_chain}")
@@ -94,6 +103,60 @@ class WM_CGT_MP_modal_detection_operator(bpy.types.Operator):
             )
         return stream
 
+    def get_pipeline(self, stream):
+        """ Runs capture and detection of the input node on worker threads if supported. """
+        from .cgt_mp_core import mp_pipeline
+        input_node = self.node_chain.nodes[0]
+        if not getattr(input_node, 'threaded', False):
+            return None
+
+        # every movie frame gets keyed on the next frame, dropping frames would shift the keys
+        policy = self.user.frame_policy
+        if policy == 'AUTO' or self.user.detection_input_type == 'movie':
+            policy = 'KEEP_ALL' if self.user.detection_input_type == 'movie' else 'DROP_OLDEST'
+
+        pipeline = mp_pipeline.DetectionPipeline(input_node, stream, policy)
+        pipeline.start()
+        return pipeline
+
+    def get_batch_options(self) -> Optional[dict]:
+        """ Detector arguments for batch detection, None if the detection type isn't supported. """
+        if self.user.enum_detection_type == 'POSE':
+            return dict(pose_model_complexity=self.user.pose_model_complexity,
+                        min_detection_confidence=self.user.min_detection_confidence)
+        elif self.user.enum_detection_type == 'FACE':
+            return dict(refine_face_landmarks=self.user.refine_face_landmarks,
+                        min_detection_confidence=self.user.min_detection_confidence)
+        elif self.user.enum_detection_type == 'HOLISTIC':
+            return dict(model_complexity=self.user.holistic_model_complexity,
+                        min_detection_confidence=self.user.min_detection_confidence,
+                        refine_face_landmarks=self.user.refine_face_landmarks)
+        return None
+
+    def run_batch(self, context, options: dict):
+        """ Detects the movie in a process pool and writes the results to f-curves in bulk. """
+        from .cgt_mp_core import mp_batch
+        mov_path = bpy.path.abspath(self.user.mov_data_path)
+        if not Path(mov_path).is_file():
+            logging.error(f"GIVEN PATH IS NOT VALID {mov_path}")
+            return {'FINISHED'}
+
+        wm = context.window_manager
+        wm.progress_begin(0, 100)
+        try:
+            landmarks = mp_batch.batch_detect(
+                str(mov_path), self.user.enum_detection_type, options, self.user.batch_processes,
+                progress=lambda factor: wm.progress_update(int(factor * 100)))
+        finally:
+            wm.progress_end()
+
+        keys = mp_batch.quickload_processed(
+            landmarks, self.user.enum_detection_type, context.scene.frame_current,
+            self.user.key_frame_step, options.get('refine_face_landmarks', False),
+            mp_calc_filter.scene_filter(context.scene))
+        self.report({'INFO'}, f"Detected {len(landmarks)} frames, applied {keys} keys.")
+        return {'FINISHED'}
+
     def execute(self, context):
         """ Runs movie or stream detection depending on user input. """
         self.user = getattr(context.scene, "cgtinker_mediapipe")
@@ -104,8 +167,15 @@ class WM_CGT_MP_modal_detection_operator(bpy.types.Operator):
             self.user.modal_active = False
             self.report({'INFO'}, "Stopped detection.")
             return {'FINISHED'}
-        else:
-            self.user.modal_active = True
+
+        if self.user.detection_input_type == 'movie' and self.user.batch_detection:
+            options = self.get_batch_options()
+            if options is not None:
+                return self.run_batch(context, options)
+            self.report({'WARNING'}, f"Batch detection doesn't support {self.user.enum_detection_type}, "
+                                     f"running modal detection.")
+
+        self.user.modal_active = True
 
         # init stream and chain
         stream = self.get_stream()
@@ -113,6 +183,11 @@ class WM_CGT_MP_modal_detection_operator(bpy.types.Operator):
         if self.node_chain is None:
             self.user.modal_active = False
             return {'FINISHED'}
+        self.stream = stream
+        self.pipeline = self.get_pipeline(stream)
+
+        if self.user.buffered_keyframes:
+            mp_out_utils.BpyOutputNode.keyframe_buffer = mp_out_utils.KeyframeBuffer()
 
         # add a timer property and start running
         wm = context.window_manager
@@ -120,7 +195,7 @@ class WM_CGT_MP_modal_detection_operator(bpy.types.Operator):
         context.window_manager.modal_handler_add(self)
 
         # memo skipped frames
-        self.memo = []
+        self.memo = None
         self.report(
             {'INFO'}, f"Running {self.user.enum_detection_type} as modal.")
         return {'RUNNING_MODAL'}
@@ -129,51 +204,73 @@ class WM_CGT_MP_modal_detection_operator(bpy.types.Operator):
     def poll(cls, context):
         return context.mode in {'OBJECT', 'POSE'}
 
-    @staticmethod
-    def simple_smoothing(memo, cur):
-        """ Expects list with sub-lists containing [int, [float, float, float]].
-        Smooths the float part of the sub-lists. """
-        def smooth_by_add_divide(x, y):
-            for i, *_ in enumerate(zip(x, y)):
-                x[i] += y[i]
-                x[i] /= 2
-
-        def addable(x, y):
-            # check if [int, [float, float float]]
-            if not isinstance(x, list) or not isinstance(y, list):
-                print("CATCHED NOT LIST ERR")
-                return False
-
-            if not len(x) == 2 or not len(y) == 2:
-                return False
+    def update_movie_data(self, data):
+        """ Filters every detection result, averages them between key steps
+        and pushes them to the chain every key step. """
+        if self.filter_node is not None:
+            data, _ = self.filter_node.update(data, self.frame)
 
-            if not len(x[1]) == 3 or not len(y[1]) == 3:
+        if self.memo is None:
+            self.memo = data.copy()
+        else:
+            self.memo.smooth(data)
+
+        if self.frame % self.key_step == 0:
+            for node in self.node_chain.nodes[1:]:
+                if node is not self.filter_node:
+                    node.update(self.memo, self.frame)
+            self.memo = None
+        self.frame += 1
+
+    def update_stream_data(self, data):
+        for node in self.node_chain.nodes[1:]:
+            if data is None:
+                break
+            data, _ = node.update(data, self.frame)
+        self.frame += self.key_step
+
+    def consume_results(self):
+        """ Consumes finished detection results of the pipeline.
+        Movie results get processed in order, for webcam input only the latest result gets used
+        unless every frame should be kept. Returns False when detection finished. """
+        from .cgt_mp_core import mp_pipeline
+        is_movie = self.user.detection_input_type == 'movie'
+        keep_all = self.pipeline.policy == mp_pipeline.DetectionPipeline.KEEP_ALL
+
+        results = []
+        while True:
+            result = self.pipeline.get()
+            if result is None:
+                break
+            results.append(result)
+
+        if not keep_all and not is_movie:
+            results = results[-1:]
+
+        image = None
+        for data, image in results:
+            if data is mp_pipeline.EOF:
                 return False
+            if is_movie:
+                self.update_movie_data(data)
+            else:
+                self.update_stream_data(data)
 
-            smooth_by_add_divide(x[1], y[1])
-            return True
-
-        def smooth_memo_contents(x, y):
-            # checks if addable contents, else splits into sub-arrays
-            # and retries. y may get added to x, if x is empty.
-            if not isinstance(y, list):
-                return
-            if not isinstance(x, list):
-                x = y
-            if len(x) == 0 and len(y) != 0:
-                x += y
-
-            for l1, l2 in zip(x, y):
-                if not addable(l1, l2):
-                    smooth_memo_contents(l1, l2)
-
-        smooth_memo_contents(memo, cur)
-        return memo
+        # preview has to be drawn on the main thread
+        if image is not None:
+            self.stream.show(image)
+        if self.stream.exit_stream():
+            return False
+        return self.pipeline.running or not self.pipeline.results.empty()
 
     def modal(self, context, event):
         """ Run detection as modal operation, finish with 'Q', 'ESC' or 'RIGHT MOUSE'. """
         assert self.node_chain is not None
-        if event.type == "TIMER" and self.user.modal_active:
+        if event.type == "TIMER" and self.user.modal_active and self.pipeline is not None:
+            if not self.consume_results():
+                return self.cancel(context)
+
+        elif event.type == "TIMER" and self.user.modal_active:
             if self.user.detection_input_type == 'movie':
                 # get data
                 data, _frame = self.node_chain.nodes[0].update([], self.frame)
@@ -181,13 +278,7 @@ class WM_CGT_MP_modal_detection_operator(bpy.types.Operator):
                     return self.cancel(context)
 
                 # smooth gathered data
-                self.simple_smoothing(self.memo, data)
-                if self.frame % self.key_step == 0:
-                    for node in self.node_chain.nodes[1:]:
-                        node.update(self.memo, self.frame)
-                    self.memo.clear()
-
-                self.frame += 1
+                self.update_movie_data(data)
             else:
                 data, _ = self.node_chain.update([], self.frame)
                 if data is None:
@@ -202,7 +293,20 @@ class WM_CGT_MP_modal_detection_operator(bpy.types.Operator):
     def cancel(self, context):
         """ Upon finishing detection clear the handlers. """
         self.user.modal_active = False  # noqa
+        if self.pipeline is not None:
+            # workers release the mediapipe session of the input node on exit
+            self.pipeline.stop()
+            self.pipeline = None
+        elif self.node_chain is not None:
+            # release the mediapipe session of the input node
+            self.node_chain.nodes[0].close()
+
+        # write remaining keyframes
+        if mp_out_utils.BpyOutputNode.keyframe_buffer is not None:
+            mp_out_utils.BpyOutputNode.keyframe_buffer.flush()
+            mp_out_utils.BpyOutputNode.keyframe_buffer = None
         del self.node_chain
+        self.stream = None
         wm = context.window_manager
         if self._timer:
             wm.event_timer_remove(self._timer)
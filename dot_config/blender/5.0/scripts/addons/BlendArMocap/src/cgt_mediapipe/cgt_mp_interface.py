@@ -1,7 +1,7 @@
 import bpy
 
 from . import cgt_dependencies
-from ..cgt_core.cgt_interface import cgt_core_panel
+from ..cgt_core.cgt_interface import cgt_core_panel, cgt_core_filter
 
 
 class CGT_PT_MP_Detection(cgt_core_panel.DefaultPanel, bpy.types.Panel):
@@ -19,6 +19,10 @@ class CGT_PT_MP_Detection(cgt_core_panel.DefaultPanel, bpy.types.Panel):
         layout.row().prop(user, "mov_data_path")
         layout.row().prop(user, "key_frame_step")
         layout.row().prop(user, "enum_detection_type")
+        row = layout.row(align=True)
+        row.prop(user, "batch_detection")
+        if user.batch_detection:
+            row.prop(user, "batch_processes")
         if user.modal_active:
             layout.row().operator("wm.cgt_feature_detection_operator", text="Stop Detection", icon='CANCEL')
         else:
@@ -65,9 +69,22 @@ class CGT_PT_MP_DetectorProperties(cgt_core_panel.DefaultPanel, bpy.types.Panel)
         elif user.enum_detection_type == 'HOLISTIC':
             layout.row().prop(user, "holistic_model_complexity")
 
+        layout.row().prop(user, "detection_mode")
+        if user.detection_input_type != 'movie':
+            layout.row().prop(user, "frame_policy")
+        layout.row().prop(user, "buffered_keyframes")
         layout.row().prop(user, "min_detection_confidence", slider=True)
 
 
+class CGT_PT_MP_Filter(cgt_core_panel.DefaultPanel, bpy.types.Panel):
+    bl_label = "Filter"
+    bl_parent_id = "UI_PT_CGT_Detection"
+    bl_options = {'DEFAULT_CLOSED'}
+
+    def draw(self, context):
+        cgt_core_filter.draw_filter_settings(self.layout, context)
+
+
 class CGT_PT_MP_Warning(cgt_core_panel.DefaultPanel, bpy.types.Panel):
     bl_label = "Mediapipe"
     bl_parent_id = "UI_PT_CGT_Panel"
@@ -94,7 +111,8 @@ class CGT_PT_MP_Warning(cgt_core_panel.DefaultPanel, bpy.types.Panel):
 classes = [
     CGT_PT_MP_Warning,
     CGT_PT_MP_Detection,
-    CGT_PT_MP_DetectorProperties
+    CGT_PT_MP_DetectorProperties,
+    CGT_PT_MP_Filter,
 ]
 
 
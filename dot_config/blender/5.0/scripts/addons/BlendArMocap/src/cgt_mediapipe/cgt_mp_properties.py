@@ -44,6 +44,17 @@ class MP_PG_Properties(bpy.types.PropertyGroup):
                     "latency generally go up with the model complexity. "
                     "Default to 1.")
 
+    detection_mode: bpy.props.EnumProperty(
+        name="Detection Mode",
+        description="Video mode keeps one model session and tracks landmarks between frames, "
+                    "static image mode runs full detection on every frame.",
+        items=(
+            ("VIDEO", "Video", "Track landmarks between frames (faster, temporally stable)"),
+            ("IMAGE", "Static Image", "Detect landmarks independently on every frame"),
+        ),
+        default="VIDEO"
+    )
+
     min_detection_confidence: bpy.props.FloatProperty(
         name="Min Tracking Confidence", default=0.5, min=0.0, max=1.0,
         description="Minimum confidence value ([0.0, 1.0]) from the detection "
@@ -88,6 +99,21 @@ class MP_PG_Properties(bpy.types.PropertyGroup):
         )
     )
 
+    batch_detection: bpy.props.BoolProperty(
+        name="Batch Detection",
+        description="Detect the whole movie in background processes and write the results "
+                    "to f-curves at once. Supports Pose, Face and Holistic detection.",
+        default=False
+    )
+
+    batch_processes: bpy.props.IntProperty(
+        name="Processes",
+        description="Number of detection processes, 0 uses all cores.",
+        min=0,
+        max=64,
+        default=0
+    )
+
     webcam_input_device: bpy.props.IntProperty(
         name="Webcam Device Slot",
         description="Select Webcam device.",
@@ -96,6 +122,25 @@ class MP_PG_Properties(bpy.types.PropertyGroup):
         default=0
     )
 
+    frame_policy: bpy.props.EnumProperty(
+        name="Frame Policy",
+        description="How webcam frames get handed from capture to detection while it runs in the background. "
+                    "Movies always detect every frame.",
+        items=(
+            ("AUTO", "Auto", "Drop frames for webcam input, keep every frame for movies"),
+            ("DROP_OLDEST", "Drop Oldest", "Skip frames detection can't keep up with (lowest latency)"),
+            ("KEEP_ALL", "Keep All", "Detect every frame in order"),
+        ),
+        default="AUTO"
+    )
+
+    buffered_keyframes: bpy.props.BoolProperty(
+        name="Buffered Keyframes",
+        description="Collect keyframes while detecting and write them to the f-curves in chunks. "
+                    "Faster than inserting every keyframe, keys appear in chunks in the graph editor.",
+        default=True
+    )
+
     key_frame_step: bpy.props.IntProperty(
         name="Key Step",
         description="Select keyframe step rate.",
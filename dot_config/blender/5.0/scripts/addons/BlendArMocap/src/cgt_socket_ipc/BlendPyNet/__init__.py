@@ -17,6 +17,7 @@ Copyright (C) Denys Hsu, cgtinker, cgtinker.com, hello@cgtinker.com
 
 import logging
 import bpy
+import time
 import queue
 from .b3dnet.src.b3dnet import connection as bnc
 from .b3dnet.src.b3dnet import request as bnr
@@ -39,6 +40,30 @@ QUEUE: queue.Queue[bnr.Task] = queue.Queue()
 logging.getLogger().setLevel(logging.DEBUG)
 
 
+class ServerStats:
+    """ Counters of the running server, displayed in the connection panel. """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.executed = 0
+        self.coalesced = 0
+        self.batch = 0
+        self.latency = 0.0  # moving average in ms
+        self.latency_max = 0.0
+
+    def add_latency(self, task: bnr.Task, now: float):
+        if task.received is None:
+            return
+        ms = (now - task.received) * 1000.0
+        self.latency = ms if self.executed == 0 else self.latency + (ms - self.latency) * .1
+        self.latency_max = max(self.latency_max, ms)
+
+
+STATS = ServerStats()
+
+
 class PG_CGT_BlendArSock_Properties(bpy.types.PropertyGroup):
     port: bpy.props.IntProperty(  # type: ignore
         default=6000, soft_min=1000, soft_max=9999,
@@ -63,6 +88,11 @@ class PG_CGT_BlendArSock_Properties(bpy.types.PropertyGroup):
         default=False, description="Internal Property for synchronisation."
     )
 
+    time_budget: bpy.props.FloatProperty(  # type: ignore
+        default=8.0, soft_min=1.0, soft_max=33.0, min=0.1,
+        description="Time in milliseconds used to execute queued tasks per update."
+    )
+
 
 class WM_OT_TCPServer(bpy.types.Operator):
     bl_label = "Server"
@@ -112,6 +142,7 @@ class WM_OT_TCPServer(bpy.types.Operator):
 
         # Start the modal if an connection has been established
         if self.server.running.is_set():
+            STATS.reset()
             self.user.server_active = True
             self.re_set_timer(context, 0.0)
             wm = context.window_manager
@@ -138,45 +169,84 @@ class WM_OT_TCPServer(bpy.types.Operator):
             self.cancel(context)
             return {'CANCELLED'}
 
-        # While q.size is not reliable, it's good enough.
+        # While q.empty is not reliable, it's good enough.
         # It doesn't matter if the queued task gets executed a frame later.
-        if QUEUE.qsize == 0:
-            return {'PASS_THROUGH'}
-
-        # Try getting the next task from the queue.
-        try:
-            request = QUEUE.get(block=False)
-        except queue.Empty:
-            request = None
-            pass
-
-        if not request or not request.flag:
+        if QUEUE.empty():
             return {'PASS_THROUGH'}
 
-        # Check for server related requests.
-        # 1. Shutdown server.
-        elif request.flag & bnr.TASK.SHUTDOWN:
+        if not self.execute_tasks(context):
             self.cancel(context)
             return {'CANCELLED'}
+        return {'PASS_THROUGH'}
+
+    def execute_tasks(self, context) -> bool:
+        """ Executes queued tasks until the time budget is used up.
+        Consecutive SET_OB tasks setting the same object without using objects as args get coalesced,
+        only the last one gets executed.
+        Returns False if the server should shut down. """
+        deadline = time.perf_counter() + self.user.time_budget / 1000.0
+        pending: Optional[bnr.Task] = None
+        batch = 0
+
+        while time.perf_counter() < deadline:
+            # Try getting the next task from the queue.
+            try:
+                request = QUEUE.get(block=False)
+            except queue.Empty:
+                break
+            QUEUE.task_done()
+
+            if not request or not request.flag:
+                continue
+
+            # Replace the pending write to the same object.
+            if pending is not None and is_set_ob(request) \
+                    and request.flag == pending.flag and request.idname == pending.idname:
+                pending = request
+                STATS.coalesced += 1
+                continue
+
+            if pending is not None:
+                self.execute_task(pending)
+                batch += 1
+                pending = None
+
+            # Check for server related requests.
+            # 1. Shutdown server.
+            if request.flag & bnr.TASK.SHUTDOWN:
+                return False
+
+            # 2. Restart server.
+            # Change the modals callback time to save resources
+            # when waiting for new connections.
+            elif request.flag & bnr.TASK.RESTART:
+                self.execute_task(request)
+                self.re_set_timer(context, 1.0)
+                self.pendeling = True
+                batch += 1
+                break
 
-        # 2. Restart server.
-        # Change the modals callback time to save resources
-        # when waiting for new connections.
-        elif request.flag & bnr.TASK.RESTART:
-            self.re_set_timer(context, 1.0)
-            self.pendeling = True
+            # 3. Server pendeling and received request
+            # If the server is pendeling, set the callback back to zero.
+            elif self.pendeling:
+                self.re_set_timer(context, 0.0)
+                self.pendeling = False
 
-        # 3. Server pendeling and received request
-        # If the server is pendeling, set the callback back to zero.
-        elif request and self.pendeling:
-            self.re_set_timer(context, 0.0)
-            self.pendeling = False
+            pending = request
 
-        # Execute the request.
-        request.execute()
-        QUEUE.task_done()
+        if pending is not None:
+            self.execute_task(pending)
+            batch += 1
 
-        return {'PASS_THROUGH'}
+        STATS.batch = batch
+        tag_redraw(context)
+        return True
+
+    @staticmethod
+    def execute_task(request: bnr.Task):
+        request.execute()
+        STATS.add_latency(request, time.perf_counter())
+        STATS.executed += 1
 
     def cancel(self, context):
         # Remove the wm timer.
@@ -209,6 +279,22 @@ class WM_OT_TCPServer(bpy.types.Operator):
         self._timer = wm.event_timer_add(timestep, window=context.window)
 
 
+def is_set_ob(request: bnr.Task) -> bool:
+    """ SET_OB tasks which don't read objects, only those may replace each other. """
+    flag = bnr.TASK.CALL_FN | bnr.TASK.SET_OB
+    uses_obs = bnr.TASK.OB_AS_ARG | bnr.TASK.OB_AS_KWARG
+    return request.flag & flag == flag and request.flag & uses_obs == 0
+
+
+def tag_redraw(context):
+    """ Redraw the panel to update the counters. """
+    if context.screen is None:
+        return
+    for area in context.screen.areas:
+        if area.type == 'VIEW_3D':
+            area.tag_redraw()
+
+
 class PT_UI_CGT_Connection_Panel(bpy.types.Panel):
     bl_space_type = "VIEW_3D"
     bl_region_type = "UI"
@@ -235,6 +321,15 @@ class PT_UI_CGT_Connection_Panel(bpy.types.Panel):
         col.separator()
 
         col.row(align=True).prop(data=user, property="authkey", text="Pass")
+        col.separator()
+        col.row(align=True).prop(data=user, property="time_budget", text="Budget (ms)")
+
+        if user.server_active:
+            box = layout.box()
+            col = box.column(align=True)
+            col.label(text=f"Queued: {QUEUE.qsize()}  Last Batch: {STATS.batch}")
+            col.label(text=f"Executed: {STATS.executed}  Coalesced: {STATS.coalesced}")
+            col.label(text=f"Latency: {STATS.latency:.1f} ms  Max: {STATS.latency_max:.1f} ms")
 
 
 classes = [
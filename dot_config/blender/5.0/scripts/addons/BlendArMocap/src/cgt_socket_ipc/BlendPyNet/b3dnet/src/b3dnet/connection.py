@@ -106,7 +106,8 @@ class SocketWrapper(mpc.Connection):
         self.sock = sock
 
     def recv_bytes(self, *_):
-        return recv_bytes(self.sock)
+        buf = recv_bytes(self.sock)
+        return bytes(buf) if buf is not None else None
 
     def send_bytes(self, buf):
         send_bytes(self.sock, buf)
@@ -119,15 +120,21 @@ class TCPServerHandler(socketserver.StreamRequestHandler):
         logging.info(
             f"Run threaded TCPServer: {self.server.running.is_set()} {self.server.flag & SERVER.CONNECTED}")
         self.req = None
+        # functions sent during this connection
+        self.functions = FunctionTable()
 
         while self.server.flag & SERVER.CONNECTED:
-            b: Optional[bytes] = recv_bytes(self.request)
+            b: Optional[bytearray] = recv_bytes(self.request)
             if b is None:
                 logging.warning("Reading operation timed out, shut down.")
                 self.server.running.clear()
                 break
 
-            self.req = Task.from_bytes(b)
+            try:
+                self.req = Task.from_bytes(b, self.functions)
+            except (KeyError, ValueError, TypeError) as err:
+                logging.error(f"Received invalid task: {err}")
+                continue
             self.server.queue.put(self.req)
             if self.req.flag & (TASK.RESTART | TASK.SHUTDOWN):
                 logging.debug("Received server control request...")
@@ -174,10 +181,12 @@ class TCPClient:
         self.port = port
         self.authkey = authkey
         self.thread_running = threading.Event()
+        self.functions = FunctionTable()
         self.flag = 0
 
     def connect(self) -> int:
         address = (self.host, self.port)
+        self.functions.clear()
 
         try:
             self.conn = mpc.Client(
@@ -222,7 +231,7 @@ class TCPClient:
             self.flag |= CLIENT.SHUTDOWN
 
         try:
-            data = buf.to_bytes()
+            data = buf.to_bytes(self.functions)
             self.conn.send_bytes(data)
         except BrokenPipeError:
             logging.warning("Update failed: Broken Pipe.")
@@ -249,11 +258,10 @@ class TCPClient:
 # region send & receive
 def _send_in_chunks(conn: socket.socket, buf: bytes) -> None:
     """ Send data in chunks if buf size exceeds. """
-    N = len(buf)
-    while N > 0:
-        chunksize = conn.send(buf)
-        N -= chunksize
-        buf = buf[chunksize:]
+    view = memoryview(buf)
+    while len(view) > 0:
+        chunksize = conn.send(view)
+        view = view[chunksize:]
 
 
 def send_bytes(conn: socket.socket, buf: bytes) -> None:
@@ -293,6 +301,14 @@ def _get_message_size(conn: Any) -> Optional[int]:
     return size
 
 
+def _recv_into(conn: Any, view: memoryview) -> Optional[int]:
+    """ Receive directly into a preallocated buffer. """
+    try:
+        return conn.recv_into(view)
+    except socket.timeout:
+        return None
+
+
 def _recv(conn: Any, size: int) -> Optional[bytes]:
     """ When switching modules (b.e. to multiprocessing or socket)
     receiving may functions differently b.e. os.read(fp, s). """
@@ -302,28 +318,28 @@ def _recv(conn: Any, size: int) -> Optional[bytes]:
         return None
 
 
-def _recv_in_chunks(conn: Any, size: int, buffer=b'') -> Optional[bytes]:
-    """ Receive data in chunks and returns combined message.
+def _recv_in_chunks(conn: Any, size: int) -> Optional[bytearray]:
+    """ Receive data in chunks into a single buffer.
     This receive method requires the correct size of the incomming buffer. """
+    buffer = bytearray(size)
+    view = memoryview(buffer)
     remaining = size
     while remaining > 0:
-        chunk = _recv(conn, remaining)
-        if chunk is None:
+        n = _recv_into(conn, view[size - remaining:])
+        if n is None:
             return None
 
-        n = len(chunk)
         if n == 0:
             if remaining == size:
                 raise EOFError
             else:
                 raise OSError("got end of file during message")
-        buffer += chunk
         remaining -= n
 
     return buffer
 
 
-def recv_bytes(conn: Any) -> Optional[bytes]:
+def recv_bytes(conn: Any) -> Optional[bytearray]:
     """ Read data from request handle. """
     size = _get_message_size(conn)
     if not size:
@@ -17,14 +17,22 @@ Copyright (C) cgtinker, cgtinker.com, hello@cgtinker.com
 
 import ast
 import sys
+import time
+import array
+import struct
 import inspect
 import textwrap
 import json
 import logging
-from typing import Optional, Any, Callable, Union, List
+from typing import Optional, Any, Callable, Union, List, Dict, Tuple
 from io import StringIO
 from dataclasses import dataclass
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 
 class TaskDict(dict):
     """ Wrapping for dicts clear method. 
@@ -81,6 +89,7 @@ class Task:
     func: Optional[Callable]
     args: list
     kwargs: dict
+    received: Optional[float] = None  # perf counter when the server decoded the task
 
     def __init__(self, flag: int, idname: Optional[Union[str, List[str]]] = None, call: Optional[Callable] = None, *args, **kwargs):
         """ Task object to be send via the socket.
@@ -157,9 +166,36 @@ class Task:
         self.kwargs = kwargs
         self._validate()
 
-    def to_bytes(self) -> bytes:
-        """ Convert request to bytes.
-        Conversion depends on flag. """
+    def to_bytes(self, functions: Optional['FunctionTable'] = None) -> bytes:
+        """ Convert request to the binary encoding.
+        Functions which have been sent using the same table get referenced by id. """
+        fn_id, source = -1, None
+        if self.flag & (TASK.NEW_FN | TASK.NEW_OB):
+            fn_id, source = _encode_func(self.func, functions)  # type: ignore
+
+        if isinstance(self.idname, list):
+            idkind, idnames = _IDNAME_LIST, self.idname
+        elif self.idname is None:
+            idkind, idnames = _IDNAME_NONE, []
+        else:
+            idkind, idnames = _IDNAME_STR, [self.idname]
+
+        parts = [_HEADER.pack(MAGIC, self.flag, fn_id, idkind, len(idnames), len(self.args), len(self.kwargs))]
+        for name in idnames:
+            _pack_str(parts, name)
+        _pack_str(parts, source or '')
+        for arg in self.args:
+            _pack_value(parts, arg)
+        for k, v in self.kwargs.items():
+            _pack_str(parts, k)
+            _pack_value(parts, v)
+
+        if functions is not None and self.flag & TASK.CLEAR_CACHE:
+            functions.clear()
+        return b''.join(parts)
+
+    def to_json(self) -> bytes:
+        """ Convert request to a json string, functions always get sent as source. """
         d = self.__dict__.copy()
         if self.flag & (TASK.NEW_FN | TASK.NEW_OB):
             d['func'] = _func2string(self.func)  # type: ignore
@@ -167,17 +203,39 @@ class Task:
         return j.encode('utf-8')
 
     @ classmethod
-    def from_bytes(cls, resp: bytes):
-        """ Creates request from bytes. """
-        s = resp.decode('utf-8')
-        d = json.loads(s)
-        return cls(
-            d['flag'],
-            d['idname'],
-            _string2func(d['func']),
-            *d['args'],
-            **d['kwargs']
-        )
+    def from_bytes(cls, resp: Union[bytes, bytearray, memoryview], functions: Optional['FunctionTable'] = None):
+        """ Creates request from the binary encoding or a json string.
+        Bulk arrays reference the received buffer instead of getting copied. """
+        view = memoryview(resp)
+        if view[:len(MAGIC)] != MAGIC:
+            d = json.loads(view.tobytes().decode('utf-8'))
+            task = cls(
+                d['flag'],
+                d['idname'],
+                _string2func(d['func']),
+                *d['args'],
+                **d['kwargs']
+            )
+            task.received = time.perf_counter()
+            return task
+
+        reader = _Reader(view)
+        _, flag, fn_id, idkind, n_idnames, n_args, n_kwargs = reader.unpack(_HEADER)
+        idnames = [reader.str() for _ in range(n_idnames)]
+        source = reader.str() or None
+        args = [reader.value() for _ in range(n_args)]
+        kwargs = {reader.str(): reader.value() for _ in range(n_kwargs)}
+
+        func = None
+        if fn_id >= 0 or source is not None:
+            func = _decode_func(fn_id, source, functions)
+        if functions is not None and flag & TASK.CLEAR_CACHE:
+            functions.clear()
+
+        idname = idnames if idkind == _IDNAME_LIST else (idnames[0] if idkind == _IDNAME_STR else None)
+        task = cls(flag, idname, func, *args, **kwargs)
+        task.received = time.perf_counter()
+        return task
 
     def execute(self) -> Optional[Any]:
         """ Executes a request depending on it's flag. """
@@ -364,6 +422,200 @@ class Task:
         return "".join(arr)
 
 
+class FunctionTable:
+    """ Functions shared by a client and a server during a connection.
+    The first task sending a function assigns an id and contains its source,
+    following tasks only reference the id. Both sides clear the table on CLEAR_CACHE. """
+
+    def __init__(self):
+        self.ids: Dict[Any, int] = {}
+        self.funcs: Dict[int, Callable] = {}
+
+    def clear(self):
+        self.ids.clear()
+        self.funcs.clear()
+
+    def __len__(self):
+        return max(len(self.ids), len(self.funcs))
+
+
+def _encode_func(func: Callable, functions: Optional[FunctionTable]) -> Tuple[int, Optional[str]]:
+    """ Id and source of a function, the source is None if the function has been sent before. """
+    if functions is None:
+        return -1, _func2string(func)
+
+    # closures of the same definition share their code
+    key = getattr(func, '__code__', func)
+    fn_id = functions.ids.get(key)
+    if fn_id is not None:
+        return fn_id, None
+
+    fn_id = functions.ids[key] = len(functions.ids)
+    return fn_id, _func2string(func)
+
+
+def _decode_func(fn_id: int, source: Optional[str], functions: Optional[FunctionTable]) -> Callable:
+    """ Compiles and registers sent functions, looks up referenced functions. """
+    if source is not None:
+        func = _string2func(source)
+        if functions is not None and fn_id >= 0:
+            functions.funcs[fn_id] = func
+        return func  # type: ignore
+
+    if functions is None or fn_id not in functions.funcs:
+        raise KeyError(f"Function id {fn_id} has not been registered.")
+    return functions.funcs[fn_id]
+
+
+# region binary encoding
+# magic, flag, function id, idname kind, number of idnames, args and kwargs
+MAGIC = b'B3D\x01'
+_HEADER = struct.Struct('!4sIiBHHH')
+_IDNAME_NONE, _IDNAME_STR, _IDNAME_LIST = 0, 1, 2
+
+_U8 = struct.Struct('!B')
+_U32 = struct.Struct('!I')
+_I64 = struct.Struct('!q')
+_F64 = struct.Struct('!d')
+
+# buffers are little endian and get aligned, so arrays can be read directly from the message
+_ALIGNMENT = 8
+
+# numpy dtype kind + itemsize to struct / array format
+_FORMATS = {
+    'f4': 'f', 'f8': 'd',
+    'i1': 'b', 'i2': 'h', 'i4': 'i', 'i8': 'q',
+    'u1': 'B', 'u2': 'H', 'u4': 'I', 'u8': 'Q',
+}
+
+
+def _pack_str(parts: list, s: str):
+    b = s.encode('utf-8')
+    parts.append(_U32.pack(len(b)))
+    parts.append(b)
+
+
+def _pack_buffer(parts: list, dtype: str, shape: tuple, buf):
+    """ Tag, dtype, shape, padding and the raw buffer. """
+    parts.append(b'a')
+    _pack_str(parts, dtype)
+    parts.append(_U8.pack(len(shape)))
+    parts.extend(_U32.pack(n) for n in shape)
+    offset = sum(len(p) for p in parts)
+    parts.append(b'\x00' * (-offset % _ALIGNMENT))
+    parts.append(buf)
+
+
+def _pack_value(parts: list, value: Any):
+    """ Tagged encoding of args, numeric buffers are sent raw. """
+    if value is None:
+        parts.append(b'N')
+    elif value is True or value is False:
+        parts.append(b'T' if value else b'F')
+    elif isinstance(value, int):
+        parts.append(b'i')
+        parts.append(_I64.pack(value))
+    elif isinstance(value, float):
+        parts.append(b'd')
+        parts.append(_F64.pack(value))
+    elif isinstance(value, str):
+        parts.append(b's')
+        _pack_str(parts, value)
+    elif isinstance(value, (bytes, bytearray)):
+        parts.append(b'y')
+        parts.append(_U32.pack(len(value)))
+        parts.append(bytes(value))
+    elif np is not None and isinstance(value, np.ndarray):
+        dtype = f'{value.dtype.kind}{value.dtype.itemsize}'
+        if dtype not in _FORMATS:
+            raise TypeError(f"Arrays of type {value.dtype} can't be sent.")
+        value = np.ascontiguousarray(value, dtype='<' + dtype)
+        _pack_buffer(parts, dtype, value.shape, memoryview(value).cast('B'))
+    elif isinstance(value, array.array):
+        kind = 'f' if value.typecode in 'fd' else ('u' if value.typecode.isupper() else 'i')
+        if sys.byteorder != 'little':
+            value = array.array(value.typecode, value)
+            value.byteswap()
+        _pack_buffer(parts, kind + str(value.itemsize), (len(value),), memoryview(value).cast('B'))
+    elif isinstance(value, (list, tuple)):
+        parts.append(b'l')
+        parts.append(_U32.pack(len(value)))
+        for v in value:
+            _pack_value(parts, v)
+    elif isinstance(value, dict):
+        parts.append(b'm')
+        parts.append(_U32.pack(len(value)))
+        for k, v in value.items():
+            _pack_str(parts, str(k))
+            _pack_value(parts, v)
+    else:
+        raise TypeError(f"Values of type {type(value)} can't be sent.")
+
+
+class _Reader:
+    """ Reads the binary encoding from a buffer without copying arrays. """
+
+    def __init__(self, view: memoryview):
+        self.view = view
+        self.offset = 0
+
+    def take(self, n: int) -> memoryview:
+        if self.offset + n > len(self.view):
+            raise ValueError("Received task is truncated.")
+        chunk = self.view[self.offset:self.offset + n]
+        self.offset += n
+        return chunk
+
+    def unpack(self, fmt: struct.Struct) -> tuple:
+        return fmt.unpack(self.take(fmt.size))
+
+    def str(self) -> str:
+        n, = self.unpack(_U32)
+        return str(self.take(n), 'utf-8')
+
+    def array(self):
+        dtype = self.str()
+        ndim, = self.unpack(_U8)
+        shape = tuple(self.unpack(_U32)[0] for _ in range(ndim))
+        self.take(-self.offset % _ALIGNMENT)
+
+        count = 1
+        for n in shape:
+            count *= n
+        buf = self.take(count * int(dtype[1:]))
+        if np is not None:
+            return np.frombuffer(buf, dtype='<' + dtype, count=count).reshape(shape)
+        return buf.cast(_FORMATS[dtype], shape) if count > 0 else []
+
+    def value(self) -> Any:
+        tag = bytes(self.take(1))
+        if tag == b'N':
+            return None
+        elif tag == b'T':
+            return True
+        elif tag == b'F':
+            return False
+        elif tag == b'i':
+            return self.unpack(_I64)[0]
+        elif tag == b'd':
+            return self.unpack(_F64)[0]
+        elif tag == b's':
+            return self.str()
+        elif tag == b'y':
+            n, = self.unpack(_U32)
+            return self.take(n).tobytes()
+        elif tag == b'a':
+            return self.array()
+        elif tag == b'l':
+            n, = self.unpack(_U32)
+            return [self.value() for _ in range(n)]
+        elif tag == b'm':
+            n, = self.unpack(_U32)
+            return {self.str(): self.value() for _ in range(n)}
+        raise ValueError(f"Received task contains unknown tag: {tag}")
+# endregion
+
+
 def _filter_func_str(s: Optional[str]) -> Optional[str]:
     """ Remove comments, wrappers and most modules.
     Focus support on tools within blender. """
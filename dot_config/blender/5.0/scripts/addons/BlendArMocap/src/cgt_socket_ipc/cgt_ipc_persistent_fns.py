@@ -2,6 +2,8 @@ from typing import Optional
 from ..cgt_core.cgt_core_chains import (
     FaceNodeChain, PoseNodeChain, HandNodeChain, HolisticNodeChainGroup
 )
+from ..cgt_core.cgt_patterns import cgt_landmarks
+from ..cgt_core.cgt_patterns.cgt_landmarks import LandmarkFrame
 from .BlendPyNet.b3dnet.src.b3dnet.connection import CACHE
 
 
@@ -27,10 +29,10 @@ def process_holisitic(data: Optional[list], frame: int):
     if CACHE.get(HOLI_CHAIN_ID) is None:
         CACHE[HOLI_CHAIN_ID] = HolisticNodeChainGroup()
 
-    data = [[[i, p] for i, p in enumerate(model)] for model in data]
     pose, face, lhand, rhand = data
-    hands = [[lhand], [rhand]]
-    CACHE[HOLI_CHAIN_ID].update([hands, [face], pose], frame)
+    layout = cgt_landmarks.holistic_layout(len(face) > 468)
+    data = LandmarkFrame.from_parts(layout, pose=pose, face=face, left_hand=lhand, right_hand=rhand)
+    CACHE[HOLI_CHAIN_ID].update(data, frame)
     return True
 
 
@@ -42,7 +44,7 @@ def process_pose(data: Optional[list], frame: int):
     if CACHE.get(POSE_CHAIN_ID) is None:
         CACHE[POSE_CHAIN_ID] = PoseNodeChain()
 
-    data = [[i, p] for i, p in enumerate(data)]
+    data = LandmarkFrame.from_parts(cgt_landmarks.POSE, pose=data)
     CACHE[POSE_CHAIN_ID].update(data, frame)
     return True
 
@@ -55,7 +57,8 @@ def process_hand(data: Optional[list], frame: int):
     if CACHE.get(HAND_CHAIN_ID) is None:
         CACHE[HAND_CHAIN_ID] = HandNodeChain()
 
-    data = [[[[i, p] for i, p in enumerate(hand)]] for hand in data]
+    lhand, rhand = data
+    data = LandmarkFrame.from_parts(cgt_landmarks.HAND, left_hand=lhand, right_hand=rhand)
     CACHE[HAND_CHAIN_ID].update(data, frame)
     return True
 
@@ -68,6 +71,6 @@ def process_face(data: Optional[list], frame: int):
     if CACHE.get(FACE_CHAIN_ID) is None:
         CACHE[FACE_CHAIN_ID] = FaceNodeChain()
 
-    data = [[i, p] for i, p in enumerate(data)]
-    CACHE[FACE_CHAIN_ID].update([data], frame)
+    data = LandmarkFrame.from_parts(cgt_landmarks.face_layout(len(data) > 468), face=data)
+    CACHE[FACE_CHAIN_ID].update(data, frame)
     return True
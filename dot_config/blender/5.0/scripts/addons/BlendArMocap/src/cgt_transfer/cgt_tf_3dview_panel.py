@@ -54,6 +54,23 @@ class CgtRigifyTransferProperties(bpy.types.PropertyGroup):
         poll=cgt_collection_poll
     )
 
+    transfer_mode: bpy.props.EnumProperty(
+        name="Mode",
+        items=(
+            ("DRIVERS", "Drivers", "Transfer using drivers, the rig follows changes of the mocap data"),
+            ("BAKE", "Bake", "Evaluate the drivers over the frame range once and write f-curves, "
+                             "playback doesn't depend on drivers"),
+        ),
+        default="DRIVERS"
+    )
+
+    fold_constants: bpy.props.BoolProperty(
+        name="Fold Constants",
+        default=True,
+        description="Fold remapping properties into the driver expressions, so Blender can evaluate them "
+                    "without Python. Changed remapping properties require another transfer."
+    )
+
 
 class PT_CGT_Main_Transfer(cgt_core_panel.DefaultPanel, Panel):
     bl_label = "Transfer"
@@ -85,6 +102,7 @@ class PT_CGT_Main_Transfer(cgt_core_panel.DefaultPanel, Panel):
 
         if not user.advanced_features:
             row.label(icon='BLANK1')
+            self.draw_transfer_mode(user, layout.column(align=True))
             row = layout.row(align=True)
             row.use_property_decorate = False
             row.operator("button.cgt_object_apply_properties",
@@ -125,11 +143,21 @@ class PT_CGT_Main_Transfer(cgt_core_panel.DefaultPanel, Panel):
             row.prop(user, "save_object_properties_bool", text="",
                      toggle=True, icon='CANCEL', invert_checkbox=True)
 
+        self.draw_transfer_mode(user, col)
         row = col.row(align=True)
         row.use_property_decorate = False
         row.operator("button.cgt_object_apply_properties",
                      text="Transfer Animation", icon="DRIVER")
 
+    @staticmethod
+    def draw_transfer_mode(user, layout):
+        row = layout.row(align=True)
+        row.use_property_decorate = False
+        row.prop(user, "transfer_mode", expand=True)
+        row = layout.row(align=True)
+        row.use_property_decorate = False
+        row.prop(user, "fold_constants")
+
 
 class PT_CGT_Advanced_Transfer(cgt_core_panel.DefaultPanel, Panel):
     bl_label = "Advanced"
@@ -207,7 +207,8 @@ class OT_CGT_TransferObjectProperties(bpy.types.Operator):
         return context.mode in {'OBJECT'}
 
     def execute(self, context):
-        tf_transfer_management.main(context.selected_objects)
+        user = context.scene.cgtinker_transfer  # noqa
+        tf_transfer_management.main(context.selected_objects, user.fold_constants, user.transfer_mode == 'BAKE')
         self.report({'INFO'}, f"Transferred from {len(context.selected_objects)} selected objects.")
         return {'FINISHED'}
 
@@ -338,7 +339,7 @@ class OT_CGT_ApplyObjectProperties(bpy.types.Operator):
                 get_objects(sub)
 
         get_objects(col)
-        tf_transfer_management.main(objects)
+        tf_transfer_management.main(objects, user.fold_constants, user.transfer_mode == 'BAKE')
         context.view_layer.update()
         self.report({'INFO'}, f"Transferred objects from {col.name}.")
         return {'FINISHED'}
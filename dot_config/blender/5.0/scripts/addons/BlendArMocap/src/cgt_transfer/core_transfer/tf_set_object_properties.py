@@ -21,6 +21,9 @@ def set_constraint_props(constraint: bpy.types.Constraint, props: dict):
     for key, value in props.items():
         if not hasattr(constraint, key):
             continue
+        # unchanged values don't trigger updates
+        if getattr(constraint, key) == value:
+            continue
         setattr(constraint, key, value)
 
 
@@ -164,15 +167,12 @@ def set_chain_driver(prev_obj: bpy.types.Object, obj: bpy.types.Object, previous
             expression = f"{round(distance, 4)}/dist*(loc-prev_loc)"
         factory.add_expression(expression, "location", i)
 
-    factory.execute()
-
 
 def set_copy_location_driver(target, factory: cgt_drivers.DriverFactory, space: str = 'WORLD_SPACE'):
     for i in range(0, 3):
         prop = cgt_drivers.TransformChannel("loc", target, "location", i, space)
         factory.add_variable(prop, "location", i)
         factory.add_expression("loc", "location", i)
-    factory.execute()
 
 
 def set_copy_rotation_driver(target, factory: cgt_drivers.DriverFactory, space: str = 'WORLD_SPACE'):
@@ -180,5 +180,4 @@ def set_copy_rotation_driver(target, factory: cgt_drivers.DriverFactory, space:
         prop = cgt_drivers.TransformChannel("rot", target, "rotation_euler", i, space)
         factory.add_variable(prop, "rotation_euler", i)
         factory.add_expression("rot", "rotation_euler", i)
-    factory.execute()
 # endregion
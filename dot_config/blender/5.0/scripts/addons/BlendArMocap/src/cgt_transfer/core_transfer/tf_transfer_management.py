@@ -1,21 +1,33 @@
 from __future__ import annotations
 import bpy
 import logging
+import numpy as np
 from typing import Optional, Union, List, Dict
 
 from . import tf_get_object_properties, tf_set_object_properties
-from ...cgt_core.cgt_bpy import cgt_drivers, cgt_bpy_utils, cgt_collection
+from ...cgt_core.cgt_bpy import cgt_drivers, cgt_bpy_utils, cgt_collection, cgt_fc_actions
 
-from collections import namedtuple
+from collections import namedtuple, defaultdict
 
 ChainLink = namedtuple('ChainLink', ['obj', 'parent'])
+ConstraintLink = namedtuple('ConstraintLink', ['target', 'obj', 'driver_target'])
 chain_link_items = []
 
+# drivers and constraints get planned for all objects first and applied at once
+planned_factories: List[cgt_drivers.DriverFactory] = []
+planned_constraints: List[ConstraintLink] = []
+fold_constants = False
 
-def main(objects: List[bpy.types.Object]):
-    """ Apply list of objects containing active cgt_props. """
-    global chain_link_items
+
+def main(objects: List[bpy.types.Object], fold: bool = False, bake: bool = False):
+    """ Apply list of objects containing active cgt_props.
+        fold: fold remapping properties into the driver expressions.
+        bake: evaluate the drivers over the frame range and write f-curves instead of drivers. """
+    global chain_link_items, fold_constants
     chain_link_items.clear()
+    planned_factories.clear()
+    planned_constraints.clear()
+    fold_constants = fold
 
     logging.debug('########## START TRANSFER ##########')
     for obj in objects:
@@ -25,6 +37,24 @@ def main(objects: List[bpy.types.Object]):
     logging.debug('########## FOUND CHAIN LINKS ##########')
     link_object_chain(chain_links)
     logging.debug('########## LINKED CHAINS ##########')
+    apply_planned_transfer(bake)
+    logging.debug('########## APPLIED TRANSFER ##########')
+
+
+def apply_planned_transfer(bake: bool = False):
+    """ Applies planned drivers and constraints, identical drivers get skipped. """
+    applied = 0
+    if bake:
+        bake_planned_drivers(bpy.context.scene)
+    else:
+        for factory in planned_factories:
+            applied += factory.execute(clear_unused=True)
+    for link in planned_constraints:
+        apply_constraints(link.target, link.obj, link.driver_target)
+    logging.debug(f"Applied {applied} drivers, {len(planned_constraints)} constraint links.")
+
+    planned_factories.clear()
+    planned_constraints.clear()
 
 
 def manage_object_transfer(obj: bpy.types.Object):
@@ -59,16 +89,12 @@ def remap_by_object_distance(obj, target_obj, sub_target, target_type, propertie
 
     # create driver object
     driver_target = get_driver_target(obj)
-    factory = cgt_drivers.DriverFactory(driver_target)
+    factory = create_factory(driver_target)
 
-    # apply drivers
+    # plan drivers
     tf_set_object_properties.set_distance_remapping_drivers(factory, props, remapping_props, obj, dist)
-    factory.execute()
-
-    if target_type in ['OBJECT', 'ARMATURE']:
-        apply_constraints(target_obj, obj, driver_target)
-    elif target_type in ['BONE', 'POSE_BONE']:
-        apply_constraints(sub_target, obj, driver_target)
+    planned_factories.append(factory)
+    plan_constraints(target_obj, sub_target, target_type, obj, driver_target)
 
 
 def remap_object_properties(obj, target_obj, sub_target, target_type, properties):
@@ -81,39 +107,113 @@ def remap_object_properties(obj, target_obj, sub_target, target_type, properties
 
     # create driver object
     driver_target = get_driver_target(obj)
-    factory = cgt_drivers.DriverFactory(driver_target)
+    factory = create_factory(driver_target)
 
-    # apply drivers
+    # plan drivers and constraints
     tf_set_object_properties.set_object_remapping_drivers(factory, obj, remapping_properties, dist)
-    factory.execute()
+    planned_factories.append(factory)
+    plan_constraints(target_obj, sub_target, target_type, obj, driver_target)
+
+
+def bake_planned_drivers(scene: bpy.types.Scene):
+    """ Evaluates the planned drivers over the frame range and writes the results to f-curves.
+        Inputs get sampled once per frame, the expressions get evaluated using numpy.
+        Drivers targeting planned driver objects use the baked results, so factories get
+        evaluated in planning order (chains are planned from root to tip). """
+    frames = np.arange(scene.frame_start, scene.frame_end + 1)
+    planned = [(factory, factory.planned_drivers()) for factory in planned_factories]
+    driver_targets = {factory.target for factory in planned_factories}
+
+    # driver objects only depend on their f-curves after baking
+    for factory in planned_factories:
+        factory.remove_unused(())
+
+    # sample inputs which don't depend on other driver objects
+    inputs = {}
+    for factory, drivers in planned:
+        for variables, _ in drivers.values():
+            for var in variables:
+                if not is_baked_input(var, driver_targets):
+                    inputs.setdefault(var.signature(), var)
+
+    samples = {key: np.empty(len(frames)) for key in inputs}
+    current = scene.frame_current
+    for i, frame in enumerate(frames):
+        scene.frame_set(int(frame))
+        for key, var in inputs.items():
+            samples[key][i] = var.evaluate()
+    scene.frame_set(current)
+
+    # evaluate the drivers
+    baked = {}
+    for factory, drivers in planned:
+        for (path, idx), (variables, expression) in drivers.items():
+            values = {}
+            for var in variables:
+                if is_baked_input(var, driver_targets):
+                    values[var.name] = baked.get((var.obj, var.transform, var.idx), 0.0)
+                else:
+                    values[var.name] = samples[var.signature()]
+
+            result = evaluate_driver(factory, values, expression, len(frames))
+            if result is None:
+                continue
+            if not np.isfinite(result).all():
+                logging.warning(f"Baked driver {factory.target.name}.{path}[{idx}] contains invalid values.")
+                result = np.nan_to_num(result, nan=0.0, posinf=0.0, neginf=0.0)
+            baked[(factory.target, path, max(idx, 0))] = result
 
-    # apply constraints
-    if target_type in ['OBJECT', 'ARMATURE']:
-        apply_constraints(target_obj, obj, driver_target)
-    elif target_type in ['BONE', 'POSE_BONE']:
-        apply_constraints(sub_target, obj, driver_target)
+    # write f-curves
+    for (target, path, idx), result in baked.items():
+        fc = cgt_fc_actions.ensure_fcurves(target, path, idx + 1)[idx]
+        cgt_fc_actions.set_keyframes(fc, frames, result)
+    logging.debug(f"Baked {len(baked)} drivers over {len(frames)} frames.")
+
+
+def is_baked_input(var: cgt_drivers.Variable, driver_targets: set) -> bool:
+    """ Transforms of driver objects get taken from baked results. """
+    return isinstance(var, cgt_drivers.TransformChannel) and var.obj in driver_targets
+
+
+def evaluate_driver(factory: cgt_drivers.DriverFactory, values: Dict[str, np.ndarray],
+                    expression: Optional[str], size: int) -> Optional[np.ndarray]:
+    """ Evaluates a driver for arrays of variable values. """
+    if factory.type == 'SCRIPTED':
+        if expression is None:
+            return None
+        return cgt_drivers.evaluate_expression(expression, values, size)
+
+    if not values:
+        return None
+    stacked = np.stack([np.broadcast_to(value, (size, )) for value in values.values()])
+    reduce = {'SUM': np.sum, 'AVERAGE': np.mean, 'MIN': np.min, 'MAX': np.max}[factory.type]
+    return reduce(stacked, axis=0)
 
 
 def find_chain_links(chain_items: List[ChainLink]) -> Dict[bpy.types.Object, dict]:
     """ Reconstruct chain links in trie structure. """
-    def dfs_reconstruct_chain(items: list, branch: dict, target: Optional[bpy.types.Object], seen: set):
-        for item in items:
+    # index links by parent in a single pass
+    children = defaultdict(list)
+    for item in chain_items:
+        children[item.parent].append(item)
+
+    def dfs_reconstruct_chain(branch: dict, target: Optional[bpy.types.Object], seen: set):
+        for item in children.get(target, ()):
             if item in seen:
                 continue
 
-            if item.parent == target:
-                seen.add(item)
-                branch[item.obj] = {}
-                dfs_reconstruct_chain(items, branch[item.obj], item.obj, seen)
+            seen.add(item)
+            branch[item.obj] = {}
+            dfs_reconstruct_chain(branch[item.obj], item.obj, seen)
 
     # reconstruct chains in trie structure
     chains_dict = {}
-    dfs_reconstruct_chain(chain_items, chains_dict, None, set())
+    dfs_reconstruct_chain(chains_dict, None, set())
     return chains_dict
 
 
 def link_object_chain(chains_dict: Dict[bpy.types.Object, dict]):
-    """ Apply chain links recursively based on obj trie structure with cgt_props. """
+    """ Plan chain links recursively based on obj trie structure with cgt_props. """
     def apply_chain_link(chain_link_dict, previous_obj, previous_driver):
         for current_obj in chain_link_dict.keys():
             # get properties for chain link
@@ -123,17 +223,15 @@ def link_object_chain(chains_dict: Dict[bpy.types.Object, dict]):
             if not tar_dist:
                 tar_dist = 1
 
-            # apply driver
+            # plan driver
             driver_target = get_driver_target(current_obj)
-            factory = cgt_drivers.DriverFactory(driver_target)
+            factory = create_factory(driver_target)
             tf_set_object_properties.set_chain_driver(previous_obj, current_obj, previous_driver, factory, tar_dist)
             tf_set_object_properties.set_copy_rotation_driver(current_obj, factory, 'WORLD_SPACE')
+            planned_factories.append(factory)
 
-            # apply constraints
-            if target_type in ['OBJECT', 'ARMATURE']:
-                apply_constraints(target_obj, current_obj, driver_target)
-            elif target_type in ['BONE', 'POSE_BONE']:
-                apply_constraints(sub_target, current_obj, driver_target)
+            # plan constraints
+            plan_constraints(target_obj, sub_target, target_type, current_obj, driver_target)
 
             # next chain link
             apply_chain_link(chain_link_dict[current_obj], current_obj, driver_target)
@@ -145,40 +243,64 @@ def link_object_chain(chains_dict: Dict[bpy.types.Object, dict]):
 
         # set driver for chain start
         driver_target = get_driver_target(chain_obj)
-        factory = cgt_drivers.DriverFactory(driver_target)
+        factory = create_factory(driver_target)
         tf_set_object_properties.set_copy_location_driver(sub_target, factory, 'WORLD_SPACE')
         tf_set_object_properties.set_copy_rotation_driver(sub_target, factory, 'WORLD_SPACE')
+        planned_factories.append(factory)
 
         # recv chain links
         apply_chain_link(chains_dict[chain_obj], chain_obj, driver_target)
 
 
 # region helper
+def create_factory(driver_target: bpy.types.Object) -> cgt_drivers.DriverFactory:
+    return cgt_drivers.DriverFactory(driver_target, fold_constants=fold_constants)
+
+
 def get_driver_target(obj: bpy.types.Object) -> bpy.types.Object:
-    """ Returns a driver factory which uses an obj based on the name of the input obj.
-        Deletes driver object of the same name if it exists. """
-    if obj.name + '.D' in bpy.data.objects:
-        bpy.data.objects.remove(bpy.data.objects[obj.name + '.D'])
-    driver_target = cgt_bpy_utils.add_empty(0.001, obj.name + '.D', 'SPHERE')
+    """ Returns an obj based on the name of the input obj to add drivers to.
+        Reuses the driver object of the same name if it exists, so unchanged drivers can be kept. """
+    driver_target = bpy.data.objects.get(obj.name + '.D')
+    if driver_target is None:
+        driver_target = cgt_bpy_utils.add_empty(0.001, obj.name + '.D', 'SPHERE')
     cgt_collection.add_object_to_collection('cgt_DRIVERS', driver_target)
     return driver_target
 
 
+def plan_constraints(target_obj, sub_target, target_type: str, obj: bpy.types.Object,
+                     driver_target: bpy.types.Object) -> None:
+    """ Stores the constraints to apply to the object or bone target. """
+    if target_type in ['OBJECT', 'ARMATURE']:
+        planned_constraints.append(ConstraintLink(target_obj, obj, driver_target))
+    elif target_type in ['BONE', 'POSE_BONE']:
+        planned_constraints.append(ConstraintLink(sub_target, obj, driver_target))
+
+
 def apply_constraints(target_obj: Union[bpy.types.Object, bpy.types.PoseBone], obj: bpy.types.Object,
                       driver_target: bpy.types.Object) -> None:
-    """ Apply constraint """
+    """ Apply constraint, constraints of the same type targeting the driver get reused. """
     # TODO: move to set_props (?)
-    for c in target_obj.constraints:
-        if c.active and c.is_valid:
-            continue
-        target_obj.constraints.remove(c)
+    reusable = defaultdict(list)
+    for c in list(target_obj.constraints):
+        if not (c.active and c.is_valid):
+            target_obj.constraints.remove(c)
+        elif getattr(c, 'target', None) == driver_target:
+            reusable[c.type].append(c)
 
     for c in obj.constraints:
         constraint_name = c.type
         constraint_props = tf_get_object_properties.get_constraint_props(c)
-        constraint = target_obj.constraints.new(constraint_name)
+        if reusable[constraint_name]:
+            constraint = reusable[constraint_name].pop(0)
+        else:
+            constraint = target_obj.constraints.new(constraint_name)
         constraint_props['target'] = driver_target
         tf_set_object_properties.set_constraint_props(constraint, constraint_props)
+
+    # constraints which have been removed from the obj
+    for constraints in reusable.values():
+        for c in constraints:
+            target_obj.constraints.remove(c)
 # endregion
 
 
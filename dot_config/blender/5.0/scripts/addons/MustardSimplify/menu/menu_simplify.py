@@ -2,6 +2,7 @@ import bpy
 
 from . import MainPanel
 from .. import __package__ as base_package
+from ..utils.execution_profile import profile
 
 
 class MUSTARDSIMPLIFY_PT_Simplify(MainPanel, bpy.types.Panel):
@@ -220,6 +221,51 @@ class MUSTARDSIMPLIFY_PT_Simplify_ExecutionTimes(MainPanel, bpy.types.Panel):
             row2.label(text=str(int(settings.execution_times_overhead * 1000)) + " ms")
 
 
+class MUSTARDSIMPLIFY_PT_Simplify_ExecutionTimes_Hotspots(MainPanel, bpy.types.Panel):
+    bl_label = "Hotspots"
+    bl_parent_id = "MUSTARDSIMPLIFY_PT_Simplify_ExecutionTimes"
+    bl_options = {"DEFAULT_CLOSED"}
+
+    def draw(self, context):
+        scene = context.scene
+        layout = self.layout
+        settings = scene.MustardSimplify_Settings
+        modifiers = scene.MustardSimplify_SetModifiers.modifiers
+
+        col = layout.column(align=True)
+        col.prop(settings, "execution_times_history")
+        col.prop(settings, "execution_times_hotspots")
+
+        row = layout.row(align=True)
+        row.operator("mustard_simplify.export_execution_profile", icon="EXPORT")
+        row.operator("mustard_simplify.clear_execution_profile", icon="TRASH", text="")
+
+        if not profile.samples:
+            layout.label(text="No samples yet", icon="INFO")
+            return
+
+        box = layout.box()
+        row = box.row()
+        row.label(text="Object / Modifier")
+        row.scale_x = 0.3
+        row.label(text="p50")
+        row.label(text="p95")
+        row.label(text="Max")
+
+        for hotspot in profile.hotspots(settings.execution_times_hotspots):
+            modifier = modifiers.get(hotspot["type"])
+            row = box.row()
+            row.operator("mustard_simplify.select_hotspot", text=hotspot["object"] + " / " + hotspot["modifier"],
+                         icon=modifier.icon if modifier else "MODIFIER", emboss=False).object = hotspot["object"]
+            row.alert = hotspot["p95"] > 0.1
+            row.scale_x = 0.3
+            row.label(text=str(int(hotspot["p50"] * 1000)) + " ms")
+            row.label(text=str(int(hotspot["p95"] * 1000)) + " ms")
+            row.label(text=str(int(hotspot["max"] * 1000)) + " ms")
+
+        box.label(text=str(len(profile.frames)) + " samples", icon="TIME")
+
+
 class MUSTARDSIMPLIFY_PT_Simplify_Advanced(MainPanel, bpy.types.Panel):
     bl_label = "Advanced"
     bl_parent_id = "MUSTARDSIMPLIFY_PT_Simplify"
@@ -253,11 +299,13 @@ def register():
     bpy.utils.register_class(MUSTARDSIMPLIFY_PT_Simplify_Options)
     bpy.utils.register_class(MUSTARDSIMPLIFY_PT_Simplify_Exceptions)
     bpy.utils.register_class(MUSTARDSIMPLIFY_PT_Simplify_ExecutionTimes)
+    bpy.utils.register_class(MUSTARDSIMPLIFY_PT_Simplify_ExecutionTimes_Hotspots)
     bpy.utils.register_class(MUSTARDSIMPLIFY_PT_Simplify_Advanced)
 
 
 def unregister():
     bpy.utils.unregister_class(MUSTARDSIMPLIFY_PT_Simplify_Advanced)
+    bpy.utils.unregister_class(MUSTARDSIMPLIFY_PT_Simplify_ExecutionTimes_Hotspots)
     bpy.utils.unregister_class(MUSTARDSIMPLIFY_PT_Simplify_ExecutionTimes)
     bpy.utils.unregister_class(MUSTARDSIMPLIFY_PT_Simplify_Exceptions)
     bpy.utils.unregister_class(MUSTARDSIMPLIFY_PT_Simplify_Options)
@@ -89,6 +89,17 @@ class MustardSimplify_Settings(bpy.types.PropertyGroup):
                                              description="Frames between Execution Time computation updates.\nA small number can affect Viewport performance.\nSet to 0 to update at every frame",
                                              default=30,
                                              min=0)
+    execution_times_history: IntProperty(name="History",
+                                         description="Number of Execution Time samples to keep for every Object "
+                                                     "modifier.\nStatistics and Hotspots are computed on these samples",
+                                         default=120,
+                                         min=1,
+                                         max=10000)
+    execution_times_hotspots: IntProperty(name="Hotspots",
+                                          description="Number of Object modifiers to show in the Hotspots list",
+                                          default=10,
+                                          min=1,
+                                          max=100)
     execution_time_order: EnumProperty(name="Execution Time list order",
                                  default="NAME",
                                  items=(
@@ -30,42 +30,69 @@ class MUSTARDSIMPLIFY_OT_SimplifyScene(bpy.types.Operator):
 
     def execute(self, context):
 
-        def add_prop_status(collection, item):
-            for el in collection:
-                if el.name == item[0] and el.status == item[1]:
-                    return
+        # Indexes are built once per run, so that lookups don't scan collections for every object
+
+        def add_prop_status(collection, added, item):
+            # added: set of (name, status) already stored in the collection
+            key = (item[0], item[1])
+            if key in added:
+                return
+            added.add(key)
             add_item = collection.add()
             add_item.name = item[0]
             add_item.status = item[1]
             return
 
-        def find_prop_status(collection, mod):
+        def index_prop_status(collection):
+            # The first entry with a given name wins, as in a linear search
+            index = {}
             for el in collection:
-                if el.name == mod.name:
-                    return el.name, el.status
+                index.setdefault(el.name, el.status)
+            return index
+
+        def find_prop_status(index, mod):
+            if mod.name in index:
+                return mod.name, index[mod.name]
             return "", None
 
-        def find_exception_obj(collection, obj):
-            for el in collection:
-                if el.exception == obj:
-                    return el
-            return None
+        exceptions_index = {}
+        for el in context.scene.MustardSimplify_Exceptions.exceptions:
+            if el.exception is not None:
+                exceptions_index.setdefault(el.exception, el)
+
+        def find_exception_obj(obj):
+            return exceptions_index.get(obj)
+
+        def action_fcurves(action):
+            if bpy.app.version < (4, 4, 0):
+                return action.fcurves
+            return [fcu for layer in action.layers for strip in layer.strips
+                    for bag in strip.channelbags for fcu in bag.fcurves]
+
+        # Animated data paths per ID: {pointer: ({data_path: has keyframes}, {driven data_path})}
+        animated_paths = {}
+
+        def get_animated_paths(ob):
+            key = ob.as_pointer()
+            paths = animated_paths.get(key)
+            if paths is None:
+                keyframed = {}
+                driven = set()
+                anim = ob.animation_data
+                if anim is not None:
+                    if anim.action is not None:
+                        for fcu in action_fcurves(anim.action):
+                            keyframed.setdefault(fcu.data_path, len(fcu.keyframe_points) > 0)
+                    if anim.drivers is not None:
+                        driven = {fcu.data_path for fcu in anim.drivers}
+                paths = animated_paths[key] = (keyframed, driven)
+            return paths
 
         def has_keyframe(ob, attr):
-            anim = ob.animation_data
-            if anim is not None and anim.action is not None:
-                for fcu in anim.action.fcurves:
-                    if fcu.data_path == attr:
-                        return len(fcu.keyframe_points) > 0
-            return False
+            return get_animated_paths(ob)[0].get(attr, False)
 
         def has_driver(ob, attr):
-            anim = ob.animation_data
-            if anim is not None and anim.drivers is not None:
-                for fcu in anim.drivers:
-                    if fcu.data_path == attr:
-                        return True
-            return False
+            return attr in get_animated_paths(ob)[1]
 
         scene = context.scene
         settings = scene.MustardSimplify_Settings
@@ -81,8 +108,8 @@ class MUSTARDSIMPLIFY_OT_SimplifyScene(bpy.types.Operator):
         # Remove objects in the exception collection
         objects = [x for x in context.scene.objects if x.override_library is None]
         if settings.exception_collection is not None:
-            objects = [x for x in context.scene.objects if not x in [x for x in (
-                settings.exception_collection.all_objects if settings.exception_include_subcollections else settings.exception_collection.objects)]]
+            exception_objects = set(settings.exception_collection.all_objects if settings.exception_include_subcollections else settings.exception_collection.objects)
+            objects = [x for x in context.scene.objects if not x in exception_objects]
 
         # Create list of objects to simplify
         objects_ignore = settings.modifiers
@@ -94,7 +121,7 @@ class MUSTARDSIMPLIFY_OT_SimplifyScene(bpy.types.Operator):
             if not len(chosen_objs):
                 objects_ignore = settings.objects_ignore
             else:
-                objects_ignore = [x.name for x in chosen_objs if not x.simplify]
+                objects_ignore = {x.name for x in chosen_objs if not x.simplify}
 
         # Create list of modifiers to simplify
         modifiers_ignore = settings.modifiers
@@ -106,13 +133,17 @@ class MUSTARDSIMPLIFY_OT_SimplifyScene(bpy.types.Operator):
             if not len(chosen_mods):
                 modifiers_ignore = settings.modifiers_ignore
             else:
-                modifiers_ignore = [x.name for x in chosen_mods if not x.simplify]
+                modifiers_ignore = {x.name for x in chosen_mods if not x.simplify}
 
         if addon_prefs.debug:
             print("\n ----------- MUSTARD SIMPLIFY LOG -----------")
 
+        # The modifiers list only has to be defined once per run
+        if settings.modifiers and self.enable_simplify:
+            define_modifiers(scene)
+
         for obj in objects:
-            eo = find_exception_obj(scene.MustardSimplify_Exceptions.exceptions, obj)
+            eo = find_exception_obj(obj)
 
             if addon_prefs.debug:
                 print("\n ----------- Object: " + obj.name + " -----------")
@@ -133,9 +164,6 @@ class MUSTARDSIMPLIFY_OT_SimplifyScene(bpy.types.Operator):
             # Object Modifiers
             if settings.modifiers and (eo.modifiers if eo is not None else True):
 
-                if self.enable_simplify:
-                    define_modifiers(scene)
-
                 modifiers = [
                     x for x in obj.modifiers
                     if not x.type in modifiers_ignore and not (
@@ -147,6 +175,7 @@ class MUSTARDSIMPLIFY_OT_SimplifyScene(bpy.types.Operator):
 
                 if self.enable_simplify:
                     obj.MustardSimplify_Status.modifiers.clear()
+                    added = set()
                     for mod in modifiers:
                         # Skip Normals Smooth modifier
                         if mod.type == "NODES" and mod.node_group is not None:
@@ -155,11 +184,12 @@ class MUSTARDSIMPLIFY_OT_SimplifyScene(bpy.types.Operator):
                             if "shader" in mod.node_group.name.lower():
                                 continue
                         status = mod.show_viewport
-                        add_prop_status(obj.MustardSimplify_Status.modifiers, [mod.name, status])
+                        add_prop_status(obj.MustardSimplify_Status.modifiers, added, [mod.name, status])
                         mod.show_viewport = False
                         if addon_prefs.debug:
                             print("Modifier " + mod.name + " disabled (previous show_viewport: " + str(status) + ").")
                 else:
+                    status_index = index_prop_status(obj.MustardSimplify_Status.modifiers)
                     for mod in modifiers:
                         # Skip Normals Smooth modifier
                         if mod.type == "NODES" and mod.node_group is not None:
@@ -167,7 +197,7 @@ class MUSTARDSIMPLIFY_OT_SimplifyScene(bpy.types.Operator):
                                 continue
                             if "shader" in mod.node_group.name.lower():
                                 continue
-                        name, status = find_prop_status(obj.MustardSimplify_Status.modifiers, mod)
+                        name, status = find_prop_status(status_index, mod)
                         if name != "":
                             mod.show_viewport = status
                             if addon_prefs.debug:
@@ -178,10 +208,11 @@ class MUSTARDSIMPLIFY_OT_SimplifyScene(bpy.types.Operator):
 
                 if self.enable_simplify:
                     obj.MustardSimplify_Status.shape_keys.clear()
+                    added = set()
                     if obj.data.shape_keys is not None:
                         for sk in obj.data.shape_keys.key_blocks:
                             status = sk.mute
-                            add_prop_status(obj.MustardSimplify_Status.shape_keys, [sk.name, status])
+                            add_prop_status(obj.MustardSimplify_Status.shape_keys, added, [sk.name, status])
                             attr = f'key_blocks["{bpy.utils.escape_identifier(sk.name)}"].value'
                             
                             # We didn't use 0 to accomodate for diffeomorphic models shape-keys that use values in the range [-0.00000?, 0.00000?]
@@ -202,8 +233,9 @@ class MUSTARDSIMPLIFY_OT_SimplifyScene(bpy.types.Operator):
                                     print("Shape key " + sk.name + " not muted (previous mute: " + str(status) + ").")
                 else:
                     if obj.data.shape_keys is not None:
+                        status_index = index_prop_status(obj.MustardSimplify_Status.shape_keys)
                         for sk in obj.data.shape_keys.key_blocks:
-                            name, status = find_prop_status(obj.MustardSimplify_Status.shape_keys, sk)
+                            name, status = find_prop_status(status_index, sk)
                             if name != "":
                                 sk.mute = status
                                 if addon_prefs.debug:
@@ -280,7 +312,7 @@ class MUSTARDSIMPLIFY_OT_SimplifyScene(bpy.types.Operator):
                     collection = objects
                 for ob in collection:
                     if col == "objects":
-                        eo = find_exception_obj(scene.MustardSimplify_Exceptions.exceptions, ob)
+                        eo = find_exception_obj(ob)
                     if ob.animation_data is not None:
                         for driver in ob.animation_data.drivers:
                             dp = driver.data_path
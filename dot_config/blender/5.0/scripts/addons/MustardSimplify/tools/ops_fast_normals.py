@@ -21,96 +21,21 @@ class MUSTARDSIMPLIFY_OT_FastNormals(bpy.types.Operator):
 
     def execute(self, context):
 
-        def mirror(new, old):
-            """Copy attributes of the old node to the new node"""
-            new.parent = old.parent
-            new.label = old.label
-            new.mute = old.mute
-            new.hide = old.hide
-            new.select = old.select
-            new.location = old.location
-
-            # inputs
-            for (name, point) in old.inputs.items():
-                input = new.inputs.get(name)
-                if input:
-                    input.default_value = point.default_value
-                    for link in point.links:
-                        new.id_data.links.new(link.from_socket, input)
-
-            # outputs
-            for (name, point) in old.outputs.items():
-                output = new.outputs.get(name)
-                if output:
-                    output.default_value = point.default_value
-                    for link in point.links:
-                        new.id_data.links.new(output, link.to_socket)
-
-        def get_custom():
-            name = 'Normal Map Optimized'
-            group = bpy.data.node_groups.get(name)
-
-            if not group and self.custom:
-                group = default_custom_nodes()
-
-            return group
-
-        def set_custom(nodes):
-            group = get_custom()
-            if not group:
-                return
-
-            for node in reversed(nodes):
-                new = None
-                if self.custom:
-                    if isinstance(node, bpy.types.ShaderNodeNormalMap):
-                        new = nodes.new(type='ShaderNodeGroup')
-                        new.node_tree = group
-                else:
-                    if isinstance(node, bpy.types.ShaderNodeGroup):
-                        if node.node_tree == group:
-                            new = nodes.new(type='ShaderNodeNormalMap')
-
-                if new:
-                    name = node.name
-                    mirror(new, node)
-
-                    if isinstance(node, bpy.types.ShaderNodeNormalMap):
-                        uvNode = nodes.new('ShaderNodeUVMap')
-                        uvNode.uv_map = node.uv_map
-                        uvNode.name = node.name + " UV"
-                        uvNode.parent = new.parent
-                        uvNode.mute = True
-                        uvNode.hide = True
-                        uvNode.select = False
-                        uvNode.location = Vector((new.location.x, new.location.y - 150.))
-                        uvNode.id_data.links.new(uvNode.outputs['UV'], new.inputs["UV"])
-                    else:
-                        try:
-                            try:
-                                uvNode = nodes[node.name + " UV"]
-                            except:
-                                for input in node.inputs:
-                                    if input and isinstance(input, bpy.types.NodeSocketVector) and input.is_linked:
-                                        if isinstance(input.links[0].from_node, bpy.types.ShaderNodeUVMap):
-                                            uvNode = input.links[0].from_node
-                                            break
-                            new.uv_map = uvNode.uv_map
-                            nodes.remove(uvNode)
-                        except:
-                            print("Mustard Simplify - Could not restore UV before using Fast Normals")
-                            pass
-
-                    nodes.remove(node)
-                    new.name = name
-
-        for mat in bpy.data.materials:
-            set_custom(getattr(mat.node_tree, 'nodes', []))
-        for group in bpy.data.node_groups:
-            set_custom(group.nodes)
-
-        if (not self.custom) and get_custom():
-            bpy.data.node_groups.remove(get_custom())
+        name = 'Normal Map Optimized'
+        group = bpy.data.node_groups.get(name)
+
+        # Only trees that contain something to swap are touched
+        trees = index_normal_map_trees(group, self.custom)
+
+        if self.custom and trees and not group:
+            group = default_custom_nodes()
+
+        if group:
+            for tree, targets in trees:
+                swap_normal_nodes(tree, targets, group, self.custom)
+
+            if not self.custom:
+                bpy.data.node_groups.remove(group)
 
         settings = bpy.context.scene.MustardSimplify_Settings
         settings.simplify_fastnormals_status = self.custom
@@ -120,6 +45,144 @@ class MUSTARDSIMPLIFY_OT_FastNormals(bpy.types.Operator):
         return {'FINISHED'}
 
 
+def index_normal_map_trees(group, custom):
+    """Scan all materials and node groups once.
+
+    Returns a list of (node tree, nodes to swap) for the trees that contain normal map nodes
+    (when switching to custom) or the optimized group (when reverting).
+    """
+    trees = []
+    node_trees = [mat.node_tree for mat in bpy.data.materials if mat.node_tree]
+    node_trees.extend(ng for ng in bpy.data.node_groups if ng != group)
+
+    for tree in node_trees:
+        if custom:
+            targets = [node for node in tree.nodes if node.bl_idname == 'ShaderNodeNormalMap']
+        elif group:
+            targets = [node for node in tree.nodes
+                       if node.bl_idname == 'ShaderNodeGroup' and node.node_tree == group]
+        else:
+            targets = []
+        if targets:
+            trees.append((tree, targets))
+
+    return trees
+
+
+def swap_normal_nodes(tree, targets, group, custom):
+    """Replace the target nodes of one tree, then restore all their links in one batch.
+
+    Links are recorded by node name and socket before any node is removed. The new nodes take
+    over the names of the swapped ones, so links between two swapped nodes are restored too.
+    """
+    nodes = tree.nodes
+    swapped = {node.name for node in targets}
+    pending_links = [(socket_key(link.from_socket), socket_key(link.to_socket))
+                     for link in tree.links
+                     if link.from_node.name in swapped or link.to_node.name in swapped]
+    removed = set()
+
+    for node in targets:
+        if custom:
+            new = nodes.new(type='ShaderNodeGroup')
+            new.node_tree = group
+        else:
+            new = nodes.new(type='ShaderNodeNormalMap')
+
+        name = node.name
+        mirror(new, node)
+
+        if custom:
+            uvNode = nodes.new('ShaderNodeUVMap')
+            uvNode.uv_map = node.uv_map
+            uvNode.name = node.name + " UV"
+            uvNode.parent = new.parent
+            uvNode.mute = True
+            uvNode.hide = True
+            uvNode.select = False
+            uvNode.location = Vector((new.location.x, new.location.y - 150.))
+            pending_links.append(((uvNode.name, 'UV', 'UV'), (name, 'UV', 'UV')))
+        else:
+            try:
+                uvNode = nodes.get(node.name + " UV")
+                if uvNode is None:
+                    for input in node.inputs:
+                        if input and isinstance(input, bpy.types.NodeSocketVector) and input.is_linked:
+                            if isinstance(input.links[0].from_node, bpy.types.ShaderNodeUVMap):
+                                uvNode = input.links[0].from_node
+                                break
+                new.uv_map = uvNode.uv_map
+                removed.add(uvNode.name)
+                nodes.remove(uvNode)
+            except:
+                print("Mustard Simplify - Could not restore UV before using Fast Normals")
+                pass
+
+        nodes.remove(node)
+        new.name = name
+
+    links = tree.links
+    for from_key, to_key in pending_links:
+        from_socket = find_socket(nodes, from_key, swapped, removed, True)
+        to_socket = find_socket(nodes, to_key, swapped, removed, False)
+        if from_socket is not None and to_socket is not None:
+            links.new(from_socket, to_socket)
+
+
+def socket_key(socket):
+    """(node name, socket identifier, socket name) of a socket, valid after its node got swapped"""
+    return socket.node.name, socket.identifier, socket.name
+
+
+def find_socket(nodes, key, swapped, removed, output):
+    """Resolve a socket key in the tree after swapping.
+
+    Swapped nodes are replaced by a node of the same name, their sockets are matched by name
+    like the default values in mirror(). Other nodes are matched by socket identifier.
+    """
+    name, identifier, socket_name = key
+    if name in removed and name not in swapped:
+        return None
+
+    node = nodes.get(name)
+    if node is None:
+        return None
+
+    sockets = node.outputs if output else node.inputs
+    if name in swapped:
+        return sockets.get(socket_name)
+
+    for socket in sockets:
+        if socket.identifier == identifier:
+            return socket
+    return None
+
+
+def mirror(new, old):
+    """Copy attributes of the old node to the new node.
+
+    Links are restored by the caller, once all nodes of the tree are swapped.
+    """
+    new.parent = old.parent
+    new.label = old.label
+    new.mute = old.mute
+    new.hide = old.hide
+    new.select = old.select
+    new.location = old.location
+
+    # inputs
+    for (name, point) in old.inputs.items():
+        input = new.inputs.get(name)
+        if input:
+            input.default_value = point.default_value
+
+    # outputs
+    for (name, point) in old.outputs.items():
+        output = new.outputs.get(name)
+        if output:
+            output.default_value = point.default_value
+
+
 def default_custom_nodes():
     use_new_nodes = (2, 81) <= bpy.app.version < (3, 2, 0)
 
@@ -1,15 +1,18 @@
 from . import ops_link
 from . import ops_reset
 from . import execution_time
+from . import execution_profile
 
 
 def register():
     ops_link.register()
     ops_reset.register()
     execution_time.register()
+    execution_profile.register()
 
 
 def unregister():
+    execution_profile.unregister()
     execution_time.unregister()
     ops_reset.unregister()
     ops_link.unregister()
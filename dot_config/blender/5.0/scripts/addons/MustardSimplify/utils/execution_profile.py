@@ -0,0 +1,201 @@
+import bpy
+import csv
+import json
+import os
+from collections import deque
+from bpy.props import *
+from bpy_extras.io_utils import ExportHelper
+
+
+class ExecutionProfile:
+    """History of per-object, per-modifier execution times.
+
+    Every sample is stored in a ring buffer (one per object/modifier pair), so memory stays bounded
+    while animations play, and statistics are computed from the last samples only.
+    Pairs missing from the latest sample (removed objects or modifiers) are dropped, and the statistics
+    are cached until the next sample, so the panel can redraw without sorting the history again.
+    """
+
+    def __init__(self, history=120):
+        self.history = history
+        self.samples = {}
+        self.frames = deque(maxlen=history)
+        self._stats = None
+        self._hotspots = {}
+
+    def _invalidate(self):
+        self._stats = None
+        self._hotspots.clear()
+
+    def clear(self):
+        self.samples.clear()
+        self.frames.clear()
+        self._invalidate()
+
+    def set_history(self, history):
+        if history == self.history:
+            return
+        self.history = history
+        self.frames = deque(self.frames, maxlen=history)
+        for key, buffer in self.samples.items():
+            self.samples[key] = deque(buffer, maxlen=history)
+        self._invalidate()
+
+    def add(self, frame, timings):
+        """Store one sample, timings being a list of (object name, modifier name, modifier type, time)"""
+        self.frames.append(frame)
+        samples = {}
+        for obj_name, mod_name, mod_type, time in timings:
+            key = (obj_name, mod_name, mod_type)
+            buffer = samples.get(key)
+            if buffer is None:
+                buffer = self.samples.get(key)
+                if buffer is None:
+                    buffer = deque(maxlen=self.history)
+                samples[key] = buffer
+            buffer.append(time)
+        self.samples = samples
+        self._invalidate()
+
+    @staticmethod
+    def percentile(values, p):
+        """Linear interpolated percentile of a sorted list"""
+        if not values:
+            return 0.
+        pos = (len(values) - 1) * p / 100.
+        low = int(pos)
+        high = min(low + 1, len(values) - 1)
+        return values[low] + (values[high] - values[low]) * (pos - low)
+
+    def stats(self):
+        """Return a list of dictionaries with the statistics of every object/modifier pair"""
+        if self._stats is not None:
+            return self._stats
+
+        rows = []
+        for (obj_name, mod_name, mod_type), buffer in self.samples.items():
+            values = sorted(buffer)
+            rows.append({
+                "object": obj_name,
+                "modifier": mod_name,
+                "type": mod_type,
+                "samples": len(values),
+                "last": buffer[-1],
+                "mean": sum(values) / len(values),
+                "p50": self.percentile(values, 50),
+                "p95": self.percentile(values, 95),
+                "max": values[-1],
+            })
+        self._stats = rows
+        return rows
+
+    def hotspots(self, count, key="p95"):
+        rows = self._hotspots.get(key)
+        if rows is None:
+            rows = self._hotspots[key] = sorted(self.stats(), key=lambda x: x[key], reverse=True)
+        return rows[:count]
+
+
+# Kept in memory only, the history is not saved with the blend file
+profile = ExecutionProfile()
+
+stats_columns = ["object", "modifier", "type", "samples", "last", "mean", "p50", "p95", "max"]
+
+
+def record_execution_times(scene, timings):
+    settings = scene.MustardSimplify_Settings
+    profile.set_history(settings.execution_times_history)
+    profile.add(scene.frame_current, timings)
+
+
+class MUSTARDSIMPLIFY_OT_ExportExecutionProfile(bpy.types.Operator, ExportHelper):
+    """Export the execution time history statistics of every object modifier"""
+    bl_idname = "mustard_simplify.export_execution_profile"
+    bl_label = "Export Execution Times"
+    bl_options = {'REGISTER'}
+
+    filename_ext = ".csv"
+
+    filter_glob: StringProperty(default="*.csv;*.json", options={'HIDDEN'})
+
+    file_format: EnumProperty(name="Format",
+                              default="CSV",
+                              items=(
+                                  ("CSV", "CSV", "Comma separated values, one row per object modifier"),
+                                  ("JSON", "JSON", "JSON report with the statistics and the sampled frames")))
+
+    @classmethod
+    def poll(cls, context):
+        return len(profile.samples) > 0
+
+    def check(self, context):
+        self.filename_ext = ".json" if self.file_format == "JSON" else ".csv"
+        return super().check(context)
+
+    def execute(self, context):
+
+        stats = sorted(profile.stats(), key=lambda x: x["p95"], reverse=True)
+
+        try:
+            if self.file_format == "JSON":
+                with open(self.filepath, 'w') as f:
+                    json.dump({"frames": list(profile.frames),
+                               "history": profile.history,
+                               "modifiers": stats}, f, indent=2)
+            else:
+                with open(self.filepath, 'w', newline='') as f:
+                    writer = csv.DictWriter(f, fieldnames=stats_columns)
+                    writer.writeheader()
+                    writer.writerows(stats)
+        except OSError as e:
+            self.report({'ERROR'}, 'Mustard Simplify - Could not export Execution Times: ' + str(e))
+            return {'CANCELLED'}
+
+        self.report({'INFO'}, 'Mustard Simplify - Execution Times exported to ' + os.path.basename(self.filepath))
+        return {'FINISHED'}
+
+
+class MUSTARDSIMPLIFY_OT_ClearExecutionProfile(bpy.types.Operator):
+    """Clear the execution time history"""
+    bl_idname = "mustard_simplify.clear_execution_profile"
+    bl_label = "Clear Execution Times History"
+    bl_options = {'REGISTER'}
+
+    def execute(self, context):
+        profile.clear()
+        context.area.tag_redraw()
+        return {'FINISHED'}
+
+
+class MUSTARDSIMPLIFY_OT_SelectHotspot(bpy.types.Operator):
+    """Select the Object"""
+    bl_idname = "mustard_simplify.select_hotspot"
+    bl_label = "Select Object"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    object: StringProperty(default="")
+
+    def execute(self, context):
+        obj = context.scene.objects.get(self.object)
+        if obj is None:
+            self.report({'WARNING'}, 'Mustard Simplify - Object not found in the current scene.')
+            return {'CANCELLED'}
+
+        for o in context.selected_objects:
+            o.select_set(False)
+        obj.select_set(True)
+        context.view_layer.objects.active = obj
+        return {'FINISHED'}
+
+
+def register():
+    bpy.utils.register_class(MUSTARDSIMPLIFY_OT_ExportExecutionProfile)
+    bpy.utils.register_class(MUSTARDSIMPLIFY_OT_ClearExecutionProfile)
+    bpy.utils.register_class(MUSTARDSIMPLIFY_OT_SelectHotspot)
+
+
+def unregister():
+    profile.clear()
+    bpy.utils.unregister_class(MUSTARDSIMPLIFY_OT_SelectHotspot)
+    bpy.utils.unregister_class(MUSTARDSIMPLIFY_OT_ClearExecutionProfile)
+    bpy.utils.unregister_class(MUSTARDSIMPLIFY_OT_ExportExecutionProfile)
@@ -2,6 +2,7 @@ import bpy
 import time
 from bpy.app.handlers import persistent
 from .. import __package__ as base_package
+from .execution_profile import record_execution_times
 
 
 def update_all_execution_time():
@@ -16,6 +17,8 @@ def update_all_execution_time():
     for modifier in modifiers:
         modifier.time = 0.
 
+    timings = []
+
     if depsgraph:
         for obj in context.scene.objects:
             if obj:
@@ -23,6 +26,9 @@ def update_all_execution_time():
                 for modifier in ob_eval.modifiers:
                     if modifier.show_viewport:
                         modifiers[modifier.type].time += modifier.execution_time
+                        timings.append((obj.name, modifier.name, modifier.type, modifier.execution_time))
+
+    record_execution_times(scene, timings)
 
 
 @persistent
@@ -56,6 +62,8 @@ def update_animation_execution_time(scene):
     for modifier in modifiers:
         modifier.time = 0.
 
+    timings = []
+
     if depsgraph:
         for obj in context.scene.objects:
             if obj:
@@ -65,6 +73,9 @@ def update_animation_execution_time(scene):
                     for modifier in ob_eval.modifiers:
                         if modifier.show_viewport and modifier.type in modifiers_to_compute:
                             modifiers[modifier.type].time += modifier.execution_time
+                            timings.append((obj.name, modifier.name, modifier.type, modifier.execution_time))
+
+    record_execution_times(scene, timings)
 
     settings.execution_times_frames += 1
 
@@ -9,48 +9,137 @@ bl_info = {
 }
 
 import bpy
+import bmesh
 import socket
+import struct
+import threading
 import json
 
 scale_factor = 10
 scale_sphere = 0.3
 
-def receive_landmarks_from_server(host, port):
-    client_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-    client_socket.connect((host, port))
-    message = "Request landmarks"
-    client_socket.send(message.encode('utf-8'))
-
-    response = client_socket.recv(4096)
-    client_socket.close()
-
-    return response.decode('utf-8')
+HOST = "localhost"
+PORT = 12345
+
+# Streaming protocol: after connecting the client sends STREAM_REQUEST once, then
+# the server keeps sending frames, each a 4 byte big-endian length followed by
+# that many bytes of UTF-8 JSON ({"landmarks": ..., "closed_fist": ...}).
+STREAM_REQUEST = "Stream landmarks"
+FRAME_HEADER = struct.Struct(">I")
+RECONNECT_DELAY = 1.0
+
+class LandmarkStream:
+    """Background client that keeps one connection open and holds the latest frame"""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._sock = None
+        self._latest = None
+        self._sequence = 0
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive() and not self._stop.is_set():
+            return
+        # every thread gets its own event, a previous thread still connecting stays stopped
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(self._stop,), name="landmark-stream", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        with self._lock:
+            self._stop.set()
+            sock = self._sock
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+        self._thread = None
+
+    def latest(self):
+        """Return (sequence, frame) of the newest frame, frame is None until one arrived"""
+        with self._lock:
+            return self._sequence, self._latest
+
+    def _run(self, stop):
+        while not stop.is_set():
+            sock = None
+            try:
+                with socket.create_connection((self.host, self.port), timeout=5.0) as sock:
+                    sock.settimeout(None)
+                    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                    with self._lock:
+                        if stop.is_set():
+                            break
+                        self._sock = sock
+                    sock.sendall(STREAM_REQUEST.encode('utf-8'))
+                    self._read_frames(sock, stop)
+            except ConnectionRefusedError:
+                print(f"Connection to {self.host}:{self.port} refused")
+            except (ConnectionResetError, EOFError):
+                if not stop.is_set():
+                    print(f"Connection to {self.host}:{self.port} reset")
+            except Exception as e:
+                if not stop.is_set():
+                    print(f"Error: {e}")
+            finally:
+                with self._lock:
+                    if self._sock is sock:
+                        self._sock = None
+            stop.wait(RECONNECT_DELAY)
+
+    def _read_frames(self, sock, stop):
+        while not stop.is_set():
+            (length,) = FRAME_HEADER.unpack(self._recv_exact(sock, FRAME_HEADER.size))
+            payload = self._recv_exact(sock, length)
+            frame = json.loads(payload.decode('utf-8'))
+            with self._lock:
+                # a stopped thread doesn't replace frames of the current one
+                if stop.is_set():
+                    return
+                self._latest = frame
+                self._sequence += 1
+
+    @staticmethod
+    def _recv_exact(sock, size):
+        buf = bytearray(size)
+        view = memoryview(buf)
+        received = 0
+        while received < size:
+            n = sock.recv_into(view[received:])
+            if n == 0:
+                raise EOFError("connection closed")
+            received += n
+        return buf
+
+stream = None
+
+def get_sphere_mesh():
+    """Shared UV sphere mesh used by every landmark object"""
+    mesh = bpy.data.meshes.get("landmark_sphere")
+    if mesh is None:
+        mesh = bpy.data.meshes.new("landmark_sphere")
+        bm = bmesh.new()
+        bmesh.ops.create_uvsphere(bm, u_segments=32, v_segments=16, radius=1.0)
+        bm.to_mesh(mesh)
+        bm.free()
+    return mesh
 
 def create_sphere(name, location):
-    bpy.ops.mesh.primitive_uv_sphere_add(location=location)
-    sphere = bpy.context.active_object
-    sphere.name = name
+    sphere = bpy.data.objects.new(name, get_sphere_mesh())
+    sphere.location = location
     sphere.scale = (scale_sphere, scale_sphere, scale_sphere)
+    bpy.context.scene.collection.objects.link(sphere)
     return sphere
 
-def update_landmarks():
-    host = "localhost"
-    port = 12345
-    
-    try:
-        response_data_str = receive_landmarks_from_server(host, port)
-    except ConnectionRefusedError:
-        print(f"Connection to {host}:{port} refused")
-        return
-    except ConnectionResetError:
-        print(f"Connection to {host}:{port} reset")
-        return
-    except Exception as e:
-        print(f"Error: {e}")
-        return
-
+def update_landmarks(response_data):
     # Process response data
-    response_data = json.loads(response_data_str)
     landmark_data = json.loads(response_data['landmarks'])
     closed_fist = response_data['closed_fist']
 
@@ -109,22 +198,37 @@ class TimerOperator(bpy.types.Operator):
     bl_category = "Tools"
 
     _timer = None
+    _applied = 0
 
     def modal(self, context, event):
         if event.type == 'TIMER':
-            update_landmarks()
+            # The network runs on the stream thread, only apply frames we haven't seen yet
+            sequence, frame = stream.latest()
+            if frame is not None and sequence != self._applied:
+                self._applied = sequence
+                try:
+                    update_landmarks(frame)
+                except Exception as e:
+                    print(f"Error: {e}")
 
         return {'PASS_THROUGH'}
 
     def execute(self, context):
+        global stream
+        if stream is None:
+            stream = LandmarkStream(HOST, PORT)
+        stream.start()
+
         wm = context.window_manager
-        self._timer = wm.event_timer_add(1.0 / 15.0, window=context.window)
+        self._timer = wm.event_timer_add(1.0 / 60.0, window=context.window)
         wm.modal_handler_add(self)
         return {'RUNNING_MODAL'}
 
     def cancel(self, context):
         wm = context.window_manager
         wm.event_timer_remove(self._timer)
+        if stream is not None:
+            stream.stop()
 
 def menu_func(self, context):
     self.layout.operator(TimerOperator.bl_idname)
@@ -134,6 +238,10 @@ def register():
     bpy.types.VIEW3D_MT_mesh_add.append(menu_func)
 
 def unregister():
+    global stream
+    if stream is not None:
+        stream.stop()
+        stream = None
     bpy.utils.unregister_class(TimerOperator)
     bpy.types.VIEW3D_MT_mesh_add.remove(menu_func)
 
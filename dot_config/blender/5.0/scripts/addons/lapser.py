@@ -9,139 +9,283 @@ bl_info = {
 }
 
 import bpy
+import numpy as np
+from bpy.app.handlers import persistent
 
 def fcurves_all(action):
-	BLENDER_VERSION = 5
-	fcurves = None
-	if BLENDER_VERSION == 5:
-		for layer in action.layers:
-			strips = layer.strips
-			for strip in strips:
-				for bag in strip.channelbags:
-					fcurves = bag.fcurves
-					break;break;break;
-	else:
-		fcurves = action.fcurves
+	"""Return the F-Curves of every layer, strip and slot channelbag of an action."""
+	if bpy.app.version < (4, 4, 0):
+		return list(action.fcurves)
+
+	fcurves = []
+	for layer in action.layers:
+		for strip in layer.strips:
+			for bag in strip.channelbags:
+				fcurves.extend(bag.fcurves)
 	return fcurves
 
-def get_shift_preview(frame, offset):
-    preview = {"nla_strips": [], "actions": [], "markers": [],
-               "scene_range": (), "preview_range": (), 
-               "baker_frames": [], "physics": []}
-
-    # NLA strips
-    for obj in bpy.data.objects:
-        ad = obj.animation_data
-        if not ad or not ad.nla_tracks:
-            continue
-        for track in ad.nla_tracks:
-            for strip in track.strips:
-                if strip.frame_start > frame:
-                    preview["nla_strips"].append(
-                        f"{obj.name}: {strip.name} → {strip.frame_start + offset}"
-                    )
-
-    # Loose actions (not in NLA)
-    nla_actions = {strip.action for obj in bpy.data.objects if obj.animation_data
-                   for track in obj.animation_data.nla_tracks
-                   for strip in track.strips if strip.action}
-
-    for action in bpy.data.actions:
-        if action not in nla_actions:
-            preview["actions"].append(
-                f"{action.name} → keys after {frame} shifted by {offset}"
-            )
-
-    # Markers
-    for m in bpy.context.scene.timeline_markers:
-        if m.frame > frame:
-            preview["markers"].append(f"{m.name} → {m.frame + offset}")
-
-    # Scene frame range
-    scene = bpy.context.scene
-    start = scene.frame_start + offset if scene.frame_start > frame else scene.frame_start
-    end = scene.frame_end + offset if scene.frame_end > frame else scene.frame_end
-    preview["scene_range"] = (start, end)
-
-    # Preview range
-    if scene.use_preview_range:
-        start = scene.frame_preview_start + offset if scene.frame_preview_start > frame else scene.frame_preview_start
-        end = scene.frame_preview_end + offset if scene.frame_preview_end > frame else scene.frame_preview_end
-        preview["preview_range"] = (start, end)
-
-    # Baker frames
-    for obj in bpy.data.objects:
-        if hasattr(obj, "baker_frame") and obj.baker_frame > frame:
-            preview["baker_frames"].append(f"{obj.name}: {obj.baker_frame + offset}")
-
-    # Physics
-    rbw = scene.rigidbody_world
-    if rbw and rbw.point_cache.frame_start > frame:
-        preview["physics"].append(f"RigidBodyWorld → {rbw.point_cache.frame_start + offset}")
-
-    for obj in scene.objects:
-        if obj.rigid_body and obj.rigid_body.start_frame > frame:
-            preview["physics"].append(f"{obj.name} RigidBody → {obj.rigid_body.start_frame + offset}")
-        for mod in obj.modifiers:
-            pc = getattr(mod, "point_cache", None)
-            if pc and pc.frame_start > frame:
-                preview["physics"].append(f"{obj.name} {mod.name} Cache → {pc.frame_start + offset}")
-        for ps in obj.particle_systems:
-            if ps.settings.frame_start > frame:
-                preview["physics"].append(f"{obj.name} Particle → {ps.settings.frame_start + offset}")
-
-    return preview
-
 
 # ------------------------------------------------------------
-# Action / F-Curve shifting
+# Shift plan
 # ------------------------------------------------------------
 
-def shift_fcurves(action, frame, offset):
-	for fcu in fcurves_all(action):
-		for kp in fcu.keyframe_points:
-			if kp.co.x > frame:
-				kp.co.x += offset
-				kp.handle_left.x += offset
-				kp.handle_right.x += offset
-		fcu.update()
+def build_shift_plan(scene, frame):
+	"""Scan the file once and collect everything that sits after frame.
+
+	The plan holds references to the data to move, so the preview dialog and the
+	operator work from the same scan instead of walking the scene per category.
+	"""
+	plan = {"frame": frame,
+	        "nla_strips": [], "actions": {}, "markers": [],
+	        "baker_frames": [], "physics": [],
+	        "lines": {}}
+
+	scene_objects = set(scene.objects)
+	nla_actions = set()
+	seen_caches = set()
+
+	def add_physics(label, owner, attr):
+		# Caches and particle settings can be shared, only shift them once
+		key = (owner.as_pointer(), attr)
+		if key in seen_caches or getattr(owner, attr) <= frame:
+			return
+		seen_caches.add(key)
+		plan["physics"].append((label, owner, attr))
+
+	for obj in bpy.data.objects:
+		# NLA strips
+		ad = obj.animation_data
+		if ad:
+			for track in ad.nla_tracks:
+				for strip in track.strips:
+					if strip.action:
+						nla_actions.add(strip.action)
+					if strip.frame_start > frame:
+						plan["nla_strips"].append((obj.name, strip))
+
+		# Baker frames
+		if hasattr(obj, "baker_frame") and obj.baker_frame > frame:
+			plan["baker_frames"].append(obj)
+
+		# Physics
+		if obj not in scene_objects:
+			continue
+		if obj.rigid_body:
+			add_physics(f"{obj.name} RigidBody", obj.rigid_body, "start_frame")
+		for mod in obj.modifiers:
+			pc = getattr(mod, "point_cache", None)
+			if pc:
+				add_physics(f"{obj.name} {mod.name} Cache", pc, "frame_start")
+		for ps in obj.particle_systems:
+			add_physics(f"{obj.name} Particle", ps.settings, "frame_start")
 
+	rbw = scene.rigidbody_world
+	if rbw and rbw.point_cache:
+		add_physics("RigidBodyWorld", rbw.point_cache, "frame_start")
 
-def shift_all_actions(frame, offset):
-    nla_actions = {strip.action for obj in bpy.data.objects if obj.animation_data
-                   for track in obj.animation_data.nla_tracks
-                   for strip in track.strips if strip.action}
+	# Loose actions (not in NLA), only those keyed after the insertion point
+	index = build_action_frame_index(a for a in bpy.data.actions if a not in nla_actions)
+	plan["actions"] = {action: rng for action, rng in index.items() if rng[1] > frame}
 
-    for action in bpy.data.actions:
-        if action not in nla_actions:
-            shift_fcurves(action, frame, offset)
+	# Markers
+	plan["markers"] = [m for m in scene.timeline_markers if m.frame > frame]
 
+	return plan
 
-# ------------------------------------------------------------
-# NLA
-# ------------------------------------------------------------
 
-def shift_nla_strips(frame, offset):
-	for obj in bpy.data.objects:
-		ad = obj.animation_data
-		if not ad or not ad.nla_tracks:
-			continue
+def get_shifted_ranges(scene, frame, offset):
+	"""Return the (scene range, preview range) the operator would produce."""
+	# Scene frame range
+	start = scene.frame_start + offset if scene.frame_start > frame else scene.frame_start
+	end = scene.frame_end + offset if scene.frame_end > frame else scene.frame_end
+	scene_range = (start, end)
 
-		for track in ad.nla_tracks:
-			for strip in track.strips:
-				if strip.frame_start > frame:
-					strip.frame_start += offset
-					strip.frame_end += offset
+	# Preview range
+	preview_range = ()
+	if scene.use_preview_range:
+		start = scene.frame_preview_start + offset if scene.frame_preview_start > frame else scene.frame_preview_start
+		end = scene.frame_preview_end + offset if scene.frame_preview_end > frame else scene.frame_preview_end
+		preview_range = (start, end)
+
+	return scene_range, preview_range
+
+
+# Bumped by a depsgraph handler so cached plans go stale when the file is edited
+_depsgraph_updates = 0
+_plan_cache = {}
+
+
+@persistent
+def _on_depsgraph_update(scene, depsgraph):
+	global _depsgraph_updates
+	_depsgraph_updates += 1
+
+
+@persistent
+def _on_reset(*args):
+	# Undo and file loads replace the datablocks the cached plan points at
+	_plan_cache.clear()
+
+
+def _reset_handlers():
+	h = bpy.app.handlers
+	return (h.load_post, h.undo_post, h.redo_post)
+
+
+def get_cached_plan(scene, frame):
+	"""Return the shift plan for frame, scanning the file only when something changed.
+
+	The plan does not depend on the offset, so dragging the frame count in the dialog
+	reuses the same scan.
+	"""
+	key = (scene.as_pointer(), frame, _depsgraph_updates)
+	plan = _plan_cache.get(key)
+	if plan is None:
+		_plan_cache.clear()
+		plan = _plan_cache[key] = build_shift_plan(scene, frame)
+	return plan
+
+
+PREVIEW_CATEGORIES = (
+	('NLA_STRIPS', "nla_strips", "NLA Strips"),
+	('ACTIONS', "actions", "Actions"),
+	('MARKERS', "markers", "Markers"),
+	('BAKER_FRAMES', "baker_frames", "Baker Frames"),
+	('PHYSICS', "physics", "Physics / Simulation Start Frames"),
+)
+
+
+def _format_preview_lines(plan, category, offset):
+	frame = plan["frame"]
+	items = plan[category]
+	if category == "nla_strips":
+		return [f"{name}: {strip.name} → {strip.frame_start + offset}" for name, strip in items]
+	if category == "actions":
+		return [f"{action.name} → keys after {frame} shifted by {offset}" for action in items]
+	if category == "markers":
+		return [f"{m.name} → {m.frame + offset}" for m in items]
+	if category == "baker_frames":
+		return [f"{obj.name}: {obj.baker_frame + offset}" for obj in items]
+	if category == "physics":
+		return [f"{label} → {getattr(owner, attr) + offset}" for label, owner, attr in items]
+	return []
+
+
+def get_preview_lines(plan, category, offset):
+	"""Format the preview lines of one category, only once per offset."""
+	key = (category, offset)
+	lines = plan["lines"].get(key)
+	if lines is None:
+		lines = plan["lines"][key] = _format_preview_lines(plan, category, offset)
+	return lines
+
+
+def apply_shift_plan(scene, plan, offset):
+	frame = plan["frame"]
+
+	# 1️⃣ Shift NLA strips first (so strips move as containers)
+	for _name, strip in plan["nla_strips"]:
+		strip.frame_start += offset
+		strip.frame_end += offset
+
+	# 2️⃣ Shift actions next (F-Curves inside actions)
+	# Actions referenced by NLA strips were left out of the plan to avoid double-shift
+	shift_all_actions(frame, offset, plan["actions"])
+
+	# 3️⃣ Shift everything else
+	for m in plan["markers"]:
+		m.frame += offset
+	shift_scene_range(scene, frame, offset)
+	shift_preview_range(scene, frame, offset)
+	for obj in plan["baker_frames"]:
+		obj.baker_frame += offset
+	for _label, owner, attr in plan["physics"]:
+		setattr(owner, attr, getattr(owner, attr) + offset)
 
 
 # ------------------------------------------------------------
-# Markers
+# Action / F-Curve shifting
 # ------------------------------------------------------------
 
-def shift_markers(scene, frame, offset):
-	for m in scene.timeline_markers:
-		if m.frame > frame:
-			m.frame += offset
+def _fcurve_shift(fcu, frame, offset):
+	"""Shift every key of a single F-Curve that lies after frame, in bulk."""
+	kps = fcu.keyframe_points
+	count = len(kps)
+	if count == 0:
+		return False
+
+	co = np.empty(count * 2, dtype=np.float32)
+	kps.foreach_get("co", co)
+	mask = co[0::2] > frame
+	if not mask.any():
+		return False
+
+	hl = np.empty(count * 2, dtype=np.float32)
+	hr = np.empty(count * 2, dtype=np.float32)
+	kps.foreach_get("handle_left", hl)
+	kps.foreach_get("handle_right", hr)
+
+	co[0::2][mask] += offset
+	hl[0::2][mask] += offset
+	hr[0::2][mask] += offset
+
+	kps.foreach_set("co", co)
+	kps.foreach_set("handle_left", hl)
+	kps.foreach_set("handle_right", hr)
+	fcu.update()
+	return True
+
+
+def fcurve_frame_range(fcu):
+	"""Return (first, last) key frame of an F-Curve, or None if it has no keys."""
+	kps = fcu.keyframe_points
+	count = len(kps)
+	if count == 0:
+		return None
+	co = np.empty(count * 2, dtype=np.float32)
+	kps.foreach_get("co", co)
+	xs = co[0::2]
+	return float(xs.min()), float(xs.max())
+
+
+def build_action_frame_index(actions):
+	"""Map each action to the (min, max) key frame over all of its F-Curves.
+
+	Actions without any keys are left out, so they never get visited when shifting.
+	"""
+	index = {}
+	for action in actions:
+		lo = hi = None
+		for fcu in fcurves_all(action):
+			rng = fcurve_frame_range(fcu)
+			if rng is None:
+				continue
+			lo = rng[0] if lo is None else min(lo, rng[0])
+			hi = rng[1] if hi is None else max(hi, rng[1])
+		if lo is not None:
+			index[action] = (lo, hi)
+	return index
+
+
+def shift_fcurves(action, frame, offset):
+	for fcu in fcurves_all(action):
+		_fcurve_shift(fcu, frame, offset)
+
+
+def shift_all_actions(frame, offset, index=None):
+    if index is None:
+        nla_actions = {strip.action for obj in bpy.data.objects if obj.animation_data
+                       for track in obj.animation_data.nla_tracks
+                       for strip in track.strips if strip.action}
+        index = build_action_frame_index(a for a in bpy.data.actions if a not in nla_actions)
+
+    for action, (lo, hi) in index.items():
+        # Nothing keyed after the insertion point, the whole action stays put
+        if hi <= frame:
+            continue
+        shift_fcurves(action, frame, offset)
+        index[action] = (lo + offset if lo > frame else lo, hi + offset)
+    return index
 
 
 # ------------------------------------------------------------
@@ -166,45 +310,6 @@ def shift_preview_range(scene, frame, offset):
 		scene.frame_preview_end += offset
 
 
-# ------------------------------------------------------------
-# Custom properties
-# ------------------------------------------------------------
-
-def shift_baker_frame(frame, offset):
-	for obj in bpy.data.objects:
-		if hasattr(obj, "baker_frame"):
-			if obj.baker_frame > frame:
-				obj.baker_frame += offset
-
-
-# ------------------------------------------------------------
-# Physics / simulation start frames
-# ------------------------------------------------------------
-
-def shift_physics(scene, frame, offset):
-	# Rigid body world
-	rbw = scene.rigidbody_world
-	if rbw and rbw.point_cache.frame_start > frame:
-		rbw.point_cache.frame_start += offset
-
-	for obj in scene.objects:
-		# Rigid body
-		if obj.rigid_body:
-			if obj.rigid_body.start_frame > frame:
-				obj.rigid_body.start_frame += offset
-
-		# Modifiers with caches
-		for mod in obj.modifiers:
-			pc = getattr(mod, "point_cache", None)
-			if pc and pc.frame_start > frame:
-				pc.frame_start += offset
-
-		# Particle systems
-		for ps in obj.particle_systems:
-			if ps.settings.frame_start > frame:
-				ps.settings.frame_start += offset
-
-
 # ------------------------------------------------------------
 # Operator
 # ------------------------------------------------------------
@@ -226,7 +331,15 @@ class LAPSER_OT_insert_gap(bpy.types.Operator):
 		default=False
 	)
 
+	expanded: bpy.props.EnumProperty(
+		name="Expanded",
+		items=[(key, label, "") for key, _category, label in PREVIEW_CATEGORIES],
+		options={'ENUM_FLAG'},
+		default=set()
+	)
+
 	def invoke(self, context, event):
+		_plan_cache.clear()
 		return context.window_manager.invoke_props_dialog(self)
 
 	def draw(self, context):
@@ -236,36 +349,29 @@ class LAPSER_OT_insert_gap(bpy.types.Operator):
 		col.prop(self, "frames")
 		col.prop(self, "show_all")
 
-		preview = get_shift_preview(context.scene.frame_current, self.frames)
-
-		show_amount = -1 if self.show_all else 5
-
-		if preview["nla_strips"]:
-			col.label(text="NLA Strips:")
-			for line in preview["nla_strips"][:show_amount]:
-				col.label(text="  " + line)
-
-		if preview["actions"]:
-			col.label(text="Actions:")
-			for line in preview["actions"][:show_amount]:
+		scene = context.scene
+		frame = scene.frame_current
+		plan = get_cached_plan(scene, frame)
+
+		show_amount = None if self.show_all else 5
+
+		for key, category, label in PREVIEW_CATEGORIES:
+			count = len(plan[category])
+			if not count:
+				continue
+			is_open = key in self.expanded
+			col.prop_enum(self, "expanded", key, text=f"{label} ({count})",
+			              icon='DOWNARROW_HLT' if is_open else 'RIGHTARROW')
+			if not is_open:
+				continue
+			# Detail lines are only formatted for the categories that are open
+			for line in get_preview_lines(plan, category, self.frames)[:show_amount]:
 				col.label(text="  " + line)
 
-		if preview["markers"]:
-			col.label(text="Markers:")
-			for line in preview["markers"][:show_amount]:
-				col.label(text="  " + line)
-
-		col.label(text=f"Scene Frame Range → {preview['scene_range']}")
-		if preview["preview_range"]:
-			col.label(text=f"Preview Range → {preview['preview_range']}")
-		if preview["baker_frames"]:
-			col.label(text="Baker Frames:")
-			for line in preview["baker_frames"][:show_amount]:
-				col.label(text="  " + line)
-		if preview["physics"]:
-			col.label(text="Physics / Simulation Start Frames:")
-			for line in preview["physics"][:show_amount]:
-				col.label(text="  " + line)
+		scene_range, preview_range = get_shifted_ranges(scene, frame, self.frames)
+		col.label(text=f"Scene Frame Range → {scene_range}")
+		if preview_range:
+			col.label(text=f"Preview Range → {preview_range}")
 
 
 	def execute(self, context):
@@ -273,19 +379,9 @@ class LAPSER_OT_insert_gap(bpy.types.Operator):
 		frame = scene.frame_current
 		offset = self.frames
 
-		# 1️⃣ Shift NLA strips first (so strips move as containers)
-		shift_nla_strips(frame, offset)
-
-		# 2️⃣ Shift actions next (F-Curves inside actions)
-		# Optional: skip actions already referenced by NLA strips to avoid double-shift
-		shift_all_actions(frame, offset)
-
-		# 3️⃣ Shift everything else
-		shift_markers(scene, frame, offset)
-		shift_scene_range(scene, frame, offset)
-		shift_preview_range(scene, frame, offset)
-		shift_baker_frame(frame, offset)
-		shift_physics(scene, frame, offset)
+		plan = get_cached_plan(scene, frame)
+		apply_shift_plan(scene, plan, offset)
+		_plan_cache.clear()
 
 		self.report({'INFO'}, f"Inserted {offset} frames after frame {frame}")
 		return {'FINISHED'}
@@ -322,9 +418,18 @@ classes = (
 def register():
 	for c in classes:
 		bpy.utils.register_class(c)
+	bpy.app.handlers.depsgraph_update_post.append(_on_depsgraph_update)
+	for handlers in _reset_handlers():
+		handlers.append(_on_reset)
 
 
 def unregister():
+	for handlers in _reset_handlers():
+		if _on_reset in handlers:
+			handlers.remove(_on_reset)
+	if _on_depsgraph_update in bpy.app.handlers.depsgraph_update_post:
+		bpy.app.handlers.depsgraph_update_post.remove(_on_depsgraph_update)
+	_plan_cache.clear()
 	for c in reversed(classes):
 		bpy.utils.unregister_class(c)
 
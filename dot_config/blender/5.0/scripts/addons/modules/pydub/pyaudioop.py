@@ -1,25 +1,33 @@
-try:
-    from __builtin__ import max as builtin_max
-    from __builtin__ import min as builtin_min
-except ImportError:
-    from builtins import max as builtin_max
-    from builtins import min as builtin_min
+"""
+Replacement for the audioop module (removed in python 3.13) operating on
+numpy views of the fragments. Results match the C implementation, samples
+are native endian signed integers of 1, 2, 3 or 4 bytes.
+"""
 import math
-import struct
-try:
-    from fractions import gcd
-except ImportError:  # Python 3.9+
-    from math import gcd
-from ctypes import create_string_buffer
+import operator
+import sys
+from math import gcd
+
+import numpy as np
 
 
 class error(Exception):
     pass
 
 
+_DTYPES = {
+    1: np.dtype(np.int8),
+    2: np.dtype(np.int16),
+    4: np.dtype(np.int32),
+}
+
+# byte order of 24-bit samples, least significant byte first
+_INT24_BYTES = (0, 1, 2) if sys.byteorder == 'little' else (2, 1, 0)
+
+
 def _check_size(size):
-    if size != 1 and size != 2 and size != 4:
-        raise error("Size should be 1, 2 or 4")
+    if size != 1 and size != 2 and size != 3 and size != 4:
+        raise error("Size should be 1, 2, 3 or 4")
 
 
 def _check_params(length, size):
@@ -28,505 +36,352 @@ def _check_params(length, size):
         raise error("not a whole number of frames")
 
 
-def _sample_count(cp, size):
-    return len(cp) / size
-
+def _c_int(value):
+    """ Integer argument converted like a C int argument of the C implementation. """
+    value = operator.index(value)
+    if not -0x80000000 <= value <= 0x7fffffff:
+        raise OverflowError("Python int too large to convert to C int")
+    return value
 
-def _get_samples(cp, size, signed=True):
-    for i in range(_sample_count(cp, size)):
-        yield _get_sample(cp, size, i, signed)
 
+def _fragment(cp, size):
+    """ Bytes of the fragment as uint8 array, without copying. """
+    data = np.frombuffer(cp, dtype=np.uint8)
+    _check_params(len(data), size)
+    return data
 
-def _struct_format(size, signed):
-    if size == 1:
-        return "b" if signed else "B"
-    elif size == 2:
-        return "h" if signed else "H"
-    elif size == 4:
-        return "i" if signed else "I"
 
+def _get_maxval(size):
+    return (1 << (8 * size - 1)) - 1
 
-def _get_sample(cp, size, i, signed=True):
-    fmt = _struct_format(size, signed)
-    start = i * size
-    end = start + size
-    return struct.unpack_from(fmt, buffer(cp)[start:end])[0]
 
+def _get_minval(size):
+    return -(1 << (8 * size - 1))
 
-def _put_sample(cp, size, i, val, signed=True):
-    fmt = _struct_format(size, signed)
-    struct.pack_into(fmt, cp, i * size, val)
 
+def _get_samples(data, size):
+    """ Samples of an uint8 fragment, a view unless they are 24-bit. """
+    if size != 3:
+        return data.view(_DTYPES[size])
 
-def _get_maxval(size, signed=True):
-    if signed and size == 1:
-        return 0x7f
-    elif size == 1:
-        return 0xff
-    elif signed and size == 2:
-        return 0x7fff
-    elif size == 2:
-        return 0xffff
-    elif signed and size == 4:
-        return 0x7fffffff
-    elif size == 4:
-        return 0xffffffff
+    b = data.reshape(-1, 3).astype(np.int32)
+    lo, mid, hi = (b[:, i] for i in _INT24_BYTES)
+    return lo | (mid << 8) | (((hi ^ 0x80) - 0x80) << 16)
 
 
-def _get_minval(size, signed=True):
-    if not signed:
-        return 0
-    elif size == 1:
-        return -0x80
-    elif size == 2:
-        return -0x8000
-    elif size == 4:
-        return -0x80000000
+def _to_bytes(samples, size):
+    """ Packs samples which are in the range of the sample size. """
+    if size != 3:
+        return samples.astype(_DTYPES[size]).tobytes()
 
+    samples = samples.astype(np.int32)
+    result = np.empty((len(samples), 3), dtype=np.uint8)
+    for i, shift in zip(_INT24_BYTES, (0, 8, 16)):
+        result[:, i] = (samples >> shift) & 0xff
+    return result.tobytes()
 
-def _get_clipfn(size, signed=True):
-    maxval = _get_maxval(size, signed)
-    minval = _get_minval(size, signed)
-    return lambda val: builtin_max(min(val, maxval), minval)
 
+def _clip(values, size):
+    """ Rounds towards minus infinity and truncates overflowing values. """
+    return np.clip(np.floor(values), _get_minval(size), _get_maxval(size))
 
-def _overflow(val, size, signed=True):
-    minval = _get_minval(size, signed)
-    maxval = _get_maxval(size, signed)
-    if minval <= val <= maxval:
-        return val
 
+def _overflow(values, size):
+    """ Wraps around overflowing values. """
     bits = size * 8
-    if signed:
-        offset = 2**(bits-1)
-        return ((val + offset) % (2**bits)) - offset
-    else:
-        return val % (2**bits)
+    offset = 1 << (bits - 1)
+    return ((values + offset) & ((1 << bits) - 1)) - offset
+
+
+def _to_int32(samples, size):
+    return samples.astype(np.int64) << (32 - 8 * size)
+
+
+def _from_int32(samples, size):
+    return samples >> (32 - 8 * size)
 
 
 def getsample(cp, size, i):
-    _check_params(len(cp), size)
-    if not (0 <= i < len(cp) / size):
+    data = _fragment(cp, size)
+    if not (0 <= i < len(data) // size):
         raise error("Index out of range")
-    return _get_sample(cp, size, i)
+    return int(_get_samples(data[i * size:(i + 1) * size], size)[0])
 
 
 def max(cp, size):
-    _check_params(len(cp), size)
-
-    if len(cp) == 0:
+    samples = _get_samples(_fragment(cp, size), size)
+    if len(samples) == 0:
         return 0
-
-    return builtin_max(abs(sample) for sample in _get_samples(cp, size))
+    return int(np.abs(samples.astype(np.int64)).max())
 
 
 def minmax(cp, size):
-    _check_params(len(cp), size)
-
-    max_sample, min_sample = 0, 0
-    for sample in _get_samples(cp, size):
-        max_sample = builtin_max(sample, max_sample)
-        min_sample = builtin_min(sample, min_sample)
-
-    return min_sample, max_sample
+    samples = _get_samples(_fragment(cp, size), size)
+    if len(samples) == 0:
+        return 0x7fffffff, -0x80000000
+    return int(samples.min()), int(samples.max())
 
 
 def avg(cp, size):
-    _check_params(len(cp), size)
-    sample_count = _sample_count(cp, size)
-    if sample_count == 0:
+    samples = _get_samples(_fragment(cp, size), size)
+    if len(samples) == 0:
         return 0
-    return sum(_get_samples(cp, size)) / sample_count
+    return int(math.floor(int(samples.sum(dtype=np.int64)) / len(samples)))
 
 
 def rms(cp, size):
-    _check_params(len(cp), size)
-
-    sample_count = _sample_count(cp, size)
-    if sample_count == 0:
+    samples = _get_samples(_fragment(cp, size), size)
+    if len(samples) == 0:
         return 0
 
-    sum_squares = sum(sample**2 for sample in _get_samples(cp, size))
-    return int(math.sqrt(sum_squares / sample_count))
-
-
-def _sum2(cp1, cp2, length):
-    size = 2
-    total = 0
-    for i in range(length):
-        total += getsample(cp1, size, i) * getsample(cp2, size, i)
-    return total
-
+    if size <= 2:
+        samples = samples.astype(np.int64)
+        sum_squares = int(np.dot(samples, samples))
+    else:
+        samples = samples.astype(np.float64)
+        sum_squares = float(np.dot(samples, samples))
+    return int(math.sqrt(sum_squares / len(samples)))
 
-def findfit(cp1, cp2):
-    size = 2
 
-    if len(cp1) % 2 != 0 or len(cp2) % 2 != 0:
-        raise error("Strings should be even-sized")
+def _check_even(*fragments):
+    for cp in fragments:
+        if len(cp) % 2 != 0:
+            raise error("Strings should be even-sized")
 
-    if len(cp1) < len(cp2):
-        raise error("First sample should be longer")
 
-    len1 = _sample_count(cp1, size)
-    len2 = _sample_count(cp2, size)
+def _window_sums(samples, length):
+    """ Sums of squares of every window of the given length. """
+    squares = np.concatenate([[0], np.cumsum(samples * samples)])
+    return squares[length:] - squares[:-length or None]
 
-    sum_ri_2 = _sum2(cp2, cp2, len2)
-    sum_aij_2 = _sum2(cp1, cp1, len2)
-    sum_aij_ri = _sum2(cp1, cp2, len2)
 
-    result = (sum_ri_2 * sum_aij_2 - sum_aij_ri * sum_aij_ri) / sum_aij_2
-
-    best_result = result
-    best_i = 0
+def findfit(cp1, cp2):
+    data1, data2 = np.frombuffer(cp1, dtype=np.uint8), np.frombuffer(cp2, dtype=np.uint8)
+    _check_even(data1, data2)
+    a = data1.view(np.int16).astype(np.int64)
+    r = data2.view(np.int16).astype(np.int64)
 
-    for i in range(1, len1 - len2 + 1):
-        aj_m1 = _get_sample(cp1, size, i - 1)
-        aj_lm1 = _get_sample(cp1, size, i + len2 - 1)
+    if len(a) < len(r):
+        raise error("First sample should be longer")
 
-        sum_aij_2 += aj_lm1**2 - aj_m1**2
-        sum_aij_ri = _sum2(buffer(cp1)[i*size:], cp2, len2)
+    sum_ri_2 = float(np.dot(r, r))
+    sum_aij_2 = _window_sums(a, len(r)).astype(np.float64)
+    sum_aij_ri = np.correlate(a, r, mode='valid').astype(np.float64)
 
+    with np.errstate(divide='ignore', invalid='ignore'):
         result = (sum_ri_2 * sum_aij_2 - sum_aij_ri * sum_aij_ri) / sum_aij_2
-
-        if result < best_result:
-            best_result = result
-            best_i = i
-
-    factor = _sum2(buffer(cp1)[best_i*size:], cp2, len2) / sum_ri_2
-
-    return best_i, factor
+        best_i = 0 if np.isnan(result[0]) else int(np.argmin(np.where(np.isnan(result), np.inf, result)))
+        factor = np.float64(sum_aij_ri[best_i]) / sum_ri_2
+    return best_i, float(factor)
 
 
 def findfactor(cp1, cp2):
-    size = 2
-
-    if len(cp1) % 2 != 0:
-        raise error("Strings should be even-sized")
+    data1, data2 = np.frombuffer(cp1, dtype=np.uint8), np.frombuffer(cp2, dtype=np.uint8)
+    _check_even(data1, data2)
 
-    if len(cp1) != len(cp2):
+    if len(data1) != len(data2):
         raise error("Samples should be same size")
 
-    sample_count = _sample_count(cp1, size)
-
-    sum_ri_2 = _sum2(cp2, cp2, sample_count)
-    sum_aij_ri = _sum2(cp1, cp2, sample_count)
-
-    return sum_aij_ri / sum_ri_2
+    a = data1.view(np.int16).astype(np.float64)
+    r = data2.view(np.int16).astype(np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return float(np.float64(np.dot(a, r)) / np.dot(r, r))
 
 
 def findmax(cp, len2):
-    size = 2
-    sample_count = _sample_count(cp, size)
-
-    if len(cp) % 2 != 0:
-        raise error("Strings should be even-sized")
+    data = np.frombuffer(cp, dtype=np.uint8)
+    _check_even(data)
+    samples = data.view(np.int16).astype(np.int64)
 
-    if len2 < 0 or sample_count < len2:
+    if len2 < 0 or len(samples) < len2:
         raise error("Input sample should be longer")
 
-    if sample_count == 0:
+    if len(samples) == 0:
         return 0
 
-    result = _sum2(cp, cp, len2)
-    best_result = result
-    best_i = 0
+    return int(np.argmax(_window_sums(samples, len2)))
 
-    for i in range(1, sample_count - len2 + 1):
-        sample_leaving_window = getsample(cp, size, i - 1)
-        sample_entering_window = getsample(cp, size, i + len2 - 1)
 
-        result -= sample_leaving_window**2
-        result += sample_entering_window**2
+def _extremes(cp, size):
+    """ Values at which the derivative of the fragment changes its sign. """
+    samples = _get_samples(_fragment(cp, size), size).astype(np.int64)
+    if len(samples) <= 1:
+        return samples[:0]
 
-        if result > best_result:
-            best_result = result
-            best_i = i
-
-    return best_i
+    # ignore repeated values, the direction changes between falling and rising
+    samples = samples[np.concatenate([[True], samples[1:] != samples[:-1]])]
+    falling = samples[1:] < samples[:-1]
+    changes = np.flatnonzero(falling[1:] != falling[:-1]) + 1
+    return samples[changes]
 
 
 def avgpp(cp, size):
-    _check_params(len(cp), size)
-    sample_count = _sample_count(cp, size)
-
-    prevextremevalid = False
-    prevextreme = None
-    avg = 0
-    nextreme = 0
-
-    prevval = getsample(cp, size, 0)
-    val = getsample(cp, size, 1)
-
-    prevdiff = val - prevval
-
-    for i in range(1, sample_count):
-        val = getsample(cp, size, i)
-        diff = val - prevval
-
-        if diff * prevdiff < 0:
-            if prevextremevalid:
-                avg += abs(prevval - prevextreme)
-                nextreme += 1
-
-            prevextremevalid = True
-            prevextreme = prevval
-
-        prevval = val
-        if diff != 0:
-            prevdiff = diff
-
-    if nextreme == 0:
+    extremes = _extremes(cp, size)
+    if len(extremes) <= 1:
         return 0
-
-    return avg / nextreme
+    diffs = np.abs(np.diff(extremes)).astype(np.float64)
+    return int(diffs.sum() / len(diffs))
 
 
 def maxpp(cp, size):
-    _check_params(len(cp), size)
-    sample_count = _sample_count(cp, size)
-
-    prevextremevalid = False
-    prevextreme = None
-    max = 0
-
-    prevval = getsample(cp, size, 0)
-    val = getsample(cp, size, 1)
-
-    prevdiff = val - prevval
-
-    for i in range(1, sample_count):
-        val = getsample(cp, size, i)
-        diff = val - prevval
-
-        if diff * prevdiff < 0:
-            if prevextremevalid:
-                extremediff = abs(prevval - prevextreme)
-                if extremediff > max:
-                    max = extremediff
-            prevextremevalid = True
-            prevextreme = prevval
-
-        prevval = val
-        if diff != 0:
-            prevdiff = diff
-
-    return max
+    extremes = _extremes(cp, size)
+    if len(extremes) <= 1:
+        return 0
+    return int(np.abs(np.diff(extremes)).max())
 
 
 def cross(cp, size):
-    _check_params(len(cp), size)
-
-    crossings = 0
-    last_sample = 0
-    for sample in _get_samples(cp, size):
-        if sample <= 0 < last_sample or sample >= 0 > last_sample:
-            crossings += 1
-        last_sample = sample
-
-    return crossings
+    samples = _get_samples(_fragment(cp, size), size)
+    if len(samples) == 0:
+        return -1
+    negative = samples < 0
+    return int(np.count_nonzero(negative[1:] != negative[:-1]))
 
 
 def mul(cp, size, factor):
-    _check_params(len(cp), size)
-    clip = _get_clipfn(size)
-
-    result = create_string_buffer(len(cp))
-
-    for i, sample in enumerate(_get_samples(cp, size)):
-        sample = clip(int(sample * factor))
-        _put_sample(result, size, i, sample)
-
-    return result.raw
+    samples = _get_samples(_fragment(cp, size), size)
+    return _to_bytes(_clip(samples * float(factor), size), size)
 
 
 def tomono(cp, size, fac1, fac2):
-    _check_params(len(cp), size)
-    clip = _get_clipfn(size)
-
-    sample_count = _sample_count(cp, size)
-
-    result = create_string_buffer(len(cp) / 2)
-
-    for i in range(0, sample_count, 2):
-        l_sample = getsample(cp, size, i)
-        r_sample = getsample(cp, size, i + 1)
-
-        sample = (l_sample * fac1) + (r_sample * fac2)
-        sample = clip(sample)
-
-        _put_sample(result, size, i / 2, sample)
+    samples = _get_samples(_fragment(cp, size), size)
+    if len(samples) % 2 != 0:
+        raise error("not a whole number of frames")
 
-    return result.raw
+    samples = samples.astype(np.float64)
+    return _to_bytes(_clip(samples[0::2] * fac1 + samples[1::2] * fac2, size), size)
 
 
 def tostereo(cp, size, fac1, fac2):
-    _check_params(len(cp), size)
-
-    sample_count = _sample_count(cp, size)
+    samples = _get_samples(_fragment(cp, size), size).astype(np.float64)
 
-    result = create_string_buffer(len(cp) * 2)
-    clip = _get_clipfn(size)
-
-    for i in range(sample_count):
-        sample = _get_sample(cp, size, i)
-
-        l_sample = clip(sample * fac1)
-        r_sample = clip(sample * fac2)
-
-        _put_sample(result, size, i * 2, l_sample)
-        _put_sample(result, size, i * 2 + 1, r_sample)
-
-    return result.raw
+    result = np.empty((len(samples), 2))
+    result[:, 0] = _clip(samples * fac1, size)
+    result[:, 1] = _clip(samples * fac2, size)
+    return _to_bytes(result.ravel(), size)
 
 
 def add(cp1, cp2, size):
-    _check_params(len(cp1), size)
+    data1 = _fragment(cp1, size)
+    data2 = np.frombuffer(cp2, dtype=np.uint8)
 
-    if len(cp1) != len(cp2):
+    if len(data1) != len(data2):
         raise error("Lengths should be the same")
 
-    clip = _get_clipfn(size)
-    sample_count = _sample_count(cp1, size)
-    result = create_string_buffer(len(cp1))
-
-    for i in range(sample_count):
-        sample1 = getsample(cp1, size, i)
-        sample2 = getsample(cp2, size, i)
-
-        sample = clip(sample1 + sample2)
-
-        _put_sample(result, size, i, sample)
-
-    return result.raw
+    samples = _get_samples(data1, size).astype(np.int64) + _get_samples(data2, size)
+    return _to_bytes(np.clip(samples, _get_minval(size), _get_maxval(size)), size)
 
 
 def bias(cp, size, bias):
-    _check_params(len(cp), size)
-
-    result = create_string_buffer(len(cp))
-
-    for i, sample in enumerate(_get_samples(cp, size)):
-        sample = _overflow(sample + bias, size)
-        _put_sample(result, size, i, sample)
-
-    return result.raw
+    bias = _c_int(bias)
+    samples = _get_samples(_fragment(cp, size), size)
+    return _to_bytes(_overflow(samples.astype(np.int64) + bias, size), size)
 
 
 def reverse(cp, size):
-    _check_params(len(cp), size)
-    sample_count = _sample_count(cp, size)
+    samples = _get_samples(_fragment(cp, size), size)
+    return _to_bytes(samples[::-1], size)
 
-    result = create_string_buffer(len(cp))
-    for i, sample in enumerate(_get_samples(cp, size)):
-        _put_sample(result, size, sample_count - i - 1, sample)
 
-    return result.raw
+def byteswap(cp, size):
+    data = _fragment(cp, size)
+    return data.reshape(-1, size)[:, ::-1].tobytes()
 
 
 def lin2lin(cp, size, size2):
-    _check_params(len(cp), size)
+    data = _fragment(cp, size)
     _check_size(size2)
 
     if size == size2:
-        return cp
+        return bytes(data)
+
+    samples = _get_samples(data, size)
+    return _to_bytes(_from_int32(_to_int32(samples, size), size2), size2)
 
-    new_len = (len(cp) / size) * size2
 
-    result = create_string_buffer(new_len)
+def _filter_frames(frames, cur_i, weightA, weightB):
+    """ Simple digital filter of ratecv, every frame depends on the previous result. """
+    result = np.empty(frames.shape, dtype=np.int64)
+    prev = np.array(cur_i, dtype=np.float64)
+    weights = float(weightA + weightB)
+    for i, frame in enumerate(frames):
+        prev = np.trunc((weightA * frame.astype(np.float64) + weightB * prev) / weights)
+        result[i] = prev
+    return result
 
-    for i in range(_sample_count(cp, size)):
-        sample = _get_sample(cp, size, i)
-        if size < size2:
-            sample = sample << (4 * size2 / size)
-        elif size > size2:
-            sample = sample >> (4 * size / size2)
 
-        sample = _overflow(sample, size2)
+def _parse_state(state, nchannels):
+    if not isinstance(state, tuple):
+        raise TypeError("state must be a tuple or None")
+    if len(state) != 2 or not isinstance(state[1], tuple):
+        raise TypeError("ratecv(): illegal state argument")
 
-        _put_sample(result, size2, i, sample)
+    d, samps = state
+    if len(samps) != nchannels:
+        raise error("illegal state argument")
 
-    return result.raw
+    try:
+        channels = [(int(prev), int(cur)) for prev, cur in samps]
+    except (TypeError, ValueError):
+        raise TypeError("ratecv(): illegal state argument")
+    return int(d), [prev for prev, _ in channels], [cur for _, cur in channels]
 
 
 def ratecv(cp, size, nchannels, inrate, outrate, state, weightA=1, weightB=0):
-    _check_params(len(cp), size)
+    _check_size(size)
     if nchannels < 1:
         raise error("# of channels should be >= 1")
 
     bytes_per_frame = size * nchannels
-    frame_count = len(cp) / bytes_per_frame
-
-    if bytes_per_frame / nchannels != size:
+    if bytes_per_frame // nchannels != size:
         raise OverflowError("width * nchannels too big for a C int")
 
     if weightA < 1 or weightB < 0:
         raise error("weightA should be >= 1, weightB should be >= 0")
 
-    if len(cp) % bytes_per_frame != 0:
+    data = np.frombuffer(cp, dtype=np.uint8)
+    if len(data) % bytes_per_frame != 0:
         raise error("not a whole number of frames")
 
     if inrate <= 0 or outrate <= 0:
         raise error("sampling rate not > 0")
 
     d = gcd(inrate, outrate)
-    inrate /= d
-    outrate /= d
+    inrate //= d
+    outrate //= d
 
-    prev_i = [0] * nchannels
-    cur_i = [0] * nchannels
+    d = gcd(weightA, weightB)
+    weightA //= d
+    weightB //= d
 
     if state is None:
         d = -outrate
+        prev_i = cur_i = [0] * nchannels
     else:
-        d, samps = state
-
-        if len(samps) != nchannels:
-            raise error("illegal state argument")
-
-        prev_i, cur_i = zip(*samps)
-        prev_i, cur_i = list(prev_i), list(cur_i)
-
-    q = frame_count / inrate
-    ceiling = (q + 1) * outrate
-    nbytes = ceiling * bytes_per_frame
-
-    result = create_string_buffer(nbytes)
-
-    samples = _get_samples(cp, size)
-    out_i = 0
-    while True:
-        while d < 0:
-            if frame_count == 0:
-                samps = zip(prev_i, cur_i)
-                retval = result.raw
-
-                # slice off extra bytes
-                trim_index = (out_i * bytes_per_frame) - len(retval)
-                retval = buffer(retval)[:trim_index]
-
-                return (retval, (d, tuple(samps)))
-
-            for chan in range(nchannels):
-                prev_i[chan] = cur_i[chan]
-                cur_i[chan] = samples.next()
-
-                cur_i[chan] = (
-                    (weightA * cur_i[chan] + weightB * prev_i[chan])
-                    / (weightA + weightB)
-                )
-
-            frame_count -= 1
-            d += outrate
-
-        while d >= 0:
-            for chan in range(nchannels):
-                cur_o = (
-                    (prev_i[chan] * d + cur_i[chan] * (outrate - d))
-                    / outrate
-                )
-                _put_sample(result, size, out_i, _overflow(cur_o, size))
-                out_i += 1
-            d -= inrate
+        d, prev_i, cur_i = _parse_state(state, nchannels)
+
+    # frames get interpolated in the 32-bit range
+    frames = _to_int32(_get_samples(data, size), size).reshape(-1, nchannels)
+    if weightB:
+        frames = _filter_frames(frames, cur_i, weightA, weightB)
+
+    # history[k], history[k + 1] are (prev_i, cur_i) after consuming k frames
+    history = np.concatenate([np.array([prev_i, cur_i], dtype=np.int64), frames]).astype(np.float64)
+
+    # the j-th output frame gets written after consuming the least number of
+    # frames k for which its phase d + k * outrate - j * inrate is not negative
+    end = len(frames) * outrate + d
+    count = end // inrate + 1 if end >= 0 else 0
+    offsets = np.arange(count, dtype=np.int64) * inrate
+    consumed = np.maximum(-((d - offsets) // outrate), 0)
+    phase = (d + consumed * outrate - offsets).astype(np.float64)[:, None]
+
+    prev = history[consumed]
+    cur = history[consumed + 1]
+    result = np.trunc((prev * phase + cur * (outrate - phase)) / outrate).astype(np.int64)
+
+    samps = tuple((int(p), int(c)) for p, c in zip(history[-2], history[-1]))
+    return _to_bytes(_from_int32(result, size).ravel(), size), (int(end - count * inrate), samps)
 
 
 def lin2ulaw(cp, size):
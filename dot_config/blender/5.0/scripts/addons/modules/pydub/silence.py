@@ -3,9 +3,58 @@ Various functions for finding/manipulating silence in AudioSegments
 """
 import itertools
 
+import numpy as np
+
 from .utils import db_to_float
 
 
+def _energy_at(samples, bounds, dtype, chunk_size=1 << 22):
+    """
+    Returns the sums of the squared samples before every (sorted) sample index
+    in bounds. The samples get squared in chunks to bound the memory usage.
+    """
+    energy = np.zeros(len(bounds), dtype=dtype)
+    total = 0
+    for start in range(0, len(samples), chunk_size):
+        chunk = samples[start:start + chunk_size].astype(dtype)
+        cumsum = np.cumsum(chunk * chunk)
+        cumsum += total
+
+        # bounds within (start, start + len(chunk)]
+        lo, hi = np.searchsorted(bounds, [start, start + len(chunk)], side='right')
+        energy[lo:hi] = cumsum[bounds[lo:hi] - start - 1]
+        total = cumsum[-1]
+    return energy
+
+
+def _window_rms(audio_segment, starts, length):
+    """
+    Returns the rms of the slices audio_segment[i:i + length] for every start
+    i in ms, like audio_segment[i:i + length].rms without creating the slices.
+    """
+    samples = np.frombuffer(audio_segment.raw_data, dtype=audio_segment.array_type)
+    channels = audio_segment.channels
+    frame_count = len(samples) // channels
+
+    # frame index of every slice bound, the same way the slices get them
+    positions, index = np.unique(np.concatenate([starts, starts + length]), return_inverse=True)
+    frames = (positions * (audio_segment.frame_rate / 1000.0)).astype(np.int64)
+    bounds = np.minimum(frames, frame_count) * channels
+
+    # exact integer sums unless the squares of 32-bit samples could overflow
+    dtype = np.int64 if audio_segment.sample_width <= 2 else np.float64
+    energy = _energy_at(samples, bounds, dtype)
+
+    start_i, end_i = index[:len(starts)], index[len(starts):]
+    sum_squares = (energy[end_i] - energy[start_i]).astype(np.float64)
+
+    # frames missing at the end get filled with silence by slicing
+    sample_count = (frames[end_i] - frames[start_i]) * channels
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rms = np.floor(np.sqrt(sum_squares / sample_count))
+    return np.where(sample_count > 0, rms, 0)
+
+
 def detect_silence(audio_segment, min_silence_len=1000, silence_thresh=-16, seek_step=1):
     """
     Returns a list of all silent sections [start, end] in milliseconds of audio_segment.
@@ -25,52 +74,35 @@ def detect_silence(audio_segment, min_silence_len=1000, silence_thresh=-16, seek
     # convert silence threshold to a float value (so we can compare it to rms)
     silence_thresh = db_to_float(silence_thresh) * audio_segment.max_possible_amplitude
 
-    # find silence and add start and end indicies to the to_cut list
-    silence_starts = []
-
     # check successive (1 sec by default) chunk of sound for silence
     # try a chunk at every "seek step" (or every chunk for a seek step == 1)
     last_slice_start = seg_len - min_silence_len
-    slice_starts = range(0, last_slice_start + 1, seek_step)
+    slice_starts = np.arange(0, last_slice_start + 1, seek_step, dtype=np.int64)
 
     # guarantee last_slice_start is included in the range
     # to make sure the last portion of the audio is searched
     if last_slice_start % seek_step:
-        slice_starts = itertools.chain(slice_starts, [last_slice_start])
+        slice_starts = np.append(slice_starts, last_slice_start)
 
-    for i in slice_starts:
-        audio_slice = audio_segment[i:i + min_silence_len]
-        if audio_slice.rms <= silence_thresh:
-            silence_starts.append(i)
+    # the rms of every chunk at once, from the cumulative sum of squared samples
+    rms = _window_rms(audio_segment, slice_starts, min_silence_len)
+    silence_starts = slice_starts[rms <= silence_thresh]
 
     # short circuit when there is no silence
-    if not silence_starts:
+    if not len(silence_starts):
         return []
 
     # combine the silence we detected into ranges (start ms - end ms)
-    silent_ranges = []
-
-    prev_i = silence_starts.pop(0)
-    current_range_start = prev_i
-
-    for silence_start_i in silence_starts:
-        continuous = (silence_start_i == prev_i + seek_step)
-
-        # sometimes two small blips are enough for one particular slice to be
-        # non-silent, despite the silence all running together. Just combine
-        # the two overlapping silent ranges.
-        silence_has_gap = silence_start_i > (prev_i + min_silence_len)
-
-        if not continuous and silence_has_gap:
-            silent_ranges.append([current_range_start,
-                                  prev_i + min_silence_len])
-            current_range_start = silence_start_i
-        prev_i = silence_start_i
+    # sometimes two small blips are enough for one particular slice to be
+    # non-silent, despite the silence all running together. Ranges only
+    # get split if the starts are neither continuous nor overlapping.
+    steps = np.diff(silence_starts)
+    splits = np.flatnonzero((steps != seek_step) & (steps > min_silence_len))
 
-    silent_ranges.append([current_range_start,
-                          prev_i + min_silence_len])
+    range_starts = silence_starts[np.concatenate([[0], splits + 1])]
+    range_ends = silence_starts[np.concatenate([splits, [len(silence_starts) - 1]])] + min_silence_len
 
-    return silent_ranges
+    return [[int(start), int(end)] for start, end in zip(range_starts, range_ends)]
 
 
 def detect_nonsilent(audio_segment, min_silence_len=1000, silence_thresh=-16, seek_step=1):
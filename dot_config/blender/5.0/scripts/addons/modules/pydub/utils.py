@@ -13,7 +13,8 @@ from functools import wraps
 try:
     import audioop
 except ImportError:
-    import pyaudioop as audioop
+    # removed in python 3.13, fall back to the numpy implementation
+    from . import pyaudioop as audioop
 
 if sys.version_info >= (3, 0):
     basestring = str
@@ -11,6 +11,8 @@ bl_info = {
 import bpy
 import socket
 import json
+import struct
+import numpy as np
 from mathutils import Vector, Quaternion, Matrix
 import time
 
@@ -30,18 +32,320 @@ def init_socket():
 	sock.setblocking(False)
 	print(f"[HandReceiver] Listening on {UDP_IP}:{UDP_PORT}")
 
+def receive_latest(drain=True):
+	"""Return the newest datagram waiting on the socket, or None.
+
+	With drain enabled every queued datagram is read and all but the last are
+	dropped, so a sender running faster than the timer never builds up latency.
+	"""
+	latest = None
+	while True:
+		try:
+			latest, _addr = sock.recvfrom(65535)
+		except BlockingIOError:
+			return latest
+		if not drain:
+			return latest
+
+# -----------------------------
+# PACKET FORMAT
+# -----------------------------
+# Binary packets start with a fixed header followed by one record per hand:
+#   header: magic "HTB1", timestamp (float64 seconds), hand count (uint8)
+#   hand:   hand index (uint8), 21 x (x, y, z) float32 landmarks
+# Everything is little endian. Anything else is decoded as the JSON format.
+NUM_LANDMARKS = 21
+BINARY_MAGIC = b"HTB1"
+BINARY_HEADER = struct.Struct("<4sdB")
+BINARY_HAND = np.dtype([
+	("hand_index", "<u1"),
+	("landmarks", "<f4", (NUM_LANDMARKS, 3)),
+])
+
+def encode_binary_packet(hands, timestamp=None):
+	"""Encode [(hand_index, (21, 3) landmarks), ...] into a binary packet"""
+	if timestamp is None:
+		timestamp = time.time()
+	records = np.zeros(len(hands), dtype=BINARY_HAND)
+	for i, (hand_index, landmarks) in enumerate(hands):
+		records[i]["hand_index"] = hand_index
+		records[i]["landmarks"] = landmarks
+	return BINARY_HEADER.pack(BINARY_MAGIC, timestamp, len(hands)) + records.tobytes()
+
+def decode_packet(data):
+	"""
+	Decode a binary or JSON packet.
+	
+	Returns:
+		dict with "timestamp" (float or None) and "hands", a list of
+		(hand_index, (21, 3) float32 array) tuples. Landmarks missing from a
+		JSON packet are NaN.
+	"""
+	if data[:4] == BINARY_MAGIC:
+		_magic, timestamp, count = BINARY_HEADER.unpack_from(data)
+		records = np.frombuffer(data, dtype=BINARY_HAND, count=count, offset=BINARY_HEADER.size)
+		hands = [(int(r["hand_index"]), r["landmarks"]) for r in records]
+		return {"timestamp": timestamp, "hands": hands}
+
+	packet = json.loads(data.decode("utf-8"))
+	hands = []
+	for hand_data in packet.get("hands", []):
+		landmarks = np.full((NUM_LANDMARKS, 3), np.nan, dtype=np.float32)
+		for lm in hand_data["landmarks"]:
+			lm_id = lm["id"]
+			if 0 <= lm_id < NUM_LANDMARKS:
+				landmarks[lm_id] = (lm["x"], lm["y"], lm["z"])
+		hands.append((hand_data["hand_index"], landmarks))
+	return {"timestamp": packet.get("timestamp"), "hands": hands}
+
+def packet_to_json(packet):
+	"""Serialize a decoded packet back to the JSON layout (for debugging)"""
+	return json.dumps({
+		"timestamp": packet["timestamp"],
+		"hands": [
+			{
+				"hand_index": hand_index,
+				"landmarks": [
+					{"id": lm_id, "x": float(x), "y": float(y), "z": float(z)}
+					for lm_id, (x, y, z) in enumerate(landmarks.tolist())
+					if x == x
+				],
+			}
+			for hand_index, landmarks in packet["hands"]
+		],
+	})
+
 # -----------------------------
 # SMOOTHING
 # -----------------------------
-SMOOTH_FACTOR = 0.6
-last_positions = {}
-last_rotations = {}
+# Filters work on (N, 3) arrays indexed by landmark and use packet timestamps,
+# so smoothing behaves the same no matter how fast packets arrive. Rows that are
+# NaN (landmark missing from the packet) keep their previous state.
+REFERENCE_RATE = 30.0  # smoothing factors are tuned for packets at this rate
+MIN_DT = 1e-4
+
+def _time_alpha(factor, dt):
+	"""Turn a per-packet blend factor at REFERENCE_RATE into one for dt seconds"""
+	return 1.0 - (1.0 - factor) ** (dt * REFERENCE_RATE)
+
+def _smoothing_alpha(cutoff, dt):
+	tau = 1.0 / (2.0 * np.pi * cutoff)
+	return 1.0 / (1.0 + tau / dt)
+
+class LandmarkFilter:
+	"""Base filter, passes values through and keeps the last timestamp"""
+
+	def __init__(self, count):
+		self.count = count
+		self.reset()
+
+	def reset(self):
+		self.last_time = None
+		self.initialized = np.zeros(self.count, dtype=bool)
+
+	def _dt(self, timestamp):
+		dt = REFERENCE_RATE ** -1 if self.last_time is None else timestamp - self.last_time
+		self.last_time = timestamp
+		return max(dt, MIN_DT)
+
+	def __call__(self, values, timestamp):
+		self._dt(timestamp)
+		return values
+
+class ExponentialFilter(LandmarkFilter):
+	"""Time-aware exponential smoothing (the old lerp factor, but rate independent)"""
+
+	def __init__(self, count, factor):
+		self.factor = factor
+		super().__init__(count)
+
+	def reset(self):
+		super().reset()
+		self.value = np.zeros((self.count, 3))
+
+	def __call__(self, values, timestamp):
+		alpha = _time_alpha(self.factor, self._dt(timestamp))
+		present = ~np.isnan(values).any(axis=1)
+		update = present & self.initialized
+		first = present & ~self.initialized
+		self.value[update] += alpha * (values[update] - self.value[update])
+		self.value[first] = values[first]
+		self.initialized |= present
+		return np.where(self.initialized[:, None], self.value, np.nan)
+
+class OneEuroFilter(LandmarkFilter):
+	"""
+	One Euro filter (Casiez et al. 2012).
+	
+	Args:
+		min_cutoff: cutoff frequency (Hz) when still, lower is smoother
+		beta: how fast the cutoff rises with speed, higher means less lag
+		d_cutoff: cutoff frequency (Hz) for the speed estimate
+	"""
+
+	def __init__(self, count, min_cutoff=1.0, beta=0.0, d_cutoff=1.0):
+		self.min_cutoff = min_cutoff
+		self.beta = beta
+		self.d_cutoff = d_cutoff
+		super().__init__(count)
+
+	def reset(self):
+		super().reset()
+		self.value = np.zeros((self.count, 3))
+		self.speed = np.zeros((self.count, 3))
+
+	def __call__(self, values, timestamp):
+		dt = self._dt(timestamp)
+		present = ~np.isnan(values).any(axis=1)
+		update = present & self.initialized
+		first = present & ~self.initialized
+
+		if update.any():
+			x = values[update]
+			prev = self.value[update]
+			a_d = _smoothing_alpha(self.d_cutoff, dt)
+			speed = self.speed[update] + a_d * ((x - prev) / dt - self.speed[update])
+			cutoff = self.min_cutoff + self.beta * np.abs(speed)
+			a = _smoothing_alpha(cutoff, dt)
+			self.value[update] = prev + a * (x - prev)
+			self.speed[update] = speed
+
+		self.value[first] = values[first]
+		self.speed[first] = 0.0
+		self.initialized |= present
+		return np.where(self.initialized[:, None], self.value, np.nan)
+
+class KalmanFilter(LandmarkFilter):
+	"""
+	Constant-velocity Kalman filter, run independently per coordinate.
+	
+	Args:
+		process_noise: how much the velocity is allowed to wander (higher = less lag)
+		measurement_noise: expected jitter of the tracker (higher = smoother)
+	"""
+
+	def __init__(self, count, process_noise=1.0, measurement_noise=1e-4):
+		self.q = process_noise
+		self.r = measurement_noise
+		super().__init__(count)
+
+	def reset(self):
+		super().reset()
+		shape = (self.count, 3)
+		self.pos = np.zeros(shape)
+		self.vel = np.zeros(shape)
+		# Covariance [[p00, p01], [p01, p11]] per coordinate
+		self.p00 = np.ones(shape)
+		self.p01 = np.zeros(shape)
+		self.p11 = np.ones(shape)
+
+	def __call__(self, values, timestamp):
+		dt = self._dt(timestamp)
+		present = ~np.isnan(values).any(axis=1)
+		first = present & ~self.initialized
+
+		# Predict
+		self.pos += self.vel * dt
+		dt2 = dt * dt
+		p00 = self.p00 + dt * (2.0 * self.p01 + dt * self.p11) + self.q * dt2 * dt2 / 4.0
+		p01 = self.p01 + dt * self.p11 + self.q * dt2 * dt / 2.0
+		p11 = self.p11 + self.q * dt2
+
+		# Update rows that have a measurement
+		update = present & self.initialized
+		if update.any():
+			innovation = values[update] - self.pos[update]
+			s = p00[update] + self.r
+			k0 = p00[update] / s
+			k1 = p01[update] / s
+			self.pos[update] += k0 * innovation
+			self.vel[update] += k1 * innovation
+			p11[update] -= k1 * p01[update]
+			p01[update] -= k0 * p01[update]
+			p00[update] -= k0 * p00[update]
+
+		self.p00, self.p01, self.p11 = p00, p01, p11
+
+		self.pos[first] = values[first]
+		self.vel[first] = 0.0
+		self.p00[first] = self.r
+		self.p01[first] = 0.0
+		self.p11[first] = 1.0
+		self.initialized |= present
+		return np.where(self.initialized[:, None], self.pos, np.nan)
+
+def smooth_rotations(previous, targets, factor, dt):
+	"""
+	Time-aware normalized lerp of (N, 4) quaternions towards targets.
+	
+	Args:
+		previous: (N, 4) last output, or None to start from the targets
+		targets: (N, 4) new quaternions, rows may be NaN
+	"""
+	if previous is None:
+		return targets.copy()
+	present = ~np.isnan(targets).any(axis=1)
+	fresh = present & np.isnan(previous).any(axis=1)
+	blend = present & ~fresh
+	out = previous.copy()
+	out[fresh] = targets[fresh]
+	if blend.any():
+		prev = previous[blend]
+		target = targets[blend]
+		# Take the short way around
+		sign = np.where((prev * target).sum(axis=1) < 0.0, -1.0, 1.0)[:, None]
+		q = prev + _time_alpha(factor, dt) * (target * sign - prev)
+		out[blend] = q / np.linalg.norm(q, axis=1)[:, None]
+	return out
+
+def make_landmark_filter(scene, count):
+	"""Create the filter selected in the scene settings"""
+	mode = scene.handtracking_filter
+	if mode == 'ONE_EURO':
+		return OneEuroFilter(count, scene.handtracking_min_cutoff, scene.handtracking_beta)
+	if mode == 'KALMAN':
+		return KalmanFilter(count, scene.handtracking_process_noise, scene.handtracking_measurement_noise)
+	if mode == 'EXPONENTIAL':
+		# position_smoothing is the weight of the new sample, like the old lerp
+		return ExponentialFilter(count, scene.position_smoothing)
+	return LandmarkFilter(count)
 
-def lerp(v1, v2, factor):
-	return v1.lerp(v2, factor)
+class HandFilterState:
+	"""Per-hand smoothing state for one receiver session"""
 
-def slerp(q1, q2, factor):
-	return q1.slerp(q2, factor)
+	def __init__(self, scene, num_landmarks):
+		self.config = filter_config(scene)
+		self.positions = make_landmark_filter(scene, num_landmarks)
+		self.rotations = None
+		self.last_time = None
+
+	def smooth_rotations(self, targets, factor, timestamp):
+		dt = REFERENCE_RATE ** -1 if self.last_time is None else max(timestamp - self.last_time, MIN_DT)
+		self.last_time = timestamp
+		self.rotations = smooth_rotations(self.rotations, targets, factor, dt)
+		return self.rotations
+
+def filter_config(scene):
+	return (
+		scene.handtracking_filter,
+		scene.position_smoothing,
+		scene.handtracking_min_cutoff,
+		scene.handtracking_beta,
+		scene.handtracking_process_noise,
+		scene.handtracking_measurement_noise,
+	)
+
+_hand_filters = {}
+
+def get_hand_filter(scene, hand_index, num_landmarks):
+	"""Return the hand's filter state, rebuilding it when the settings changed"""
+	state = _hand_filters.get(hand_index)
+	if state is None or state.config != filter_config(scene):
+		state = _hand_filters[hand_index] = HandFilterState(scene, num_landmarks)
+	return state
+
+def reset_filters():
+	_hand_filters.clear()
 
 # -----------------------------
 # MEDIAPIPE HAND LANDMARK MAPPING
@@ -117,6 +421,14 @@ def register_custom_properties():
 		name="Hand Tracking Data",
 		default="{}"
 	)
+	bpy.types.Scene.handtracking_receive_mode = bpy.props.EnumProperty(
+		name="Receive Mode",
+		items=[
+			('LATEST', "Latest", "Drain the socket every tick and only apply the newest packet"),
+			('SEQUENTIAL', "Sequential", "Apply one packet per tick, in the order they arrived"),
+		],
+		default='LATEST'
+	)
 	bpy.types.Scene.depth_scale = bpy.props.FloatProperty(
 		name="Depth Scale",
 		default=0.5,
@@ -131,6 +443,48 @@ def register_custom_properties():
 		name="Show Finger Debug",
 		default=True
 	)
+	bpy.types.Scene.show_handtracking_data = bpy.props.BoolProperty(
+		name="Show Current Data",
+		description="Write every received packet to the scene as json, slows down receiving",
+		default=False
+	)
+	bpy.types.Scene.handtracking_filter = bpy.props.EnumProperty(
+		name="Filter",
+		items=[
+			('EXPONENTIAL', "Exponential", "Blend towards each new sample by the position smoothing factor"),
+			('ONE_EURO', "One Euro", "Adaptive low-pass filter, smooth when still and responsive when moving"),
+			('KALMAN', "Kalman", "Constant-velocity Kalman filter"),
+			('NONE', "None", "Use the raw landmarks"),
+		],
+		default='ONE_EURO'
+	)
+	bpy.types.Scene.handtracking_min_cutoff = bpy.props.FloatProperty(
+		name="Min Cutoff",
+		description="One Euro cutoff frequency when the hand is still, lower is smoother",
+		default=1.0,
+		min=0.01,
+		max=30.0
+	)
+	bpy.types.Scene.handtracking_beta = bpy.props.FloatProperty(
+		name="Beta",
+		description="One Euro speed coefficient, higher reduces lag on fast motion",
+		default=5.0,
+		min=0.0,
+		max=100.0
+	)
+	bpy.types.Scene.handtracking_process_noise = bpy.props.FloatProperty(
+		name="Process Noise",
+		description="Kalman process noise, higher follows fast motion more closely",
+		default=50.0,
+		min=0.0
+	)
+	bpy.types.Scene.handtracking_measurement_noise = bpy.props.FloatProperty(
+		name="Measurement Noise",
+		description="Kalman measurement noise, higher is smoother",
+		default=1e-4,
+		min=1e-8,
+		precision=6
+	)
 	bpy.types.Scene.rotation_smoothing = bpy.props.FloatProperty(
 		name="Rotation Smoothing",
 		default=0.5,
@@ -220,6 +574,63 @@ def calculate_bone_rotation(start_pos, end_pos, up_reference=None):
 	# Convert to quaternion
 	return rot_matrix.to_quaternion()
 
+# -----------------------------
+# EMPTY HANDLE CACHE
+# -----------------------------
+# Resolved empties per hand, so packets don't look every empty up by name.
+# Dropped when an object is renamed (msgbus), when the object count changes
+# (deleted/added objects) or when a cached object turns out to be gone.
+BONES = list(PALM_BONES.items()) + list(FINGER_BONES.items())
+BONE_START_IDS = np.array([ids[0] for _, ids in BONES])
+BONE_END_IDS = np.array([ids[1] for _, ids in BONES])
+NUM_PALM_BONES = len(PALM_BONES)
+
+_empty_cache = {}
+_empty_cache_object_count = -1
+_msgbus_owner = object()
+
+def invalidate_empty_cache(*args):
+	global _empty_cache_object_count
+	_empty_cache.clear()
+	_empty_cache_object_count = -1
+
+def subscribe_rename_notifications():
+	bpy.msgbus.clear_by_owner(_msgbus_owner)
+	bpy.msgbus.subscribe_rna(
+		key=(bpy.types.Object, "name"),
+		owner=_msgbus_owner,
+		args=(),
+		notify=invalidate_empty_cache,
+	)
+
+def unsubscribe_rename_notifications():
+	bpy.msgbus.clear_by_owner(_msgbus_owner)
+
+def get_hand_empties(hand_index):
+	"""
+	Return cached empties for a hand.
+	
+	Returns:
+		(landmark empties indexed by landmark id, bone empties in BONES order),
+		with None for empties that don't exist
+	"""
+	global _empty_cache_object_count
+	object_count = len(bpy.data.objects)
+	if object_count != _empty_cache_object_count:
+		_empty_cache.clear()
+		_empty_cache_object_count = object_count
+
+	handles = _empty_cache.get(hand_index)
+	if handles is None:
+		objects = bpy.data.objects
+		landmark_empties = [
+			objects.get(f"Hand{hand_index}_LM_{lm_id}_{MEDIAPIPE_LANDMARKS.get(lm_id, f'LM{lm_id}')}")
+			for lm_id in range(NUM_LANDMARKS)
+		]
+		bone_empties = [objects.get(f"Hand{hand_index}_{bone_name}") for bone_name, _ in BONES]
+		handles = _empty_cache[hand_index] = (landmark_empties, bone_empties)
+	return handles
+
 # -----------------------------
 # UPDATE EMPTIES
 # -----------------------------
@@ -230,118 +641,83 @@ def update_empties(packet):
 		print("No camera found!")
 		return
 
-	# Process each hand
-	for hand_data in packet.get("hands", []):
-		hand_index = hand_data["hand_index"]
-		
-		# Convert all landmarks to world space
-		landmark_world_positions = {}
-		for lm in hand_data["landmarks"]:
-			lm_id = lm["id"]
-			world_pos = convert_landmark_to_world(lm, cam)
-			landmark_world_positions[lm_id] = world_pos
-			
-			# Update landmark debug empties
-			lm_name = MEDIAPIPE_LANDMARKS.get(lm_id, f"LM{lm_id}")
-			empty_name = f"Hand{hand_index}_LM_{lm_id}_{lm_name}"
-			empty = bpy.data.objects.get(empty_name)
-			if empty:
-				update_empty_position(empty, world_pos)
-		
-		# Update palm bones (wrist to finger bases)
-		for bone_name, (start_id, end_id) in PALM_BONES.items():
-			if start_id in landmark_world_positions and end_id in landmark_world_positions:
-				start_pos = landmark_world_positions[start_id]
-				end_pos = landmark_world_positions[end_id]
-				
-				# Calculate midpoint for empty position
-				midpoint = (start_pos + end_pos) / 2
-				
-				# Calculate rotation
-				rotation = calculate_bone_rotation(start_pos, end_pos)
-				
-				# Update empty
-				empty_name = f"Hand{hand_index}_{bone_name}"
-				empty = bpy.data.objects.get(empty_name)
-				if empty:
-					update_empty_position(empty, midpoint)
-					update_empty_rotation(empty, rotation)
-		
-		# Update finger bones
-		for bone_name, (start_id, end_id) in FINGER_BONES.items():
-			if start_id in landmark_world_positions and end_id in landmark_world_positions:
-				start_pos = landmark_world_positions[start_id]
-				end_pos = landmark_world_positions[end_id]
-				
-				# Calculate midpoint for empty position
-				midpoint = (start_pos + end_pos) / 2
-				
-				# For better orientation, we can use the palm as up reference
-				palm_up = None
-				if 0 in landmark_world_positions:  # Wrist
-					palm_up = (landmark_world_positions[0] - midpoint).normalized()
-				
-				# Calculate rotation
-				rotation = calculate_bone_rotation(start_pos, end_pos, palm_up)
-				
-				# Update empty
-				empty_name = f"Hand{hand_index}_{bone_name}"
-				empty = bpy.data.objects.get(empty_name)
-				if empty:
-					update_empty_position(empty, midpoint)
-					update_empty_rotation(empty, rotation)
-
-def convert_landmark_to_world(lm_data, cam):
-	"""Convert MediaPipe landmark to Blender world space"""
-	cam_pos = cam.matrix_world.translation
-	forward = cam.matrix_world.to_quaternion() @ Vector((0, 0, -1))
-	right = cam.matrix_world.to_quaternion() @ Vector((1, 0, 0))
-	up = cam.matrix_world.to_quaternion() @ Vector((0, 1, 0))
-	
+	# Camera basis only changes per packet, not per landmark
+	basis = camera_basis(cam)
 	depth_scale = bpy.context.scene.depth_scale
-	xy_scale = 1.0
-	
-	x = lm_data["x"]
-	y = 1 - lm_data["y"]
-	z = lm_data["z"] * -1
-	
-	world_pos = (
-		cam_pos +
-		forward * depth_scale +
-		right * ((x - 0.5) * xy_scale) +
-		up * ((y - 0.5) * xy_scale) +
-		forward * (z * depth_scale * 0.5)
-	)
-	
-	return world_pos
 
-def update_empty_position(empty, target_position):
-	"""Update empty position with smoothing"""
-	empty_name = empty.name
-	
-	# Apply smoothing
-	if empty_name in last_positions:
-		smoothing = bpy.context.scene.position_smoothing
-		smoothed_pos = lerp(last_positions[empty_name], target_position, smoothing)
-	else:
-		smoothed_pos = target_position
-	
-	last_positions[empty_name] = smoothed_pos
-	empty.location = smoothed_pos
+	timestamp = packet.get("timestamp")
+	if timestamp is None:
+		timestamp = time.perf_counter()
 
-def update_empty_rotation(empty, target_rotation):
-	"""Update empty rotation with smoothing"""
-	empty_name = empty.name
-	
-	# Apply smoothing
-	if empty_name in last_rotations:
-		smoothing = bpy.context.scene.rotation_smoothing
-		smoothed_rot = slerp(last_rotations[empty_name], target_rotation, smoothing)
-	else:
-		smoothed_rot = target_rotation
-	
-	last_rotations[empty_name] = smoothed_rot
-	empty.rotation_quaternion = smoothed_rot
+	try:
+		for hand_index, landmarks in packet["hands"]:
+			update_hand_empties(hand_index, landmarks, basis, depth_scale, timestamp)
+	except ReferenceError:
+		# A cached empty was removed, resolve them again on the next packet
+		invalidate_empty_cache()
+
+def update_hand_empties(hand_index, landmarks, basis, depth_scale, timestamp):
+	scene = bpy.context.scene
+	landmark_empties, bone_empties = get_hand_empties(hand_index)
+	filters = get_hand_filter(scene, hand_index, NUM_LANDMARKS)
+
+	# Convert all landmarks to world space at once, then smooth them
+	world = landmarks_to_world(landmarks, basis, depth_scale)
+	world = filters.positions(world, timestamp)
+	present = ~np.isnan(world).any(axis=1)
+
+	# Update landmark debug empties
+	for lm_id, empty in enumerate(landmark_empties):
+		if empty is not None and present[lm_id]:
+			empty.location = world[lm_id]
+
+	# Bone midpoints for every palm and finger bone in one go
+	starts = world[BONE_START_IDS]
+	ends = world[BONE_END_IDS]
+	midpoints = (starts + ends) * 0.5
+	bone_present = present[BONE_START_IDS] & present[BONE_END_IDS]
+	wrist = Vector(world[0]) if present[0] else None
+
+	rotations = np.full((len(BONES), 4), np.nan)
+	for i in np.flatnonzero(bone_present):
+		start_pos = Vector(starts[i])
+		end_pos = Vector(ends[i])
+
+		# For better orientation, finger bones use the palm as up reference
+		palm_up = None
+		if i >= NUM_PALM_BONES and wrist is not None:
+			palm_up = (wrist - Vector(midpoints[i])).normalized()
+
+		rotations[i] = calculate_bone_rotation(start_pos, end_pos, palm_up)
+
+	rotations = filters.smooth_rotations(rotations, scene.rotation_smoothing, timestamp)
+
+	for i, empty in enumerate(bone_empties):
+		if empty is None or not bone_present[i]:
+			continue
+		empty.location = midpoints[i]
+		empty.rotation_quaternion = rotations[i]
+
+def camera_basis(cam):
+	"""Return (position, 3x3 matrix with rows right, up, forward) of the camera"""
+	rot = cam.matrix_world.to_quaternion()
+	cam_pos = np.array(cam.matrix_world.translation, dtype=np.float64)
+	axes = np.array((
+		rot @ Vector((1, 0, 0)),   # right
+		rot @ Vector((0, 1, 0)),   # up
+		rot @ Vector((0, 0, -1)),  # forward
+	), dtype=np.float64)
+	return cam_pos, axes
+
+def landmarks_to_world(landmarks, basis, depth_scale, xy_scale=1.0):
+	"""Convert (N, 3) MediaPipe landmarks to (N, 3) Blender world positions"""
+	cam_pos, axes = basis
+	lm = np.asarray(landmarks, dtype=np.float64)
+	coeffs = np.empty_like(lm)
+	coeffs[:, 0] = (lm[:, 0] - 0.5) * xy_scale
+	coeffs[:, 1] = ((1.0 - lm[:, 1]) - 0.5) * xy_scale
+	coeffs[:, 2] = depth_scale + (-lm[:, 2]) * depth_scale * 0.5
+	return cam_pos + coeffs @ axes
 
 # -----------------------------
 # OPERATORS
@@ -353,13 +729,15 @@ class HANDTRACKING_OT_Receiver(bpy.types.Operator):
 
 	def modal(self, context, event):
 		if event.type == "TIMER":
+			scene = context.scene
 			try:
-				data, addr = sock.recvfrom(65535)
-				packet = json.loads(data.decode("utf-8"))
-				context.scene.handtracking_data = json.dumps(packet)
-				update_empties(packet)
-			except BlockingIOError:
-				pass
+				data = receive_latest(drain=scene.handtracking_receive_mode == 'LATEST')
+				if data is not None:
+					packet = decode_packet(data)
+					# Writing the property triggers an update, only do it when someone is looking
+					if scene.show_handtracking_data:
+						scene.handtracking_data = packet_to_json(packet)
+					update_empties(packet)
 			except Exception as e:
 				print("Receive error:", e)
 		return {"PASS_THROUGH"}
@@ -367,6 +745,9 @@ class HANDTRACKING_OT_Receiver(bpy.types.Operator):
 	def execute(self, context):
 		init_socket()
 		ensure_hand_empties()
+		invalidate_empty_cache()
+		subscribe_rename_notifications()
+		reset_filters()
 		
 		wm = context.window_manager
 		self._timer = wm.event_timer_add(0.01, window=context.window)
@@ -376,6 +757,8 @@ class HANDTRACKING_OT_Receiver(bpy.types.Operator):
 	def cancel(self, context):
 		wm = context.window_manager
 		wm.event_timer_remove(self._timer)
+		unsubscribe_rename_notifications()
+		invalidate_empty_cache()
 
 class HANDTRACKING_OT_ClearEmpties(bpy.types.Operator):
 	"""Clear all hand tracking empties"""
@@ -391,11 +774,10 @@ class HANDTRACKING_OT_ClearEmpties(bpy.types.Operator):
 		
 		for empty in empties_to_remove:
 			bpy.data.objects.remove(empty)
+		invalidate_empty_cache()
 		
 		# Clear smoothing data
-		global last_positions, last_rotations
-		last_positions.clear()
-		last_rotations.clear()
+		reset_filters()
 		
 		self.report({'INFO'}, f"Cleared {len(empties_to_remove)} empties")
 		return {'FINISHED'}
@@ -425,8 +807,17 @@ class HANDTRACKING_PT_Panel(bpy.types.Panel):
 		# Settings
 		box = layout.box()
 		box.label(text="Settings", icon='SETTINGS')
+		box.prop(context.scene, "handtracking_receive_mode")
 		box.prop(context.scene, "depth_scale")
-		box.prop(context.scene, "position_smoothing")
+		box.prop(context.scene, "handtracking_filter")
+		if context.scene.handtracking_filter == 'EXPONENTIAL':
+			box.prop(context.scene, "position_smoothing")
+		elif context.scene.handtracking_filter == 'ONE_EURO':
+			box.prop(context.scene, "handtracking_min_cutoff")
+			box.prop(context.scene, "handtracking_beta")
+		elif context.scene.handtracking_filter == 'KALMAN':
+			box.prop(context.scene, "handtracking_process_noise")
+			box.prop(context.scene, "handtracking_measurement_noise")
 		box.prop(context.scene, "rotation_smoothing")
 		
 		# Debug
@@ -439,8 +830,9 @@ class HANDTRACKING_PT_Panel(bpy.types.Panel):
 			for lm_id, lm_name in MEDIAPIPE_LANDMARKS.items():
 				box.label(text=f"  {lm_id}: {lm_name}")
 			
-			box.label(text="Current Data:")
-			box.prop(context.scene, "handtracking_data", text="")
+			box.prop(context.scene, "show_handtracking_data")
+			if context.scene.show_handtracking_data:
+				box.prop(context.scene, "handtracking_data", text="")
 
 # -----------------------------
 # REGISTRATION
@@ -457,12 +849,22 @@ def register():
 		bpy.utils.register_class(c)
 
 def unregister():
+	unsubscribe_rename_notifications()
+	invalidate_empty_cache()
+	reset_filters()
 	for c in reversed(classes):
 		bpy.utils.unregister_class(c)
 	del bpy.types.Scene.handtracking_data
+	del bpy.types.Scene.handtracking_receive_mode
 	del bpy.types.Scene.depth_scale
 	del bpy.types.Scene.handtracking_rig
 	del bpy.types.Scene.show_finger_debug
+	del bpy.types.Scene.show_handtracking_data
+	del bpy.types.Scene.handtracking_filter
+	del bpy.types.Scene.handtracking_min_cutoff
+	del bpy.types.Scene.handtracking_beta
+	del bpy.types.Scene.handtracking_process_noise
+	del bpy.types.Scene.handtracking_measurement_noise
 	del bpy.types.Scene.rotation_smoothing
 	del bpy.types.Scene.position_smoothing
 
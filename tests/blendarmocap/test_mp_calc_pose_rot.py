@@ -0,0 +1,84 @@
+import sys
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+try:
+    # the mathutils of blender, pip builds differ in euler conversions
+    import bpy  # noqa: F401
+    from mathutils import Euler
+except ImportError:
+    Euler = None
+
+# import cgt_core as package from the addon sources
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "dot_config/blender/5.0/scripts/addons/BlendArMocap/src"))
+
+
+# mediapipe pose landmarks (x, y, z) of a person standing slightly turned
+LANDMARKS = np.array([
+    [.52, .20, -.30], [.53, .18, -.29], [.54, .18, -.29], [.55, .18, -.29], [.50, .18, -.29],
+    [.49, .18, -.29], [.48, .18, -.29], [.57, .19, -.18], [.46, .19, -.16], [.54, .22, -.27],
+    [.50, .22, -.26], [.62, .32, -.12], [.41, .31, -.10], [.66, .45, -.08], [.36, .44, -.11],
+    [.68, .57, -.15], [.34, .55, -.20], [.69, .60, -.17], [.33, .59, -.22], [.68, .61, -.19],
+    [.34, .60, -.23], [.67, .60, -.16], [.35, .59, -.21], [.59, .58, -.02], [.45, .57, .02],
+    [.60, .74, -.05], [.44, .75, .01], [.61, .90, .06], [.43, .91, .09], [.62, .92, .07],
+    [.42, .93, .10], [.60, .95, -.04], [.44, .96, -.02],
+])
+
+
+@unittest.skipIf(Euler is None, "requires blender's mathutils")
+class TestPoseRotationBatch(unittest.TestCase):
+    """ Compares the batched pose rotations with the per frame mathutils implementation. """
+
+    @staticmethod
+    def baseline(landmarks):
+        from cgt_core.cgt_calculators_nodes import cgt_math
+
+        pose = np.stack((-landmarks[:, 0], landmarks[:, 2], -landmarks[:, 1]), axis=-1)
+        pose = pose - cgt_math.center_point(pose[23], pose[24])
+        shoulder_center = cgt_math.center_point(pose[11], pose[12])
+        hip_center = cgt_math.center_point(pose[23], pose[24])
+
+        def to_euler(quart, offset=(0, 0, 0)):
+            return np.array(cgt_math.to_euler(quart, Euler())) + np.pi * np.array(offset)
+
+        def rotation_from_rows(*rows, offset=(0, 0, 0)):
+            matrix = cgt_math.generate_matrix(*[cgt_math.normalize(vec) for vec in rows])
+            _, quart, _ = cgt_math.decompose_matrix(matrix)
+            return to_euler(quart, offset)
+
+        rotations = {
+            34: to_euler(cgt_math.rotate_towards(shoulder_center, pose[12], 'Z'))
+            - to_euler(cgt_math.rotate_towards(hip_center, pose[24], 'Z')),
+            33: rotation_from_rows(
+                pose[24] - hip_center, shoulder_center - hip_center,
+                cgt_math.normal_from_plane([pose[23], pose[24], shoulder_center]), offset=(-.5, 0, 0)),
+        }
+        for chain in [[23, 25, 27], [24, 26, 28], [12, 14, 16, 20], [11, 13, 15, 19]]:
+            for parent, child in zip(chain[:-1], chain[1:]):
+                rotations[parent] = to_euler(cgt_math.rotate_towards(pose[child], pose[parent], '-Y', 'Z'))
+        for knee, ankle, foot in [[25, 27, 31], [26, 28, 32]]:
+            rotations[ankle] = rotation_from_rows(
+                cgt_math.normal_from_plane([pose[knee], pose[ankle], pose[foot]]),
+                pose[ankle] - pose[foot], pose[knee] - pose[foot])
+        return rotations
+
+    def test_rotations_match_baseline(self):
+        from cgt_core.cgt_calculators_nodes.mp_calc_pose_rot import PoseRotationCalculator
+
+        rng = np.random.default_rng(0)
+        frames = [LANDMARKS] + [LANDMARKS + rng.normal(scale=.03, size=LANDMARKS.shape) for _ in range(8)]
+        for landmarks in frames:
+            result = PoseRotationCalculator().update_batch(landmarks[None])
+            self.assertTrue(result.valid[0])
+
+            for idx, expected in self.baseline(landmarks).items():
+                actual = result.rotations[0, result.rotation_indices.index(idx)]
+                # angles of +-pi are the same rotation
+                difference = (actual - expected + np.pi) % (2 * np.pi) - np.pi
+                np.testing.assert_allclose(difference, 0, atol=1e-5, err_msg=f"pose landmark {idx}")
+
+
+if __name__ == '__main__':
+    unittest.main()